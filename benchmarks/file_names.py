@@ -0,0 +1,119 @@
+"""
+Microbenchmark of the file name filters over a large listing.
+
+Compares filtering 100k names by re-reading the name in every filter (as the
+filters did before the names were parsed once) with comparing the fields of
+the parsed name. Run from the repository root:
+
+    python -m benchmarks.file_names
+"""
+
+import datetime
+import random
+import re
+import time
+
+from il_supermarket_scarper.utils import FileTypesFilters, parse_file_name
+
+NAMES_COUNT = 100_000
+STORE_ID = 7
+FILES_TYPES = [FileTypesFilters.PRICE_FULL_FILE.name, FileTypesFilters.PROMO_FILE.name]
+DATE_PATTERN_1 = re.compile(r"-(\d{8})(\d{4})?(?=-|\.|$)")
+DATE_PATTERN_2 = re.compile(r"-(\d{8})-(\d{6})")
+
+
+def generate_names(count, now):
+    """a listing of count names of the last 4 days, in both formats"""
+    rng = random.Random(0)
+    names = []
+    for index in range(count):
+        prefix = rng.choice(["Price", "PriceFull", "Promo", "PromoFull", "Stores"])
+        published = now - datetime.timedelta(minutes=rng.randrange(4 * 24 * 60))
+        store = rng.randrange(1, 500)
+        if index % 10 == 0:
+            names.append(
+                f"{prefix}7290700100008-000-{store:03d}-"
+                f"{published:%Y%m%d}-{published:%H%M%S}"
+            )
+        else:
+            names.append(f"{prefix}7290875100001-{store:03d}-{published:%Y%m%d%H%M}.gz")
+    return names
+
+
+def legacy_timestamp(file_name):
+    """the publish time, with the two date patterns and strptime"""
+    date_match = DATE_PATTERN_1.search(file_name) or DATE_PATTERN_2.search(file_name)
+    if not date_match:
+        return None
+    try:
+        return datetime.datetime.strptime(
+            f"{date_match.group(1)}{(date_match.group(2) or '0000')[:4]}",
+            "%Y%m%d%H%M",
+        )
+    except ValueError:
+        return None
+
+
+def legacy_filters(names, requested_date, cutoff):
+    """the filters reading the name every time"""
+    passed = 0
+    date_format = requested_date.strftime("%Y%m%d")
+    for name in names:
+        store_pattern = re.compile(rf"-0*{STORE_ID}-")
+        of_type = any(
+            FileTypesFilters.filter_file(name, **getattr(FileTypesFilters, type_).value)
+            for type_ in FILES_TYPES
+        )
+        of_store = store_pattern.search(name) is not None
+        of_date = f"-{date_format}" in name
+        timestamp = legacy_timestamp(name)
+        recent = timestamp is not None and timestamp >= cutoff
+        passed += of_type and of_store and of_date and recent
+    return passed
+
+
+def parsed_filters(names, requested_date, cutoff):
+    """the filters comparing the fields of the parsed name"""
+    passed = 0
+    requested_day = requested_date.date()
+    for name in names:
+        parsed = parse_file_name(name)
+        of_type = parsed.file_type is not None and parsed.file_type.name in FILES_TYPES
+        of_store = parse_file_name(name).store_id == STORE_ID
+        of_date = parse_file_name(name).date == requested_day
+        timestamp = parse_file_name(name).timestamp
+        recent = timestamp is not None and timestamp >= cutoff
+        passed += of_type and of_store and of_date and recent
+    return passed
+
+
+def measure(function, *args):
+    """the result of function and the seconds it took"""
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    """time both ways of filtering the same listing"""
+    now = datetime.datetime.now()
+    names = generate_names(NAMES_COUNT, now)
+    cutoff = now - datetime.timedelta(hours=48)
+    requested_date = now - datetime.timedelta(days=1)
+
+    parse_file_name.cache_clear()
+    FileTypesFilters.types_of_file.cache_clear()
+    legacy, legacy_seconds = measure(legacy_filters, names, requested_date, cutoff)
+    parse_file_name.cache_clear()
+    FileTypesFilters.types_of_file.cache_clear()
+    parsed, parsed_seconds = measure(parsed_filters, names, requested_date, cutoff)
+
+    print(f"{NAMES_COUNT} names, {legacy} passed the legacy filters")
+    print(f"{NAMES_COUNT} names, {parsed} passed the parsed filters")
+    print(f"legacy filters: {legacy_seconds:.3f}s")
+    print(f"parsed filters: {parsed_seconds:.3f}s")
+    print(f"speedup: {legacy_seconds / parsed_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark of the listing page parsers of the web engines.
+
+Builds a listing page per engine, shaped like the pages the engine reads
+and scaled to 50k rows, and parses it with BeautifulSoup (as the engines
+did before) and with the lxml fast path. The recorded gov.il chains page,
+its rows repeated to the same scale, is parsed with the BeautifulSoup
+fallback of the parser and with the fast path, to check both on real
+markup. Reports the rows parsed per second and the peak memory
+(tracemalloc) of each. Run from the repository root:
+
+    python -m benchmarks.listing_parsers
+"""
+
+import json
+import os
+import re
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from il_supermarket_scarper.utils import (
+    UnitSize,
+    convert_nl_size_to_bytes,
+    parse_list_items,
+    parse_script_texts,
+    parse_table_rows,
+)
+from il_supermarket_scarper.utils.listing_parser import _table_rows_with_soup
+
+ROWS_COUNT = 50_000
+CHAIN_NAMES = ["ח. כהן", "מחסני השוק", "ויקטורי"]
+SIZE_PATTERN = re.compile(r"\b\d+(\.\d+)?\s*(KB|MB|GB)\b")
+RECORDED_PAGE = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "il_supermarket_scarper",
+    "utils",
+    "tests",
+    "cpfta_prices_regulations",
+)
+
+
+def file_name(index):
+    """the name of the index-th file of a listing"""
+    prefix = ["PriceFull", "Price", "PromoFull", "Promo"][index % 4]
+    return f"{prefix}7290455000004-{index % 500:03d}-2026011215{index % 60:02d}"
+
+
+def web_page(count):
+    """a table listing, one file per row (WebBase)"""
+    rows = "".join(
+        f'<tr><td><a href="{file_name(index)}.gz">{file_name(index)}</a></td>'
+        f"<td>2026-01-12 15:22</td><td>{index % 900 + 1} KB</td></tr>"
+        for index in range(count)
+    )
+    return f"<html><body><table><tr><th>name</th></tr>{rows}</table></body></html>"
+
+
+def matrix_page(count):
+    """the portal table, the rows of the chains interleaved (Matrix)"""
+    rows = "".join(
+        f"<tr><td>{CHAIN_NAMES[index % 3]}</td><td>{index % 500}</td>"
+        f'<td><a href="CompetitionRegulationsFiles/latest/{file_name(index)}.xml.gz">'
+        f"הורדה</a></td><td>{index % 900 + 1} KB</td></tr>"
+        for index in range(count)
+    )
+    return (
+        "<html><body><table><tr><th>רשת</th><th>סניף</th></tr>"
+        f"{rows}</table></body></html>"
+    )
+
+
+def publish_price_page(count):
+    """the files hard-coded in the second-to-last script (PublishPrice)"""
+    files = json.dumps(
+        [{"name": f"{file_name(index)}.gz", "size": 1024} for index in range(count)]
+    )
+    return (
+        "<html><head><script>var x = 1;</script></head><body>"
+        f"<script>const path = './20260112';\nconst files = {files};\n</script>"
+        "<script>render();</script></body></html>"
+    )
+
+
+def wolt_page(count):
+    """a list of links (Wolt)"""
+    items = "".join(
+        f'<li><a href="{file_name(index)}.gz">{file_name(index)}</a></li>'
+        for index in range(count)
+    )
+    return f"<html><body><ul>{items}</ul></body></html>"
+
+
+def recorded_page(count):
+    """the recorded gov.il page, its table rows repeated to count rows"""
+    with open(RECORDED_PAGE, encoding="utf-8") as file:
+        page = file.read()
+    start = page.index("<tbody>") + len("<tbody>")
+    end = page.index("</tbody>")
+    rows = [f"{row}</tr>" for row in page[start:end].split("</tr>") if row]
+    rows = "".join(rows[index % len(rows)] for index in range(count))
+    return page[:start] + rows + page[end:]
+
+
+def soup_size(text):
+    """the size of a row text, as WebBase.get_file_size_from_entry did"""
+    size_match = SIZE_PATTERN.search(text)
+    if size_match is None:
+        return None
+    return convert_nl_size_to_bytes(size_match.group(0), to_unit=UnitSize.BYTES)
+
+
+def soup_web(page):
+    """WebBase, with BeautifulSoup"""
+    soup = BeautifulSoup(page, features="lxml")
+    trs = list(soup.find_all("tr"))[1:]
+    return [
+        (x.a.attrs["href"].split(".")[0].split("/")[-1], soup_size(x.text)) for x in trs
+    ]
+
+
+def fast_web(page):
+    """WebBase, with the fast path"""
+    return [(row.name, row.size) for row in parse_table_rows(page)[1:]]
+
+
+def soup_matrix(page):
+    """Matrix, with BeautifulSoup, for one chain"""
+    soup = BeautifulSoup(page, features="lxml")
+    trs = list(soup.find_all("tr"))[1:]
+    return [
+        (x.a.attrs["href"], soup_size(x.text)) for x in trs if CHAIN_NAMES[0] in str(x)
+    ]
+
+
+def fast_matrix(page):
+    """Matrix, with the fast path, for one chain"""
+    return [
+        (row.href, row.size)
+        for row in parse_table_rows(page)[1:]
+        if CHAIN_NAMES[0] in row.cells
+    ]
+
+
+def script_files(script_text):
+    """the files array of a PublishPrice script"""
+    all_data = script_text.split("const files = ")[1]
+    return json.loads(all_data.split("\n")[0].replace(";", ""))
+
+
+def soup_publish_price(page):
+    """PublishPrice, with BeautifulSoup"""
+    soup = BeautifulSoup(page, features="lxml")
+    return script_files(list(soup.find_all("script"))[-2].text)
+
+
+def fast_publish_price(page):
+    """PublishPrice, with the fast path"""
+    return script_files(parse_script_texts(page)[-2])
+
+
+def soup_wolt(page):
+    """Wolt, with BeautifulSoup"""
+    soup = BeautifulSoup(page, features="lxml")
+    return [(x.text, x.a.attrs["href"]) for x in list(soup.find_all("li"))]
+
+
+def fast_wolt(page):
+    """Wolt, with the fast path"""
+    return parse_list_items(page)
+
+
+ENGINES = [
+    ("WebBase", web_page, soup_web, fast_web),
+    ("Matrix", matrix_page, soup_matrix, fast_matrix),
+    ("PublishPrice", publish_price_page, soup_publish_price, fast_publish_price),
+    ("Wolt", wolt_page, soup_wolt, fast_wolt),
+    ("Recorded", recorded_page, _table_rows_with_soup, parse_table_rows),
+]
+
+
+def measure(parse, page):
+    """
+    The result of parse, the seconds it took and its peak memory in MB.
+
+    The time and the memory are measured in separate runs, tracing slows
+    parsing down. tracemalloc sees the Python objects only, not the memory
+    libxml2 allocates.
+    """
+    started = time.perf_counter()
+    result = parse(page)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def main():
+    """parse the listing of every engine both ways"""
+    print(f"{'engine':<14}{'parser':<8}{'rows/sec':>12}{'peak MB':>10}")
+    for engine, build_page, soup_parse, fast_parse in ENGINES:
+        page = build_page(ROWS_COUNT)
+        results = []
+        for parser, parse in (("soup", soup_parse), ("lxml", fast_parse)):
+            result, seconds, peak = measure(parse, page)
+            results.append(result)
+            print(f"{engine:<14}{parser:<8}{ROWS_COUNT / seconds:>12,.0f}{peak:>10.1f}")
+        assert results[0] == results[1], f"{engine} parsers disagree"
+
+
+if __name__ == "__main__":
+    main()
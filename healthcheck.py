@@ -36,9 +36,9 @@ def load_configuration():
 
     # Get status database configuration
     status_database_type = os.getenv("STATUS_DATABASE_TYPE", "json").lower()
-    if status_database_type not in ["json", "mongo"]:
+    if status_database_type not in ["json", "jsonl", "sqlite", "mongo"]:
         print(
-            f"ERROR: STATUS_DATABASE_TYPE must be 'json' or 'mongo', "
+            f"ERROR: STATUS_DATABASE_TYPE must be 'json', 'jsonl', 'sqlite' or 'mongo', "
             f"but got {status_database_type}",
             file=sys.stderr,
         )
@@ -48,7 +48,7 @@ def load_configuration():
         "database_type": status_database_type,
     }
 
-    if status_database_type == "json":
+    if status_database_type in ("json", "jsonl", "sqlite"):
         status_configuration["base_path"] = os.getenv(
             "STATUS_DATABASE_PATH", "dumps/status"
         )
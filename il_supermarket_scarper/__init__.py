@@ -14,5 +14,6 @@ from .utils import (
     DownloadedStatus,
     SawStatus,
     FailedStatus,
+    SummaryStatus,
     VerifiedDownload,
 )
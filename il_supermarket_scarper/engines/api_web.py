@@ -1,6 +1,8 @@
+import asyncio
 import json
-import requests
-from il_supermarket_scarper.utils import Logger
+import contextlib
+from il_supermarket_scarper.utils import Logger, stream_in_parallel
+from il_supermarket_scarper.utils.transport import TRANSPORT_ERRORS
 from il_supermarket_scarper.utils import FileEntry
 from il_supermarket_scarper.utils.state import FilterState
 from .web import WebBase
@@ -26,16 +28,15 @@ class ApiWebEngine(WebBase):
             file_output=file_output,
             status_database=status_database,
         )
-        self.session = requests.Session()
 
-    def get_api_data(self, endpoint, params=None):
+    async def get_api_data(self, endpoint, params=None):
         """Make API call and return JSON response"""
         url = f"{self.url.rstrip('/')}{endpoint}"
         try:
-            response = self.session.get(url, params=params)
+            response = await self.get_transport().request("GET", url, params=params)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except TRANSPORT_ERRORS as e:
             Logger.error(f"API request failed: {e}")
             return []
         except json.JSONDecodeError as e:
@@ -46,6 +47,29 @@ class ApiWebEngine(WebBase):
         """get API endpoints to query"""
         yield
 
+    async def fetch_api_page(self, request_info):
+        """the entries of an API request, empty when it fails"""
+        try:
+            response = await self.get_transport().request("GET", request_info["url"])
+            response.raise_for_status()
+            page_data = await asyncio.to_thread(self.get_data_from_page, response)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.error(f"Failed to get data from {request_info}: {e}")
+            return []
+        return page_data
+
+    async def get_api_pages(self, files_types=None, store_id=None, when_date=None):
+        """the entries of the get_request_url requests, listing_concurrency at a time"""
+        requests_to_make = self.get_request_url(
+            files_types=files_types, store_id=store_id, when_date=when_date
+        )
+        pages = stream_in_parallel(
+            self.fetch_api_page, requests_to_make, self.listing_concurrency
+        )
+        async with contextlib.aclosing(pages):
+            async for page_data in pages:
+                yield page_data
+
     def get_data_from_page(self, req_res):
         """Parse API response - to be overridden by subclasses"""
         try:
@@ -89,23 +113,14 @@ class ApiWebEngine(WebBase):
         """collect file details from API endpoints"""
         all_entries = []
 
-        # Get API endpoints to query (async generator)
-        requests_to_make = self.get_request_url(
+        # Fetch data from the endpoints, concurrently
+        async for page_data in self.get_api_pages(
             files_types=files_types, store_id=store_id, when_date=when_date
-        )
-
-        # Fetch data from each endpoint
-        async for request_info in requests_to_make:
-            try:
-                response = self.session.get(request_info["url"])
-                response.raise_for_status()
-                page_data = self.get_data_from_page(response)
-                if isinstance(page_data, list):
-                    all_entries.extend(page_data)
-                else:
-                    all_entries.append(page_data)
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                Logger.error(f"Failed to get data from {request_info['url']}: {e}")
+        ):
+            if isinstance(page_data, list):
+                all_entries.extend(page_data)
+            else:
+                all_entries.append(page_data)
 
         # Apply filtering if needed
         if hasattr(self, "apply_filter_by_type"):
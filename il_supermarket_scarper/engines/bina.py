@@ -133,6 +133,12 @@ class Bina(Aspx):
         url = await self._resolve_url(file_link)
         return await super().retrieve_file_to_memory(url, timeout=timeout)
 
+    async def retrieve_file_to_stream(self, file_link, timeout=30):
+        """Stream file from Bina website"""
+        url = await self._resolve_url(file_link)
+        async for chunk in super().retrieve_file_to_stream(url, timeout=timeout):
+            yield chunk
+
     async def _wget_file_to_memory(self, file_link, timeout):
         url = await self._resolve_url(file_link)
         return await super()._wget_file_to_memory(url, timeout)
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from typing import AsyncGenerator
 
@@ -5,11 +6,13 @@ from il_supermarket_scarper.utils import FileEntry
 from il_supermarket_scarper.utils import (
     Logger,
     collect_from_ftp,
-    fetch_file_from_ftp_to_memory,
+    fetch_file_from_ftp_to_stream,
     FileTypesFilters,
     ScrapingResult,
+    async_url_connection_retry,
 )
 from il_supermarket_scarper.utils.state import FilterState
+from il_supermarket_scarper.utils.ftp_pool import ftp_connection_pool
 from .engine import Engine
 
 
@@ -134,47 +137,93 @@ class Cerberus(Engine):
     ):
         """collect all files to download from the site"""
 
-        async for filter_arg in self.build_filter_arg(store_id, when_date, files_types):
-            # Get async generator from FTP
-            files_generator = collect_from_ftp(
-                self.ftp_host,
-                self.ftp_username,
-                self.ftp_password,
-                self.ftp_path,
-                filter_arg,
+        # list the directory once, matching all the type/store/date patterns
+        filter_args = [
+            filter_arg
+            async for filter_arg in self.build_filter_arg(
+                store_id, when_date, files_types
             )
-            files_generator = self.register_all_saw_files_on_site(files_generator)
+        ]
+        files_generator = collect_from_ftp(
+            self.ftp_host,
+            self.ftp_username,
+            self.ftp_password,
+            self.ftp_path,
+            filter_args,
+            max_connections=self.max_ftp_connections(),
+        )
+        files_generator = self.register_all_saw_files_on_site(files_generator)
 
-            files = self.filter_bad_files(
-                files_generator,
-                filter_null=filter_null,
-                filter_zero=filter_zero,
-                by_function=lambda x: x.name,
-            )
+        files = self.filter_bad_files(
+            files_generator,
+            filter_null=filter_null,
+            filter_zero=filter_zero,
+            by_function=lambda x: x.name,
+        )
+
+        files = self.filter_by_file_size(
+            files,
+            min_size=min_size,
+            max_size=max_size,
+        )
 
-            files = self.filter_by_file_size(
-                files,
-                min_size=min_size,
-                max_size=max_size,
+        files = self.filter_by_file_extension(files)
+
+        # apply normal filter
+        async for entry in self.apply_limit(
+            state,
+            files,
+            limit=limit,
+            files_types=files_types,
+            store_id=store_id,
+            when_date=when_date,
+            files_names_to_scrape=files_names_to_scrape,
+            by_function=lambda x: x.name,
+        ):
+            yield entry.name, entry.url
+
+    def max_ftp_connections(self):
+        """
+        The bound of the chain's pooled FTP connections.
+
+        The ceiling of the download concurrency limiter, so the limiter never
+        admits more downloads than the pool has connections.
+        """
+        return self.get_concurrency_limiter().max_limit
+
+    @async_url_connection_retry(init_timeout=30, tries=8)
+    async def stream_from_ftp_to_output(self, file_name, metadata, timeout=30):
+        """stream the file from the FTP into the file output, restarting on errors"""
+        async with self.get_concurrency_limiter().track():
+            return await self.storage_path.save_stream(
+                file_link="",  # FTP doesn't have a URL
+                file_name=file_name,
+                chunks=self.count_downloaded_bytes(
+                    fetch_file_from_ftp_to_stream(
+                        self.ftp_host,
+                        self.ftp_username,
+                        self.ftp_password,
+                        self.ftp_path,
+                        file_name,
+                        timeout=timeout,
+                        max_connections=self.max_ftp_connections(),
+                    )
+                ),
+                metadata=metadata,
             )
 
-            files = self.filter_by_file_extension(files)
-
-            # apply normal filter
-            async for entry in self.apply_limit(
-                state,
-                files,
-                limit=limit,
-                files_types=files_types,
-                store_id=store_id,
-                when_date=when_date,
-                files_names_to_scrape=files_names_to_scrape,
-                by_function=lambda x: x.name,
-            ):
-                yield entry.name, entry.url
+    async def _post_scraping(self):
+        """close the pooled FTP connections of the chain"""
+        await asyncio.to_thread(
+            ftp_connection_pool.close_idle,
+            self.ftp_host,
+            self.ftp_username,
+            self.ftp_path,
+        )
+        await super()._post_scraping()
 
     async def persist_from_ftp(self, file_name):
-        """download file to memory and extract it."""
+        """download file as a stream and extract it."""
         downloaded = False
         extract_succefully = False
         restart_and_retry = False
@@ -185,34 +234,20 @@ class Cerberus(Engine):
             if ext not in ["gz", "xml"]:
                 raise ValueError(f"File {file_name} extension is not .gz or .xml")
 
-            Logger.debug(f"Start persisting file {file_name} (in-memory)")
+            Logger.debug(f"Start persisting file {file_name} (streaming)")
 
-            # Download file directly to memory
-            file_content = await fetch_file_from_ftp_to_memory(
-                self.ftp_host,
-                self.ftp_username,
-                self.ftp_password,
-                self.ftp_path,
+            # Stream the file from the FTP into the file output handler
+            result = await self.stream_from_ftp_to_output(
                 file_name,
-                30,
-            )
-            downloaded = True
-
-            if ext == "gz":
-                Logger.debug(f"File size is {len(file_content)} bytes.")
-
-            # Use the file output handler to save
-            result = await self.storage_path.save_file(
-                file_link="",  # FTP doesn't have a URL
-                file_name=file_name,
-                file_content=file_content,
-                metadata={
+                {
                     "chain": self.chain.value,
                     "chain_id": self.chain_id,
                     "original_filename": file_name,
                     "source": "ftp",
                 },
+                timeout=30,
             )
+            downloaded = True
 
             Logger.debug(f"Done persisting file {file_name}")
             extract_succefully = result.get("extract_successfully", False)
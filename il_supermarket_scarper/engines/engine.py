@@ -1,30 +1,41 @@
 from abc import ABC, abstractmethod
-import os
+import io
 import re
-import uuid
 import datetime
 import asyncio
+import contextlib
+import inspect
 from typing import AsyncGenerator, Optional
 from il_supermarket_scarper.utils import (
     FileEntry,
     FileTypesFilters,
+    parse_file_name,
     Logger,
     ScraperStatus,
-    session_with_cookies,
-    url_retrieve_to_memory,
+    session_with_cookies_on_transport,
+    create_transport,
+    HttpTransport,
     wget_file_to_memory,
     RestartSessionError,
     DumpFolderNames,
     FileOutput,
     DiskFileOutput,
     ScrapingResult,
+    ChainCookieJar,
     async_url_connection_retry,
+    resumable_stream,
+    ListingCache,
+    ConcurrencyLimiter,
+    FairDownloadBudget,
+    create_concurrency_limiter,
 )
 from il_supermarket_scarper.utils.state import FilterState
 from il_supermarket_scarper.utils.databases import AbstractDataBase
 
 
-class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
+class Engine(  # pylint: disable=too-many-public-methods,too-many-instance-attributes
+    ScraperStatus, ABC
+):
     """
     Base engine class for scraping Israeli supermarket data.
 
@@ -69,11 +80,21 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             asyncio.run(scraper.scrape(limit=10))
     """
 
-    _DATE_PATTERN_1 = re.compile(r"-(\d{8})(\d{4})?(?=-|\.|$)")
-    _DATE_PATTERN_2 = re.compile(r"-(\d{8})-(\d{6})")
-
     utilize_date_param = True
 
+    # HTTP transport settings, None picks the default ("aiohttp" when installed)
+    transport_type = None
+    transport_limit = 100
+    # connections per host, None keeps it at the concurrency upper bound
+    transport_limit_per_host = None
+
+    # parallel downloads: "aimd" adapts between the bounds, "fixed" keeps
+    # max_threads, None picks the CONCURRENCY_LIMITER environment variable
+    concurrency_limiter_type = None
+    min_concurrency = 1
+    # None allows up to 3 * max_threads
+    max_concurrency = None
+
     def __init__(
         self,
         chain,
@@ -120,7 +141,18 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             chain.value, status_database=status_database, file_output=file_output
         )
 
-        self.assigned_cookie = f"{self.chain.name}_{uuid.uuid4()}_cookies.txt"
+        self.cookie_jar = ChainCookieJar()
+        # optional file to restore the cookies from, and persist them to, over restarts
+        self.cookies_persist_path: Optional[str] = None
+        self._transport: Optional[HttpTransport] = None
+        # kept over the passes of a continuous scrape, like the learned limit
+        self._concurrency_limiter: Optional[ConcurrencyLimiter] = None
+        # downloads budget shared with the other chains running in the same loop
+        self.download_budget: Optional[FairDownloadBudget] = None
+        # parsed listing pages, kept over the passes of a continuous scrape
+        self.listing_cache = ListingCache()
+        # bytes received by the downloads, over all the passes
+        self.downloaded_bytes = 0
         self.storage_path: FileOutput = file_output
         Logger.info(
             f"Initialized {self.chain.value} scraper with"
@@ -232,7 +264,9 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
         """
         Filter files by store ID.
 
-        Only yields files whose name contains the specified store ID.
+        Only yields files whose name is of the specified store ID: the number
+        right before the timestamp, or any "-<store_id>-" segment of names
+        that can't be parsed.
 
         Args:
             intreable: Async generator yielding file tuples (link, name).
@@ -245,8 +279,14 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             tuple[str, str]: File tuples matching the store ID.
         """
         pattern = re.compile(rf"-0*{store_id}-")
+        store_number = int(store_id) if str(store_id).isdigit() else None
         async for file in intreable:
-            if pattern.search(by_function(file)):
+            file_name = by_function(file)
+            parsed_store_id = parse_file_name(file_name).store_id
+            if parsed_store_id is None or store_number is None:
+                if pattern.search(file_name):
+                    yield file
+            elif parsed_store_id == store_number:
                 yield file
 
     async def apply_limit(
@@ -383,14 +423,11 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
     ) -> AsyncGenerator[FileEntry, None]:
         """filter the file types requested"""
 
+        requested_types = set(files_types)
         async for type_ in intreable:
             # Check if the file matches any of the requested file types
-            filename = by_function(type_)
-            matches = any(
-                FileTypesFilters.is_file_from_type(filename, file_type)
-                for file_type in files_types
-            )
-            if matches:
+            file_types = FileTypesFilters.types_of_file(by_function(type_))
+            if requested_types.intersection(file_types):
                 if limit is None:
                     yield type_
                 elif state.file_pass_limit < limit:
@@ -419,12 +456,18 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
 
     async def get_by_date(self, requested_date, by_function, intreable_):
         """get by date"""
+        requested_day = requested_date.date()
         date_format = requested_date.strftime("%Y%m%d")
 
         async for file in intreable_:
             # StoresFull7290875100001-000-202502250510'
             # Promo7290700100008-000-207-20250224-103225
-            if f"-{date_format}" in by_function(file):
+            file_name = by_function(file)
+            file_date = parse_file_name(file_name).date
+            if file_date is None:
+                if f"-{date_format}" in file_name:
+                    yield file
+            elif file_date == requested_day:
                 yield file
 
     async def get_last_48_hours(self, by_function, intreable_):
@@ -434,31 +477,11 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
 
         groups_value = []
         for file in intreable_:
-            file_name = by_function(file)
-            # Extract date from filename patterns like:
             # StoresFull7290875100001-000-202502250510 (YYYYMMDDHHMM)
             # Promo7290700100008-000-207-20250224-103225 (YYYYMMDD-HHMMSS)
-            # Look for date pattern YYYYMMDD followed by optional time
-            # Pattern: -YYYYMMDD followed by optional HHMM, then - or end of string or .
-            date_match = self._DATE_PATTERN_1.search(
-                file_name
-            ) or self._DATE_PATTERN_2.search(file_name)
-
-            if not date_match:
-                continue
-
-            date_str = date_match.group(1)  # YYYYMMDD
-            time_str = (date_match.group(2) or "0000")[:4]  # HHMM, default to 0000
-
-            try:
-                file_datetime = datetime.datetime.strptime(
-                    f"{date_str}{time_str}", "%Y%m%d%H%M"
-                )
-                if file_datetime >= cutoff_time:
-                    groups_value.append(file)
-
-            except ValueError:
-                continue
+            timestamp = parse_file_name(by_function(file)).timestamp
+            if timestamp is not None and timestamp >= cutoff_time:
+                groups_value.append(file)
 
         return groups_value
 
@@ -471,24 +494,99 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
                 state.unique_seen.add(k)
                 yield item
 
-    async def session_with_cookies_by_chain(
-        self, url, method="GET", body=None, timeout=15, headers=None
+    def get_transport(self) -> HttpTransport:
+        """the HTTP transport (and connection pool) of this chain, created on first use"""
+        if self._transport is None:
+            self._transport = create_transport(
+                self.transport_type,
+                limit=self.transport_limit,
+                limit_per_host=self.transport_limit_per_host
+                or self.get_concurrency_limiter().max_limit,
+            )
+        return self._transport
+
+    def get_concurrency_limiter(self) -> ConcurrencyLimiter:
+        """the limiter of the parallel downloads of this chain, created on first use"""
+        if self._concurrency_limiter is None:
+            self._concurrency_limiter = create_concurrency_limiter(
+                self.concurrency_limiter_type,
+                limit=self.max_threads,
+                min_limit=min(self.min_concurrency, self.max_threads),
+                max_limit=self.max_concurrency or 3 * self.max_threads,
+            )
+        return self._concurrency_limiter
+
+    async def session_with_cookies_by_chain(  # pylint: disable=too-many-arguments
+        self,
+        url,
+        method="GET",
+        body=None,
+        timeout=15,
+        headers=None,
+        accept_not_modified=False,
     ):
         """request resource with cookie by chain name"""
-        return await asyncio.to_thread(
-            session_with_cookies,
+        return await session_with_cookies_on_transport(
+            self.get_transport(),
             url,
-            chain_cookie_name=self.assigned_cookie,
+            cookie_jar=self.cookie_jar,
             timeout=timeout,
             method=method,
             body=body,
             headers=headers,
+            accept_not_modified=accept_not_modified,
+        )
+
+    async def fetch_listing(self, request, parse, kind="files"):
+        """
+        Request a listing page and parse it, unless it didn't change.
+
+        The request is sent with the validators of the last parse of the
+        same (url, method, body); on 304 the cached parse is returned.
+
+        Args:
+            request: session_with_cookies_by_chain keyword arguments
+            parse: callable(response) returning the parsed value, run in a
+                worker thread so parsing doesn't block the event loop, or a
+                coroutine function awaited on the loop
+            kind: name of the parse, when a page is parsed in several ways
+        """
+        key = ListingCache.key(
+            request["url"], request.get("method", "GET"), request.get("body"), kind
         )
+        conditional_headers = self.listing_cache.conditional_headers(key)
+        response = await self.session_with_cookies_by_chain(
+            **{
+                **request,
+                "headers": {**(request.get("headers") or {}), **conditional_headers},
+            },
+            accept_not_modified=bool(conditional_headers),
+        )
+        if response.status_code == 304:
+            cached = self.listing_cache.get(key)
+            if cached is not None:
+                Logger.debug(f"Listing {request['url']} not modified, reusing it")
+                return cached.value
+            # evicted meanwhile, fetch it unconditionally
+            response = await self.session_with_cookies_by_chain(**request)
+
+        if inspect.iscoroutinefunction(parse):
+            value = parse(response)
+        else:
+            value = await asyncio.to_thread(parse, response)
+        if inspect.isawaitable(value):
+            value = await value
+        self.listing_cache.store(key, response.headers, value)
+        return value
 
     async def _post_scraping(self):
         """job to do post scraping"""
-        if os.path.exists(self.assigned_cookie):
-            os.remove(self.assigned_cookie)
+        if self.cookies_persist_path:
+            self.cookie_jar.persist(self.cookies_persist_path)
+        self.cookie_jar.clear()
+        if self._transport is not None:
+            await self._transport.close()
+            self._transport = None
         await self.storage_path.close()
 
     def _validate_scraper_params(self, limit=None, files_types=None, store_id=None):
@@ -529,6 +627,8 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             limit=limit, files_types=files_types, store_id=store_id
         )
         self.storage_path.make_sure_accassible()
+        if self.cookies_persist_path:
+            self.cookie_jar.restore(self.cookies_persist_path)
         completed_successfully = True
 
         if state is None:
@@ -554,6 +654,7 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             Logger.error(f"Error scraping: {e}")
             completed_successfully = False
         finally:
+            await self.flush_events_async()
             self.on_scrape_completed(
                 self.get_storage_path(), completed_successfully=completed_successfully
             )
@@ -614,12 +715,12 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
     ) -> AsyncGenerator[ScrapingResult, None]:
         """scrape the files with concurrent streaming downloads"""
 
-        # Semaphore to limit concurrent downloads
-        semaphore = asyncio.Semaphore(self.max_threads)
+        # limits the concurrent downloads, adapting to the server's load
+        limiter = self.get_concurrency_limiter()
 
-        # Helper function to process a single file with semaphore
+        # Helper function to process a single file within the limits
         async def process_file_with_semaphore(file_details):
-            async with semaphore:
+            async with limiter, self._download_budget_slot():
                 try:
                     return await self.process_file(file_details)
                 except Exception as e:  # pylint: disable=broad-except
@@ -654,8 +755,8 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
 
         try:
             while True:
-                # Add new tasks from generator up to max_threads limit
-                while not generator_exhausted and len(pending_tasks) < self.max_threads:
+                # Add new tasks from generator up to the current limit
+                while not generator_exhausted and len(pending_tasks) < limiter.limit:
                     try:
                         file_details = (
                             await anext(  # pylint: disable=undefined-variable
@@ -701,6 +802,7 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
                     # This shouldn't happen, but break to be safe
                     break
         finally:
+            Logger.info(f"{self.chain.value}: concurrency limit is {limiter.limit}")
             # Clean up any remaining tasks
             await files_generator.aclose()
             if pending_tasks:
@@ -709,6 +811,12 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
                 # Wait for cancellations to complete
                 await asyncio.gather(*pending_tasks, return_exceptions=True)
 
+    def _download_budget_slot(self):
+        """a slot of the shared download budget, if the chain has one"""
+        if self.download_budget is None:
+            return contextlib.nullcontext()
+        return self.download_budget.slot(self.chain.value)
+
     def get_chain_id(self):
         """get the chain id as list"""
         if isinstance(self.chain_id, list):
@@ -755,21 +863,57 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
             if self.is_pass_file_size_filter(entry.size, min_size, max_size):
                 yield entry
 
+    def _resumable_transport_stream(self, file_link, timeout, cookies=None):
+        """the file as byte chunks, continued with a Range request after drops"""
+        transport = self.get_transport()
+
+        def open_stream(progress):
+            return transport.stream(
+                file_link, timeout=timeout, progress=progress, cookies=cookies
+            )
+
+        return resumable_stream(open_stream)
+
     @async_url_connection_retry()
     async def retrieve_file_to_memory(self, file_link, timeout=30):
         """download file directly to memory"""
-        return await asyncio.to_thread(
-            url_retrieve_to_memory, file_link, timeout=timeout
-        )
+        file_buffer = io.BytesIO()
+        async for chunk in self._resumable_transport_stream(file_link, timeout):
+            file_buffer.write(chunk)
+        return file_buffer.getvalue()
+
+    async def retrieve_file_to_stream(self, file_link, timeout=30):
+        """download file as a stream of byte chunks"""
+        async for chunk in self._resumable_transport_stream(file_link, timeout):
+            yield chunk
+
+    async def count_downloaded_bytes(self, chunks):
+        """pass chunks through, adding their size to downloaded_bytes"""
+        async for chunk in chunks:
+            self.downloaded_bytes += len(chunk)
+            yield chunk
+
+    @async_url_connection_retry()
+    async def stream_file_to_output(self, file_link, file_name, metadata, timeout=30):
+        """stream the file into the file output, restarting on connection errors"""
+        async with self.get_concurrency_limiter().track():
+            return await self.storage_path.save_stream(
+                file_link=file_link,
+                file_name=file_name,
+                chunks=self.count_downloaded_bytes(
+                    self.retrieve_file_to_stream(file_link, timeout=timeout)
+                ),
+                metadata=metadata,
+            )
 
     async def _wget_file_to_memory(self, file_link, timeout):
         return await wget_file_to_memory(file_link, timeout)
 
     async def save_and_extract(self, arg):
-        """download file and extract it (in-memory)"""
+        """download file and extract it (streamed into the file output)"""
 
         file_link, file_name = arg
-        Logger.debug(f"Processing {file_link} (in-memory)")
+        Logger.debug(f"Processing {file_link} (streaming)")
 
         # Download the file content first
         downloaded = False
@@ -785,31 +929,32 @@ class Engine(ScraperStatus, ABC):  # pylint: disable=too-many-public-methods
 
                 file_name_with_ext = file_name + "." + file_link.split(".")[-1]
 
-            # Download file content directly to memory
+            metadata = {
+                "chain": self.chain.value,
+                "chain_id": self.chain_id,
+                "original_filename": file_name,
+            }
+
+            # Stream the file content into the file output handler
             try:
-                file_content = await self.retrieve_file_to_memory(file_link, timeout=30)
+                result = await self.stream_file_to_output(
+                    file_link, file_name_with_ext, metadata, timeout=30
+                )
 
+            except RestartSessionError:
+                raise
             except Exception as e:  # pylint: disable=broad-except
                 Logger.warning(f"Error downloading {file_link}: {e}")
                 file_content = await self._wget_file_to_memory(file_link, timeout=30)
+                self.downloaded_bytes += len(file_content)
+                result = await self.storage_path.save_file(
+                    file_link=file_link,
+                    file_name=file_name_with_ext,
+                    file_content=file_content,
+                    metadata=metadata,
+                )
             downloaded = True
 
-            # Log file size if it's a gzip file
-            if file_name_with_ext.endswith(".gz"):
-                Logger.debug(f"File size is {len(file_content)} bytes.")
-
-            # Use the file output handler to save
-            result = await self.storage_path.save_file(
-                file_link=file_link,
-                file_name=file_name_with_ext,
-                file_content=file_content,
-                metadata={
-                    "chain": self.chain.value,
-                    "chain_id": self.chain_id,
-                    "original_filename": file_name,
-                },
-            )
-
             return ScrapingResult(
                 file_name=file_name,
                 downloaded=downloaded,
@@ -1,8 +1,37 @@
-from bs4 import BeautifulSoup
-from il_supermarket_scarper.utils import Logger
+from il_supermarket_scarper.utils import (
+    ListingCache,
+    Logger,
+    parse_table_rows,
+    shared_listings,
+)
 from .apsx import Aspx
 
 
+class RowsByChain:
+    """
+    The rows of a portal page, by the chain they mention.
+
+    A row is the chain's when one of its cells is the chain name or its text
+    contains it. The rows of every name are collected once and remembered.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._by_name = {}
+
+    def rows_of(self, chain_hebrew_name):
+        """the rows mentioning the chain in page order, all of them when it has no name"""
+        if not chain_hebrew_name:
+            return self.rows
+        if chain_hebrew_name not in self._by_name:
+            self._by_name[chain_hebrew_name] = [
+                row
+                for row in self.rows
+                if chain_hebrew_name in row.cells or chain_hebrew_name in row.text
+            ]
+        return self._by_name[chain_hebrew_name]
+
+
 class Matrix(Aspx):
     """scraper for all matrix base site.
     (support adveanced search: follow the instrucation the page)"""
@@ -46,20 +75,45 @@ class Matrix(Aspx):
 
     def get_href_from_entry(self, entry):
         """get download link for entry (tr)"""
-        return entry.a.attrs["href"]
+        return entry.href
 
     def get_file_name_no_ext_from_entry(self, entry):
         """get the file name without extensions from entey (tr)"""
         return entry.split("/")[-1].split(".gz")[0].split(".")[0]
 
-    def get_data_from_page(self, req_res):
-        soup = BeautifulSoup(req_res.text, features="lxml")
-        all_trs = list(soup.find_all("tr"))[1:]  # skip title
-
+    @staticmethod
+    def index_rows_by_chain(req_res):
+        """parse the page once into its rows, indexed by chain"""
+        all_trs = parse_table_rows(req_res.text)[1:]  # skip title
         Logger.info(f"Before filtring names found {len(all_trs)} entries")
-        if self.chain_hebrew_name:
-            all_trs = list(
-                filter(lambda x: x and self.chain_hebrew_name in str(x), all_trs)
-            )
-            Logger.info(f"After filtering names found {len(all_trs)} entries")
+        return RowsByChain(all_trs)
+
+    def get_data_from_page(self, req_res):
+        all_trs = self.index_rows_by_chain(req_res).rows_of(self.chain_hebrew_name)
+        Logger.info(f"After filtering names found {len(all_trs)} entries")
         return all_trs
+
+    async def fetch_page_entries(self, request):
+        """
+        The entries of the chain in the portal page.
+
+        The page lists the files of all the chains hosted on the portal, it is
+        fetched and indexed once for all of them (see SharedListings).
+        """
+        key = ListingCache.key(
+            request["url"],
+            request.get("method", "GET"),
+            request.get("body"),
+            kind="rows_by_chain",
+        )
+        rows = await shared_listings.get_or_fetch(
+            key,
+            lambda: self.fetch_listing(
+                request, self.index_rows_by_chain, kind="rows_by_chain"
+            ),
+        )
+        all_trs = rows.rows_of(self.chain_hebrew_name)
+        Logger.info(f"After filtering names found {len(all_trs)} entries")
+        return [
+            file_entry async for file_entry in self.extract_task_from_entry(all_trs)
+        ]
@@ -1,7 +1,7 @@
 from urllib.parse import urlsplit
 import re
 import ntpath
-import asyncio
+import contextlib
 from abc import abstractmethod
 from typing import AsyncGenerator
 from lxml import html as lxml_html
@@ -14,6 +14,7 @@ from il_supermarket_scarper.utils import (
     convert_nl_size_to_bytes,
     UnitSize,
     FilterState,
+    stream_in_parallel,
 )
 from .web import WebBase
 
@@ -85,6 +86,19 @@ class MultiPageWeb(WebBase):
 
         return int(pages[0])
 
+    def page_request(self, request, page_number):
+        """the request of a page of the listing of request"""
+        return {
+            **request,
+            "url": request["url"] + f"{self.page_argument}={page_number}",
+        }
+
+    def parse_first_page(self, response):
+        """the number of pages and the files of the first page of a listing"""
+        return self.get_number_of_pages(response), self.collect_files_details_from_page(
+            lxml_html.fromstring(response.text)
+        )
+
     async def generate_all_files(
         self,
         files_types=None,
@@ -93,61 +107,63 @@ class MultiPageWeb(WebBase):
         limit=None,
         random_selection=False,
     ) -> AsyncGenerator[FileEntry, None]:
-        """generate all files from the site"""
+        """
+        generate all files from the site, page by page.
 
+        The first response gives both the number of pages and the first page.
+        The other pages are requested listing_concurrency at a time, and only
+        while the files are consumed, so a satisfied limit stops the requests.
+        """
+        filters = {
+            "limit": limit,
+            "files_types": files_types,
+            "store_id": store_id,
+            "when_date": when_date,
+            "random_selection": random_selection,
+        }
         async for main_page_request in self.get_request_url(
             files_types=files_types, store_id=store_id, when_date=when_date
         ):
 
-            main_page_response = await self.session_with_cookies_by_chain(
-                **main_page_request
+            total_pages, first_page = await self.fetch_listing(
+                main_page_request, self.parse_first_page, kind="first_page"
             )
-
-            total_pages = self.get_number_of_pages(main_page_response)
             Logger.info(f"Found {total_pages} pages")
 
-            # if there is only one page, call it again,
-            # in the future, we can skip scrap it again
-            if total_pages is None:
-                pages_to_scrape = [main_page_request]
-            else:
-                pages_to_scrape = list(
-                    map(
-                        lambda page_number, req=main_page_request: {
-                            **req,
-                            "url": req["url"]
-                            + f"{self.page_argument}="
-                            + str(page_number),
-                        },
-                        range(1, total_pages + 1),
-                    )
-                )
-
             # we pass the state between pages to keep the total input count
             # we don't pass the state to the process_links_before_download function
             # becuase later in the apply_limit function we will pass the state
             # to the apply_limit function
             cross_pages_state = FilterState()
-            # Process pages in parallel using asyncio.gather
+            async for entry in self.filter_page_entries(
+                cross_pages_state, main_page_request, first_page, **filters
+            ):
+                yield entry
+
+            # only one page, already scraped
+            if total_pages is None:
+                continue
 
             async def process_single_page(req, state=cross_pages_state):
-                results = []
-                async for task in self.process_links_before_download(
-                    state,
-                    req,
-                    limit=limit,
-                    files_types=files_types,
-                    store_id=store_id,
-                    when_date=when_date,
-                    random_selection=random_selection,
-                ):
-                    results.append(task)
-                return results
-
-            tasks = [process_single_page(req) for req in pages_to_scrape]
-            for task_group in await asyncio.gather(*tasks):
-                for task in task_group:
-                    yield task
+                return [
+                    entry
+                    async for entry in self.process_links_before_download(
+                        state, req, **filters
+                    )
+                ]
+
+            pages = stream_in_parallel(
+                process_single_page,
+                (
+                    self.page_request(main_page_request, page_number)
+                    for page_number in range(2, total_pages + 1)
+                ),
+                self.listing_concurrency,
+            )
+            async with contextlib.aclosing(pages):
+                async for page_entries in pages:
+                    for entry in page_entries:
+                        yield entry
 
     async def collect_files_details_from_site(  # pylint: disable=too-many-locals
         self,
@@ -280,11 +296,36 @@ class MultiPageWeb(WebBase):
     ):
         """additional processing to the links before download"""
 
-        response = await self.session_with_cookies_by_chain(**request)
-
-        html = lxml_html.fromstring(response.text)
+        page = await self.fetch_listing(
+            request,
+            lambda response: self.collect_files_details_from_page(
+                lxml_html.fromstring(response.text)
+            ),
+        )
+        async for entry in self.filter_page_entries(
+            state,
+            request,
+            page,
+            files_types=files_types,
+            store_id=store_id,
+            when_date=when_date,
+            random_selection=random_selection,
+        ):
+            yield entry
 
-        file_links, filenames, file_sizes = self.collect_files_details_from_page(html)
+    async def filter_page_entries(  # pylint: disable=too-many-arguments
+        self,
+        state: FilterState,
+        request,
+        page,
+        limit=None,  # pylint: disable=unused-argument
+        files_types=None,
+        store_id=None,
+        when_date=None,
+        random_selection=False,
+    ):
+        """filter the (links, names, sizes) of a page, without the limit"""
+        file_links, filenames, file_sizes = page
         Logger.info(f"Page {request}: Found {len(file_links)} files")
 
         # Create an async generator from the three lists
@@ -1,7 +1,6 @@
 import json
-from bs4 import BeautifulSoup
 
-from il_supermarket_scarper.utils import FileEntry
+from il_supermarket_scarper.utils import FileEntry, parse_script_texts
 from il_supermarket_scarper.utils.logger import Logger
 from .web import WebBase
 
@@ -45,10 +44,8 @@ class PublishPrice(WebBase):
         yield {"url": self.url + formated, "method": "GET"}
 
     def get_data_from_page(self, req_res):
-        soup = BeautifulSoup(req_res.text, features="lxml")
-
         # the developer hard-coded the files names in the html
-        script_text = soup.find_all("script")[-2].text
+        script_text = parse_script_texts(req_res.text)[-2]
 
         # Extract path (date folder)
         path_data = script_text.split("const path = ")[1]
@@ -0,0 +1,58 @@
+"""A local HTTP server for the tests of the engines and transports."""
+
+import contextlib
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """a keep-alive request handler that doesn't log, to answer tests from"""
+
+    protocol_version = "HTTP/1.1"
+
+    def reply(self, status, body, headers=None):
+        """send a complete response"""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """keep the test output clean"""
+
+
+@contextlib.contextmanager
+def local_http_server(handler):
+    """serve handler on a local port in a thread, yielding the base url"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class LocalServerTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    A test case with a local server of handler and a temporary folder.
+
+    self.url is the base url of the server (no trailing slash) and
+    self.tmpdir the folder, both fresh for every test.
+    """
+
+    handler = QuietHandler
+
+    async def asyncSetUp(self):
+        self._server = contextlib.ExitStack()
+        self.url = self._server.enter_context(local_http_server(self.handler))
+        self.tmpdir = tempfile.mkdtemp()
+
+    async def asyncTearDown(self):
+        self._server.close()
+        shutil.rmtree(self.tmpdir)
@@ -0,0 +1,157 @@
+"""Tests for the concurrent branch listing of the laibcatalog API engines."""
+
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from il_supermarket_scarper.engines.tests.local_server import (
+    LocalServerTestCase,
+    QuietHandler,
+)
+from il_supermarket_scarper.scrappers.het_cohen import HetCohenNewSource
+from il_supermarket_scarper.utils import (
+    DiskFileOutput,
+    DumpFolderNames,
+    FilterState,
+    JsonDataBase,
+)
+
+BRANCHES = 8
+
+
+class _LaibcatalogHandler(QuietHandler):
+    """a laibcatalog API, whose getfiles may ignore the branch"""
+
+    lock = threading.Lock()
+    branch_agnostic = True
+    failing_branch = None
+    getfiles = []
+    in_flight = 0
+    most_in_flight = 0
+
+    def _files(self, branch):
+        """the getfiles answer of a branch (None for the whole chain)"""
+        branches = range(1, BRANCHES + 1) if branch is None else [branch]
+        if self.branch_agnostic:
+            branches = range(1, BRANCHES + 1)
+        return [
+            {
+                "fileName": f"PriceFull7290696200003-{number:03d}-202601121522.xml.gz",
+                "fileType": "pricefull",
+                "fileSize": "1 KB",
+            }
+            for number in branches
+        ]
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer getbranches and getfiles"""
+        cls = type(self)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("getbranches"):
+            body = [{"number": number} for number in range(1, BRANCHES + 1)]
+        else:
+            branch = query.get("branchNumber")
+            branch = int(branch[0]) if branch else None
+            with cls.lock:
+                cls.getfiles.append(branch)
+                cls.in_flight += 1
+                cls.most_in_flight = max(cls.most_in_flight, cls.in_flight)
+            time.sleep(0.05)
+            with cls.lock:
+                cls.in_flight -= 1
+            body = self._files(branch)
+            if branch is not None and branch == cls.failing_branch:
+                # fail once
+                cls.failing_branch = None
+                self.send_error(500)
+                return
+        self.reply(200, json.dumps(body).encode(), {"Content-Type": "application/json"})
+
+
+class TestLaibcatalogBranches(LocalServerTestCase):
+    """Validate the branches are listed concurrently, and once when identical."""
+
+    handler = _LaibcatalogHandler
+
+    async def asyncSetUp(self):
+        _LaibcatalogHandler.getfiles = []
+        _LaibcatalogHandler.failing_branch = None
+        _LaibcatalogHandler.most_in_flight = 0
+        await super().asyncSetUp()
+        self.engine = HetCohenNewSource(
+            file_output=DiskFileOutput(self.tmpdir),
+            status_database=JsonDataBase(
+                DumpFolderNames.HET_COHEN_NEW_SOURCE.value, self.tmpdir
+            ),
+        )
+        self.engine.url = self.url
+        self.engine.listing_concurrency = 3
+
+    async def asyncTearDown(self):
+        await self.engine.get_transport().close()
+        await super().asyncTearDown()
+
+    async def _listed_files(self):
+        """the names of the files the engine would download"""
+        return sorted(
+            [
+                file_name
+                async for _, file_name in self.engine.collect_files_details_from_site(
+                    FilterState()
+                )
+            ]
+        )
+
+    async def test_identical_branches_listed_once(self):
+        """A getfiles ignoring the branch is called for the chain only."""
+        _LaibcatalogHandler.branch_agnostic = True
+        first = await self._listed_files()
+        # the chain and the first branch, to compare them
+        self.assertEqual(sorted(_LaibcatalogHandler.getfiles, key=str), [1, None])
+
+        _LaibcatalogHandler.getfiles = []
+        second = await self._listed_files()
+        self.assertEqual(_LaibcatalogHandler.getfiles, [None])
+        self.assertEqual(len(first), BRANCHES)
+        self.assertEqual(first, second)
+
+    async def test_probe_repeated_every_pass(self):
+        """What was learned of the branches is forgotten after a pass."""
+        _LaibcatalogHandler.branch_agnostic = True
+        await self._listed_files()
+        await self.engine._post_scraping()  # pylint: disable=protected-access
+
+        _LaibcatalogHandler.branch_agnostic = False
+        _LaibcatalogHandler.getfiles = []
+        files = await self._listed_files()
+        self.assertEqual(len(files), BRANCHES)
+        self.assertEqual(
+            sorted(_LaibcatalogHandler.getfiles, key=str),
+            list(range(1, BRANCHES + 1)) + [None],
+        )
+
+    async def test_branches_listed_concurrently(self):
+        """Different branches are all listed, listing_concurrency at a time."""
+        _LaibcatalogHandler.branch_agnostic = False
+        files = await self._listed_files()
+
+        self.assertEqual(len(files), BRANCHES)
+        self.assertEqual(
+            sorted(_LaibcatalogHandler.getfiles, key=str),
+            list(range(1, BRANCHES + 1)) + [None],
+        )
+        self.assertEqual(_LaibcatalogHandler.most_in_flight, 3)
+
+    async def test_failed_probe_branch_listed(self):
+        """A branch whose comparison call failed is still listed."""
+        _LaibcatalogHandler.branch_agnostic = False
+        _LaibcatalogHandler.failing_branch = 1
+        files = await self._listed_files()
+
+        self.assertEqual(len(files), BRANCHES)
+        self.assertEqual(_LaibcatalogHandler.getfiles.count(1), 2)
+        # nothing was learned from the failed comparison
+        learned = self.engine._branch_agnostic  # pylint: disable=protected-access
+        self.assertNotIn("7290455000004", learned)
@@ -1,11 +1,16 @@
-"""Tests for engine-level deduplication logic (filter_already_downloaded)."""
+"""Tests for engine-level filtering and deduplication logic."""
 
+import datetime
 import tempfile
 import unittest
 
+from il_supermarket_scarper.scrappers.wolt import Wolt
 from il_supermarket_scarper.scrappers_factory import ScraperFactory
 from il_supermarket_scarper.utils import (
+    DiskFileOutput,
     DumpFolderNames,
+    FilterState,
+    JsonDataBase,
     QueueFileOutput,
     InMemoryQueueHandler,
     get_output_folder,
@@ -68,3 +73,85 @@ class TestEngineDeduplication(unittest.IsolatedAsyncioTestCase):
                 0,
                 f"{first_file} should not be downloaded again but got {second_results}",
             )
+
+
+class TestEngineFilters(unittest.IsolatedAsyncioTestCase):
+    """Validate the name filters keep the files they were asked for."""
+
+    async def asyncSetUp(self):
+        self.tmpdir = (
+            tempfile.TemporaryDirectory()
+        )  # pylint: disable=consider-using-with
+        self.engine = Wolt(
+            file_output=DiskFileOutput(self.tmpdir.name),
+            status_database=JsonDataBase(DumpFolderNames.WOLT.value, self.tmpdir.name),
+        )
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    @staticmethod
+    async def _names(*names):
+        for name in names:
+            yield name
+
+    async def test_file_of_several_types(self):
+        """A file is kept when any of its types is requested, not only the first."""
+        kept = [
+            name
+            async for name in self.engine.filter_file_types(
+                FilterState(),
+                self._names("StorePrice7290058249350-001-202601121522", "Promo7290058"),
+                limit=None,
+                files_types=["PRICE_FILE"],
+                by_function=lambda name: name,
+            )
+        ]
+
+        self.assertEqual(kept, ["StorePrice7290058249350-001-202601121522"])
+
+    async def test_store_of_unparsed_names(self):
+        """Names without a parsed store, and non numeric stores, match a segment."""
+        names = (
+            "Price7290172900007-001-20250101123456.gz",
+            "Price7290172900007-002-20250101123456.gz",
+            "Price7290172900007-001-latest.gz",
+        )
+        kept = [
+            name
+            async for name in self.engine.filter_by_store_id(
+                self._names(*names), store_id=1, by_function=lambda name: name
+            )
+        ]
+        self.assertEqual(kept, [names[0], names[2]])
+
+        kept = [
+            name
+            async for name in self.engine.filter_by_store_id(
+                self._names(*names), store_id="01a", by_function=lambda name: name
+            )
+        ]
+        self.assertEqual(kept, [])
+
+    async def test_date_of_unparsed_names(self):
+        """Names without a parsed date match the date as a substring."""
+        kept = [
+            name
+            async for name in self.engine.get_by_date(
+                datetime.datetime(2025, 1, 1),
+                lambda name: name,
+                self._names(
+                    "Price7290172900007-001-20250101123456.gz",
+                    "Price7290172900007-001-20250101_1234.gz",
+                    "Price7290172900007-001-202501021234.gz",
+                ),
+            )
+        ]
+
+        self.assertEqual(
+            kept,
+            [
+                "Price7290172900007-001-20250101123456.gz",
+                "Price7290172900007-001-20250101_1234.gz",
+            ],
+        )
@@ -0,0 +1,75 @@
+"""Tests for the conditional-GET cache of listing pages."""
+
+import threading
+
+from il_supermarket_scarper.engines.tests.local_server import (
+    LocalServerTestCase,
+    QuietHandler,
+)
+from il_supermarket_scarper.engines.web import WebBase
+from il_supermarket_scarper.utils import DiskFileOutput, DumpFolderNames, JsonDataBase
+
+LISTING = (
+    b"<html><body><table><tr><th>name</th></tr>"
+    b'<tr><td><a href="PriceFull7290058249350-001-202601121522.gz">f</a></td></tr>'
+    b'<tr><td><a href="Promo7290058249350-001-202601121522.gz">f</a></td></tr>'
+    b"</table></body></html>"
+)
+
+
+class _ListingHandler(QuietHandler):
+    """serve a listing page with an ETag, answering 304 when it matches"""
+
+    statuses = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer the listing"""
+        status = 304 if self.headers.get("If-None-Match") == '"v1"' else 200
+        self.statuses.append(status)
+        self.reply(status, LISTING if status == 200 else b"", {"ETag": '"v1"'})
+
+
+class TestListingCache(LocalServerTestCase):
+    """Validate unchanged listing pages are neither transferred nor parsed again."""
+
+    handler = _ListingHandler
+
+    async def asyncSetUp(self):
+        _ListingHandler.statuses = []
+        await super().asyncSetUp()
+
+    async def test_not_modified_listing_reused(self):
+        """The second pass gets a 304 and reuses the parsed entries."""
+        engine = WebBase(
+            DumpFolderNames.WOLT,
+            "7290058249350",
+            url=f"{self.url}/",
+            file_output=DiskFileOutput(self.tmpdir),
+            status_database=JsonDataBase(DumpFolderNames.WOLT.value, self.tmpdir),
+        )
+        parses = []
+        get_data_from_page = engine.get_data_from_page
+
+        def counting_get_data_from_page(req_res):
+            parses.append(req_res.status_code)
+            # parsed in a worker thread, off the event loop
+            self.assertIsNot(threading.current_thread(), threading.main_thread())
+            return get_data_from_page(req_res)
+
+        engine.get_data_from_page = counting_get_data_from_page
+        try:
+            first = [entry async for entry in engine.generate_all_files()]
+            second = [entry async for entry in engine.generate_all_files()]
+        finally:
+            await engine.get_transport().close()
+
+        self.assertEqual(
+            [entry.name for entry in first],
+            [
+                "PriceFull7290058249350-001-202601121522",
+                "Promo7290058249350-001-202601121522",
+            ],
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(_ListingHandler.statuses, [200, 304])
+        self.assertEqual(parses, [200])
@@ -0,0 +1,149 @@
+"""Tests for sharing the portal page between the Matrix chains."""
+
+import asyncio
+import time
+import unittest
+
+from il_supermarket_scarper.engines.matrix import RowsByChain
+from il_supermarket_scarper.engines.tests.local_server import (
+    LocalServerTestCase,
+    QuietHandler,
+)
+from il_supermarket_scarper.scrappers.het_cohen import HetCohen
+from il_supermarket_scarper.scrappers.victory import Victory
+from il_supermarket_scarper.utils import (
+    DiskFileOutput,
+    DumpFolderNames,
+    JsonDataBase,
+    ListingRow,
+    SharedListings,
+    shared_listings,
+)
+
+ROWS = {"ח. כהן": ("7290455000004", 3), "ויקטורי": ("7290696200003", 5)}
+
+
+def _portal_page():
+    """the portal table, with the rows of the chains interleaved"""
+    rows = ["<tr><th>file</th><th>chain</th><th>size</th></tr>"]
+    for index in range(max(count for _, count in ROWS.values())):
+        for name, (chain_id, count) in ROWS.items():
+            if index < count:
+                rows.append(
+                    f'<tr><td><a href="files/PriceFull{chain_id}-{index:03d}-'
+                    f'202601121522.xml.gz">f</a></td><td>{name}</td>'
+                    "<td>1 KB</td></tr>"
+                )
+    return f"<html><body><table>{''.join(rows)}</table></body></html>".encode()
+
+
+class _PortalHandler(QuietHandler):
+    """serve the portal page slowly, counting the requests"""
+
+    requests = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer the portal page"""
+        type(self).requests += 1
+        time.sleep(0.1)
+        self.reply(200, _portal_page())
+
+
+class TestSharedPortalPage(LocalServerTestCase):
+    """Validate the chains of a portal fetch and parse its page once."""
+
+    handler = _PortalHandler
+
+    async def asyncSetUp(self):
+        _PortalHandler.requests = 0
+        shared_listings.clear()
+        await super().asyncSetUp()
+        self.engines = [
+            chain(
+                file_output=DiskFileOutput(self.tmpdir),
+                status_database=JsonDataBase(folder.value, self.tmpdir),
+            )
+            for chain, folder in (
+                (HetCohen, DumpFolderNames.HET_COHEN),
+                (Victory, DumpFolderNames.VICTORY),
+            )
+        ]
+        for engine in self.engines:
+            engine.url = f"{self.url}/"
+
+    async def asyncTearDown(self):
+        for engine in self.engines:
+            await engine.get_transport().close()
+        shared_listings.clear()
+        await super().asyncTearDown()
+
+    async def _entries(self, engine):
+        """the names of the entries the engine lists"""
+        return [entry.name async for entry in engine.generate_all_files()]
+
+    async def test_chains_share_the_page(self):
+        """Chains listing together get their own rows of a single request."""
+        het_cohen, victory = await asyncio.gather(
+            *(self._entries(engine) for engine in self.engines)
+        )
+
+        self.assertEqual(_PortalHandler.requests, 1)
+        self.assertEqual(
+            het_cohen,
+            [f"PriceFull7290455000004-{index:03d}-202601121522" for index in range(3)],
+        )
+        self.assertEqual(
+            victory,
+            [f"PriceFull7290696200003-{index:03d}-202601121522" for index in range(5)],
+        )
+
+        # listed again within the ttl
+        await self._entries(self.engines[0])
+        self.assertEqual(_PortalHandler.requests, 1)
+
+    async def test_expired_page_is_fetched_again(self):
+        """A shared page is fetched again once it expires."""
+        calls = []
+
+        async def fetch():
+            calls.append(None)
+            return len(calls)
+
+        listings = SharedListings(ttl=0)
+        self.assertEqual(await listings.get_or_fetch("page", fetch), 1)
+        self.assertEqual(await listings.get_or_fetch("page", fetch), 2)
+
+    async def test_failed_fetch_is_not_shared(self):
+        """A failed fetch fails its waiters and isn't kept."""
+        listings = SharedListings()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ConnectionError("portal down")
+
+        results = await asyncio.gather(
+            listings.get_or_fetch("page", fail),
+            listings.get_or_fetch("page", fail),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, ConnectionError) for r in results))
+        self.assertEqual(len(listings), 0)
+
+
+class TestRowsByChain(unittest.TestCase):
+    """Validate the rows of a chain are found by cell and by text."""
+
+    def test_exact_and_substring_rows_merged(self):
+        """Rows naming the chain in a cell or inside a text are both kept, in order."""
+        rows = [
+            ListingRow(None, None, None, text, cells)
+            for text, cells in (
+                ("a ח. כהן", ("a", "ח. כהן")),
+                ("b ויקטורי", ("b", "ויקטורי")),
+                ("c ח. כהן סניף 3", ("c", "ח. כהן סניף 3")),
+                ("d ח. כהן", ("d", "ח. כהן")),
+            )
+        ]
+        found = RowsByChain(rows).rows_of("ח. כהן")
+
+        self.assertEqual([row.cells[0] for row in found], ["a", "c", "d"])
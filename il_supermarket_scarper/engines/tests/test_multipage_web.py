@@ -0,0 +1,160 @@
+"""Tests for streaming the pages of a multipage listing and its downloads."""
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from il_supermarket_scarper.engines.multipage_web import MultiPageWeb
+from il_supermarket_scarper.engines.tests.local_server import (
+    LocalServerTestCase,
+    QuietHandler,
+)
+from il_supermarket_scarper.scrappers.super_pharm import SuperPharm
+from il_supermarket_scarper.utils import DiskFileOutput, DumpFolderNames, JsonDataBase
+
+FILES_IN_PAGE = 3
+FILE_CONTENT = bytes(range(256)) * 1024
+
+
+def _page(page_number, total_pages):
+    """a listing page, linking to the last page when there are several"""
+    rows = "".join(
+        f'<tr><td><a href="/files/PriceFull7290027600007-{page_number:03d}-'
+        f'20260112152{index}.gz">f</a></td><td></td><td>1 KB</td></tr>'
+        for index in range(FILES_IN_PAGE)
+    )
+    footer = (
+        f'<tfoot><tr><td><a href="/?page={total_pages}">last</a></td></tr></tfoot>'
+        if total_pages > 1
+        else ""
+    )
+    return (
+        f'<html><body><div id="gridContainer"><table><tbody>{rows}</tbody>'
+        f"{footer}</table></div></body></html>"
+    ).encode()
+
+
+class _PagesHandler(QuietHandler):
+    """serve total_pages listing pages, recording the pages requested"""
+
+    total_pages = 1
+    requested = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer a page, the first one without a page argument"""
+        page = parse_qs(urlsplit(self.path).query).get("page")
+        self.requested.append(page[0] if page else None)
+        self.reply(200, _page(int(page[0]) if page else 1, self.total_pages))
+
+
+class _Listing(MultiPageWeb):
+    """a multipage listing of the test server"""
+
+    listing_concurrency = 2
+
+    def __init__(self, url, folder):
+        super().__init__(
+            DumpFolderNames.SHUFERSAL,
+            "7290027600007",
+            url=url,
+            total_page_xpath='//*[@id="gridContainer"]/table/tfoot/tr/td/a/@href',
+            total_pages_pattern=r"page=(\d+)$",
+            file_output=DiskFileOutput(folder),
+            status_database=JsonDataBase(DumpFolderNames.SHUFERSAL.value, folder),
+        )
+
+    def build_params(self, files_types=None, store_id=None, when_date=None):
+        return ["?"]
+
+
+class TestMultiPageWeb(LocalServerTestCase):
+    """Validate the pages are streamed, bounded and requested once."""
+
+    handler = _PagesHandler
+
+    async def asyncSetUp(self):
+        _PagesHandler.requested = []
+        await super().asyncSetUp()
+        self.engine = _Listing(f"{self.url}/", self.tmpdir)
+
+    async def asyncTearDown(self):
+        await self.engine.get_transport().close()
+        await super().asyncTearDown()
+
+    async def test_single_page_requested_once(self):
+        """The first response is the only page, it isn't requested again."""
+        _PagesHandler.total_pages = 1
+        entries = [entry async for entry in self.engine.generate_all_files()]
+
+        self.assertEqual(len(entries), FILES_IN_PAGE)
+        self.assertEqual(_PagesHandler.requested, [None])
+
+    async def test_all_pages_streamed(self):
+        """Every page is requested once, the first one reused."""
+        _PagesHandler.total_pages = 5
+        entries = [entry async for entry in self.engine.generate_all_files()]
+
+        self.assertEqual(len(entries), 5 * FILES_IN_PAGE)
+        self.assertEqual(len({entry.name for entry in entries}), 5 * FILES_IN_PAGE)
+        self.assertEqual(sorted(_PagesHandler.requested[1:]), ["2", "3", "4", "5"])
+        self.assertEqual(entries[0].size, 1024)
+
+    async def test_stops_requesting_pages(self):
+        """A consumer that stops early stops the page requests."""
+        _PagesHandler.total_pages = 50
+        files = self.engine.generate_all_files()
+        entries = []
+        async for entry in files:
+            entries.append(entry)
+            if len(entries) == FILES_IN_PAGE + 1:
+                break
+        await files.aclose()
+
+        # the first page, and at most a batch of listing_concurrency pages:
+        # a cancelled request may not have reached the server
+        self.assertIn(len(_PagesHandler.requested), [2, 3])
+
+
+class _SuperPharmHandler(QuietHandler):
+    """resolve a download link setting a cookie, serve the file to that cookie"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer the link resolution or the file"""
+        if self.path.startswith("/Download"):
+            body = json.dumps({"href": "files/PriceFull.gz"}).encode()
+            self.reply(200, body, {"Set-Cookie": "session=abc"})
+        elif self.headers.get("Cookie") == "session=abc":
+            self.reply(200, FILE_CONTENT)
+        else:
+            self.reply(403, b"")
+
+
+class TestSuperPharmStream(LocalServerTestCase):
+    """Validate Super Pharm files are streamed with the session cookies."""
+
+    handler = _SuperPharmHandler
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.engine = SuperPharm(
+            file_output=DiskFileOutput(self.tmpdir),
+            status_database=JsonDataBase(
+                DumpFolderNames.SUPER_PHARM.value, self.tmpdir
+            ),
+        )
+        self.engine.url = f"{self.url}/"
+
+    async def asyncTearDown(self):
+        await self.engine.get_transport().close()
+        await super().asyncTearDown()
+
+    async def test_file_streamed_in_chunks(self):
+        """The file arrives in several chunks, not as one body."""
+        chunks = [
+            chunk
+            async for chunk in self.engine.retrieve_file_to_stream(
+                self.engine.url + "Download/PriceFull.gz"
+            )
+        ]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), FILE_CONTENT)
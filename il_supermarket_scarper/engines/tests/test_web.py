@@ -0,0 +1,109 @@
+"""Tests for the concurrent listing requests of the web engines."""
+
+import threading
+import time
+
+from il_supermarket_scarper.engines.tests.local_server import (
+    LocalServerTestCase,
+    QuietHandler,
+)
+from il_supermarket_scarper.engines.web import WebBase
+from il_supermarket_scarper.utils import DiskFileOutput, DumpFolderNames, JsonDataBase
+from il_supermarket_scarper.utils.state import FilterState
+
+LISTINGS = 6
+
+
+class _SlowListingHandler(QuietHandler):
+    """serve a one-file listing per path, slowly, counting requests in flight"""
+
+    lock = threading.Lock()
+    in_flight = 0
+    most_in_flight = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer the listing of the path"""
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.most_in_flight = max(cls.most_in_flight, cls.in_flight)
+        # the first listing is the slowest
+        time.sleep(0.4 if self.path == "/0" else 0.1)
+        with cls.lock:
+            cls.in_flight -= 1
+        index = int(self.path.strip("/"))
+        body = (
+            "<html><body><table><tr><th>name</th></tr>"
+            f'<tr><td><a href="PriceFull7290058249350-{index:03d}-202601121522.gz">'
+            "f</a></td></tr></table></body></html>"
+        ).encode()
+        self.reply(200, body)
+
+
+class _Listings(WebBase):
+    """LISTINGS listings of the test server"""
+
+    listing_concurrency = 3
+
+    async def get_request_url(self, files_types=None, store_id=None, when_date=None):
+        for index in range(LISTINGS):
+            yield {"url": f"{self.url}{index}", "method": "GET"}
+
+
+class TestWebListings(LocalServerTestCase):
+    """Validate the listings are requested concurrently, up to the bound."""
+
+    handler = _SlowListingHandler
+
+    async def asyncSetUp(self):
+        _SlowListingHandler.in_flight = 0
+        _SlowListingHandler.most_in_flight = 0
+        await super().asyncSetUp()
+
+    def _engine(self):
+        return _Listings(
+            DumpFolderNames.WOLT,
+            "7290058249350",
+            url=f"{self.url}/",
+            file_output=DiskFileOutput(self.tmpdir),
+            status_database=JsonDataBase(DumpFolderNames.WOLT.value, self.tmpdir),
+        )
+
+    async def test_listings_fan_out(self):
+        """All the listings are merged, fetched listing_concurrency at a time."""
+        engine = self._engine()
+        try:
+            entries = [entry async for entry in engine.generate_all_files()]
+        finally:
+            await engine.get_transport().close()
+
+        # the slowest listing comes first, the entries still keep request order
+        self.assertEqual(
+            [entry.name for entry in entries],
+            [
+                f"PriceFull7290058249350-{index:03d}-202601121522"
+                for index in range(LISTINGS)
+            ],
+        )
+        self.assertEqual(_SlowListingHandler.most_in_flight, 3)
+
+    async def test_limit_keeps_the_first_files(self):
+        """A limit keeps the files of the first listings requested."""
+        engine = self._engine()
+        try:
+            names = [
+                name
+                async for _, name in engine.collect_files_details_from_site(
+                    FilterState(), limit=2
+                )
+            ]
+        finally:
+            await engine.get_transport().close()
+
+        self.assertEqual(
+            names,
+            [
+                "PriceFull7290058249350-000-202601121522",
+                "PriceFull7290058249350-001-202601121522",
+            ],
+        )
@@ -1,7 +1,7 @@
-import re
-from bs4 import BeautifulSoup
-from il_supermarket_scarper.utils import FileEntry, Logger
-from il_supermarket_scarper.utils import convert_nl_size_to_bytes, UnitSize
+import asyncio
+import contextlib
+from il_supermarket_scarper.utils import FileEntry, Logger, stream_in_parallel
+from il_supermarket_scarper.utils import ListingRow, parse_table_rows, size_of_text
 from il_supermarket_scarper.utils.state import FilterState
 from .engine import Engine
 
@@ -9,6 +9,9 @@ from .engine import Engine
 class WebBase(Engine):
     """scrape the file of websites that the only why to download them is via web"""
 
+    # listing requests sent at once, override per chain
+    listing_concurrency = 5
+
     def __init__(
         self,
         chain,
@@ -30,8 +33,7 @@ class WebBase(Engine):
 
     def get_data_from_page(self, req_res):
         """get the file list from a page"""
-        soup = BeautifulSoup(req_res.text, features="lxml")
-        return soup.find_all("tr")[1:]
+        return parse_table_rows(req_res.text)[1:]
 
     async def get_request_url(
         self, files_types=None, store_id=None, when_date=None
@@ -48,14 +50,10 @@ class WebBase(Engine):
         Looks for size information in table cells, typically in human-readable format.
         Returns size in bytes, or None if not found.
         """
+        if isinstance(entry, ListingRow):
+            return entry.size
         try:
-            size_match = re.search(r"\b\d+(\.\d+)?\s*(KB|MB|GB)\b", entry.text)
-            if size_match is None:
-                return None
-            size_bytes = convert_nl_size_to_bytes(
-                size_match.group(0), to_unit=UnitSize.BYTES
-            )
-            return size_bytes
+            return size_of_text(entry.text)
         except (AttributeError, TypeError) as e:
             Logger.debug(f"Error extracting file size from entry: {e}")
         return None
@@ -65,8 +63,8 @@ class WebBase(Engine):
 
         for x in all_trs:
             try:
-                name = x.a.attrs["href"].split(".")[0].split("/")[-1]
-                url = self.url + x.a.attrs["href"]
+                name = x.name
+                url = self.url + x.href
                 size = self.get_file_size_from_entry(x)
                 yield FileEntry(name=name, url=url, size=size)
             except (AttributeError, KeyError, IndexError, TypeError) as e:
@@ -100,19 +98,42 @@ class WebBase(Engine):
             yield item
 
     async def generate_all_files(self, files_types=None, store_id=None, when_date=None):
-        """Generate all files from the web site."""
+        """
+        Generate all files from the web site.
+
+        The listings of get_request_url are requested listing_concurrency at a
+        time, their entries are yielded in request order, so limit keeps the
+        first files of the site.
+        """
         gen = self.get_request_url(
             files_types=files_types, store_id=store_id, when_date=when_date
         )
+        listings = stream_in_parallel(
+            self.fetch_page_entries,
+            gen,
+            self.listing_concurrency,
+            ordered=True,
+        )
         try:
-            async for url in gen:
-                req_res = await self.session_with_cookies_by_chain(**url)
-                current_trs = self.get_data_from_page(req_res)
-                async for file_entry in self.extract_task_from_entry(current_trs):
-                    yield file_entry
+            async with contextlib.aclosing(listings):
+                async for file_entries in listings:
+                    for file_entry in file_entries:
+                        yield file_entry
         finally:
             await gen.aclose()
 
+    async def fetch_page_entries(self, request):
+        """the file entries of the listing page of a request"""
+        return await self.fetch_listing(request, self.parse_listing)
+
+    async def parse_listing(self, req_res):
+        """the file entries of a listing page"""
+        # parsing a large page takes a while, keep it off the event loop
+        current_trs = await asyncio.to_thread(self.get_data_from_page, req_res)
+        return [
+            file_entry async for file_entry in self.extract_task_from_entry(current_trs)
+        ]
+
     async def collect_files_details_from_site(  # pylint: disable=too-many-locals
         self,
         state: FilterState,
@@ -30,6 +30,11 @@ class ScarpingTask:  # pylint: disable=too-many-instance-attributes
             See MainScrapperRunner for details. Defaults to None.
         timeout_in_seconds (int, optional): Timeout for scraping operations
             in seconds. Defaults to 1800 (30 minutes).
+        runner_mode (str, optional): "process" to run the chains in a pool of
+            `multiprocessing` processes, "asyncio" to run all of them in one
+            event loop. Defaults to "process".
+        max_concurrent_downloads (int, optional): In "asyncio" mode, the
+            number of downloads shared by all the chains. Defaults to 100.
 
     Example:
         Basic usage::
@@ -74,6 +79,8 @@ class ScarpingTask:  # pylint: disable=too-many-instance-attributes
         output_configuration=None,
         status_configuration=None,
         timeout_in_seconds=60 * 30,
+        runner_mode="process",
+        max_concurrent_downloads=100,
     ):
         """
         Initialize the scraping task.
@@ -87,6 +94,8 @@ class ScarpingTask:  # pylint: disable=too-many-instance-attributes
             output_configuration: File output configuration dictionary.
             status_configuration: Status database configuration dictionary.
             timeout_in_seconds: Timeout for scraping operations.
+            runner_mode: "process" or "asyncio".
+            max_concurrent_downloads: Downloads budget of the "asyncio" mode.
         """
         self.runner = MainScrapperRunner(
             enabled_scrapers=enabled_scrapers,
@@ -94,6 +103,8 @@ class ScarpingTask:  # pylint: disable=too-many-instance-attributes
             multiprocessing=multiprocessing,
             output_configuration=output_configuration,
             status_configuration=status_configuration,
+            runner_mode=runner_mode,
+            max_concurrent_downloads=max_concurrent_downloads,
         )
         self.files_types = files_types
         self.min_size = min_size
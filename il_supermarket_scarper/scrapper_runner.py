@@ -1,20 +1,69 @@
 import datetime
-import time
 import asyncio
-from multiprocessing import Pool, Manager
+import heapq
+import time
+from multiprocessing import Pool, Manager, TimeoutError as PoolTimeoutError
 
 from .scrappers_factory import ScraperFactory
 from .utils import (
     Logger,
     FilterState,
+    ScraperStatus,
     _now,
 )
+from .utils.concurrency import FairDownloadBudget
+from .utils.rate_limit import (
+    create_rate_limiter,
+    create_shared_rate_limiter,
+    install_rate_limiter,
+)
 from .engines.engine import Engine
 from .utils.databases import (
     create_status_database_for_scraper,
     create_file_output_for_scraper,
 )
 
+RUNNER_MODES = ("process", "asyncio")
+# status database metadata key of the statistics of the chain's last run
+LAST_RUN_METADATA_KEY = "last_run"
+
+
+def plan_longest_first(expected_durations, workers):
+    """
+    Order the chains longest expected run first, predicting the makespan.
+
+    Chains are handed one at a time to the first free worker, so starting
+    the longest ones first keeps a slow chain from being queued last and
+    dominating the total wall time.
+
+    Args:
+        expected_durations: dict of chain name to its expected run duration
+            in seconds, None for a chain that never ran
+        workers: number of chains running at once
+
+    Returns:
+        the chains in the order to run them, and the predicted makespan
+        (None when no chain ran before). Chains that never ran go first and
+        are expected to take as long as the longest known one.
+    """
+    known = [duration for duration in expected_durations.values() if duration]
+    fallback = max(known, default=0.0)
+    estimates = {
+        chain: duration or fallback for chain, duration in expected_durations.items()
+    }
+    order = sorted(
+        estimates,
+        key=lambda chain: (bool(expected_durations[chain]), -estimates[chain]),
+    )
+    if not known:
+        return order, None
+
+    # list scheduling: each chain goes to the worker that frees up first
+    loads = [0.0] * max(1, min(workers, len(order)))
+    for chain in order:
+        heapq.heappush(loads, heapq.heappop(loads) + estimates[chain])
+    return order, max(loads)
+
 
 def _should_exit(
     state, limit, single_pass, initial_when_date, collected_now_count, chain_name
@@ -58,13 +107,16 @@ def _should_exit(
     return should_exit, exit_reason
 
 
-def _sleep(timeout_in_seconds, shutdown_flag):
-    """Sleep in smaller chunks to check shutdown flag more frequently"""
+async def _sleep(timeout_in_seconds, shutdown_flag):
+    """Sleep in smaller chunks to check shutdown flag more frequently
+
+    Sleeps on the event loop, so the other chains of the loop keep running.
+    """
     Logger.info(f"Sleeping for {timeout_in_seconds} seconds")
     sleep_chunk = min(1.0, timeout_in_seconds)
     slept = 0
     while slept < timeout_in_seconds and not (shutdown_flag and shutdown_flag.value):
-        time.sleep(sleep_chunk)
+        await asyncio.sleep(sleep_chunk)
         slept += sleep_chunk
         if slept + sleep_chunk > timeout_in_seconds:
             sleep_chunk = timeout_in_seconds - slept
@@ -83,6 +135,8 @@ async def _scrape_one(  # pylint: disable=too-many-locals
     status_database=None,
     timeout_in_seconds=60 * 30,
     shutdown_flag=None,
+    download_budget=None,
+    status_verbosity=ScraperStatus.VERBOSITY_FULL,
 ):
     """scrape one"""
     chain_scrapper_constractor = ScraperFactory.get(chain_scrapper_class)
@@ -92,6 +146,8 @@ async def _scrape_one(  # pylint: disable=too-many-locals
     scraper: Engine = chain_scrapper_constractor(
         file_output=file_output, status_database=status_database
     )
+    scraper.download_budget = download_budget
+    scraper.set_status_verbosity(status_verbosity)
 
     chain_name: str = scraper.get_chain_name()
 
@@ -102,69 +158,105 @@ async def _scrape_one(  # pylint: disable=too-many-locals
     run_count = 0
     initial_when_date = when_date
 
-    # Loop until one of the exit conditions is met
-    while True:
-        # Check for shutdown flag
-        if shutdown_flag and shutdown_flag.value:
-            Logger.info(f"[{chain_name}] Shutdown requested, exiting loop")
-            break
-
-        run_count += 1
-        Logger.info(f"[{chain_name}] Starting run #{run_count}")
-
-        # Run the scraper
-        collected_now_count = 0
-        async for _ in scraper.scrape(
-            state=state,
-            limit=limit,
-            files_types=files_types,
-            store_id=store_id,
-            when_date=when_date,
-            files_names_to_scrape=None,
-            filter_null=False,
-            filter_zero=False,
-            min_size=min_size,
-            max_size=max_size,
-        ):
-            collected_now_count += 1
-            # Check for shutdown during scraping
+    try:
+        # Loop until one of the exit conditions is met
+        while True:
+            # Check for shutdown flag
             if shutdown_flag and shutdown_flag.value:
-                Logger.info(f"[{chain_name}] Shutdown requested during scraping")
+                Logger.info(f"[{chain_name}] Shutdown requested, exiting loop")
                 break
 
-        Logger.info(
-            f"[{chain_name}] Run #{run_count} completed. "
-            f"Files found: {collected_now_count}, "
-            f"Total files: {state.file_pass_limit}"
-        )
+            run_count += 1
+            Logger.info(f"[{chain_name}] Starting run #{run_count}")
+            run_started = time.monotonic()
+            bytes_before_run = scraper.downloaded_bytes
+
+            # Run the scraper
+            collected_now_count = 0
+            async for _ in scraper.scrape(
+                state=state,
+                limit=limit,
+                files_types=files_types,
+                store_id=store_id,
+                when_date=when_date,
+                files_names_to_scrape=None,
+                filter_null=False,
+                filter_zero=False,
+                min_size=min_size,
+                max_size=max_size,
+            ):
+                collected_now_count += 1
+                # Check for shutdown during scraping
+                if shutdown_flag and shutdown_flag.value:
+                    Logger.info(f"[{chain_name}] Shutdown requested during scraping")
+                    break
+
+            Logger.info(
+                f"[{chain_name}] Run #{run_count} completed. "
+                f"Files found: {collected_now_count}, "
+                f"Total files: {state.file_pass_limit}"
+            )
 
-        # Check for shutdown flag again
-        if shutdown_flag and shutdown_flag.value:
-            Logger.info(f"[{chain_name}] Shutdown requested, exiting loop")
-            break
+            # Check for shutdown flag again
+            if shutdown_flag and shutdown_flag.value:
+                Logger.info(f"[{chain_name}] Shutdown requested, exiting loop")
+                break
 
-        # Check exit conditions
-        should_exit, exit_reason = _should_exit(
-            state,
-            limit,
-            single_pass,
-            initial_when_date,
-            collected_now_count,
-            chain_name,
-        )
+            # kept for scheduling the next runs, longest first
+            scraper.database.set_metadata(
+                LAST_RUN_METADATA_KEY,
+                {
+                    "duration": time.monotonic() - run_started,
+                    "bytes": scraper.downloaded_bytes - bytes_before_run,
+                    "files": collected_now_count,
+                    "finished_at": _now().isoformat(),
+                },
+            )
 
-        if should_exit:
-            Logger.info(f"[{chain_name}] Exiting loop: {exit_reason}")
-            break
-        _sleep(timeout_in_seconds, shutdown_flag)
+            # Check exit conditions
+            should_exit, exit_reason = _should_exit(
+                state,
+                limit,
+                single_pass,
+                initial_when_date,
+                collected_now_count,
+                chain_name,
+            )
 
-        # If we're continuing, log that we'll run again
-        if not (shutdown_flag and shutdown_flag.value):
-            Logger.info(f"[{chain_name}] Continuing to next run...")
+            if should_exit:
+                Logger.info(f"[{chain_name}] Exiting loop: {exit_reason}")
+                break
+            await _sleep(timeout_in_seconds, shutdown_flag)
 
-    Logger.info(f"done scraping {chain_name}")
-    if file_output is not None:
-        await file_output.close()
+            # If we're continuing, log that we'll run again
+            if not (shutdown_flag and shutdown_flag.value):
+                Logger.info(f"[{chain_name}] Continuing to next run...")
+    finally:
+        # a shutdown may have stopped (or cancelled) the scrape before it completed
+        await scraper.flush_events_async()
+        Logger.info(f"done scraping {chain_name}")
+        if file_output is not None:
+            await file_output.close()
+
+
+async def _scrape_until_shutdown(chain_scrapper_class, kwargs):
+    """
+    _scrape_one, cancelled once shutdown is requested.
+
+    The cancelled chain flushes its events before returning, instead of the
+    process being killed in the middle of a scrape.
+    """
+    shutdown_flag = kwargs.get("shutdown_flag")
+    scrape = asyncio.ensure_future(_scrape_one(chain_scrapper_class, **kwargs))
+    while not scrape.done():
+        if shutdown_flag is not None and shutdown_flag.value:
+            scrape.cancel()
+            break
+        await asyncio.wait([scrape], timeout=1.0)
+    try:
+        return await scrape
+    except asyncio.CancelledError:
+        return None
 
 
 def scrape_one_wrap(chain_scrapper_class, kwargs):
@@ -172,14 +264,24 @@ def scrape_one_wrap(chain_scrapper_class, kwargs):
     loop = asyncio.new_event_loop()
     try:
         asyncio.set_event_loop(loop)
-        return loop.run_until_complete(_scrape_one(chain_scrapper_class, **kwargs))
+        return loop.run_until_complete(
+            _scrape_until_shutdown(chain_scrapper_class, kwargs)
+        )
     finally:
         loop.close()
 
 
+def scrape_task_wrap(task):
+    """scrape one wrapper taking a (chain, kwargs) task, for Pool.imap_unordered"""
+    return scrape_one_wrap(*task)
+
+
 class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
     """a main scraper to execute all scraping"""
 
+    # seconds the chains have to flush and return once shutdown is requested
+    shutdown_grace_seconds = 30
+
     def __init__(
         self,
         enabled_scrapers=None,
@@ -187,8 +289,33 @@ class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
         multiprocessing=5,
         output_configuration=None,
         status_configuration=None,
+        rate_limit_per_host=None,
+        rate_limit_burst=None,
+        runner_mode="process",
+        max_concurrent_downloads=100,
     ):
+        """
+        Args:
+            runner_mode: "process" runs the chains in a pool of `multiprocessing`
+                processes, "asyncio" runs all of them as tasks of one event loop
+            max_concurrent_downloads: in "asyncio" mode, the downloads budget
+                shared (fairly) by all the chains
+            status_configuration: the status database configuration, its
+                optional "verbosity" ("full", "summarize_saw" or "summarize")
+                rolls the saw (and collected) events of a scrape up into one
+                summary event
+            rate_limit_per_host: requests per second to a host, shared by all
+                the processes (0 disables). Defaults to the RATE_LIMIT_PER_HOST
+                environment variable, then unlimited.
+            rate_limit_burst: requests allowed at once to an idle host.
+                Defaults to the RATE_LIMIT_BURST environment variable, then
+                to twice the rate.
+        """
         assert isinstance(enabled_scrapers, list) or enabled_scrapers is None
+        if runner_mode not in RUNNER_MODES:
+            raise ValueError(
+                f"runner_mode must be one of {RUNNER_MODES}, but got {runner_mode}"
+            )
 
         if not enabled_scrapers:
             enabled_scrapers = ScraperFactory.all_scrapers_name()
@@ -197,6 +324,10 @@ class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
         Logger.info(f"Enabled scrapers: {self.enabled_scrapers}")
         self.multiprocessing = multiprocessing
         self.timeout_in_seconds = timeout_in_seconds
+        self.rate_limit_per_host = rate_limit_per_host
+        self.rate_limit_burst = rate_limit_burst
+        self.runner_mode = runner_mode
+        self.max_concurrent_downloads = max_concurrent_downloads
         self.file_output_config = output_configuration or {
             "output_mode": "disk",
             "base_storage_path": "dumps",
@@ -205,9 +336,20 @@ class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
             "database_type": "json",
             "base_path": "dumps/status",
         }
+        self.status_verbosity = self.status_config.get(
+            "verbosity", ScraperStatus.VERBOSITY_FULL
+        )
+        if self.status_verbosity not in ScraperStatus.SUMMARIZED_STATUSES:
+            raise ValueError(
+                "status verbosity must be one of "
+                f"{list(ScraperStatus.SUMMARIZED_STATUSES)}, "
+                f"but got {self.status_verbosity}"
+            )
         self._manager = None
         self._shutdown_flag = None
         self._pool = None
+        # the predicted and actual duration of the last run() of all the chains
+        self.last_makespan = None
         # file_output (including queue handlers) and status DB must exist before run()
         # so downstream code can call consume() and attach consumers before start().
         self._file_outputs = {}
@@ -259,29 +401,143 @@ class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
                         "single_pass": single_pass,
                         "timeout_in_seconds": self.timeout_in_seconds,
                         "shutdown_flag": self._shutdown_flag,
+                        "status_verbosity": self.status_verbosity,
                     },
                 )
-                for chain_scrapper_class in self.enabled_scrapers
+                for chain_scrapper_class in self._schedule_chains()
             ]
-            with Pool(self.multiprocessing) as self._pool:
-                async_result = self._pool.starmap_async(scrape_one_wrap, tasks)
-                # Poll so we can terminate the pool from THIS thread when
-                # shutdown is requested.  Calling pool.terminate() from a
-                # different thread while starmap() blocks that same pool
-                # object causes a deadlock in the pool's condition variable.
-                while not async_result.ready():
-                    if self._shutdown_flag.value:
-                        Logger.info("Shutdown flag detected, terminating pool")
-                        self._pool.terminate()
-                        break
-                    async_result.wait(timeout=1.0)
-                result = async_result.get() if async_result.ready() else []
+            started = time.monotonic()
+            if self.runner_mode == "asyncio":
+                result = self._run_in_event_loop(tasks)
+            else:
+                result = self._run_in_pool(tasks)
+            self.last_makespan["actual"] = time.monotonic() - started
+            predicted = self.last_makespan["predicted"]
+            Logger.info(
+                f"Scraped all chains in {self.last_makespan['actual']:.1f} seconds, "
+                + (
+                    "no previous runs to predict from"
+                    if predicted is None
+                    else f"predicted {predicted:.1f} seconds"
+                )
+            )
         self._manager = None
         self._shutdown_flag = None
         self._pool = None
         self._close_file_outputs()
         return result
 
+    def _schedule_chains(self):
+        """the enabled chains, longest last run first"""
+        expected_durations = {}
+        for chain_scrapper_class in self.enabled_scrapers:
+            last_run = self._status_databases[chain_scrapper_class].get_metadata(
+                LAST_RUN_METADATA_KEY
+            )
+            expected_durations[chain_scrapper_class] = (last_run or {}).get("duration")
+        workers = (
+            len(self.enabled_scrapers)
+            if self.runner_mode == "asyncio"
+            else self.multiprocessing
+        )
+        order, predicted = plan_longest_first(expected_durations, workers)
+        self.last_makespan = {"predicted": predicted, "actual": None, "order": order}
+        Logger.info(f"Scraping order: {order}")
+        return order
+
+    def _run_in_pool(self, tasks):
+        """run each chain in a process of the pool, with its own event loop"""
+        # one request budget per host for all the processes of the pool
+        rate_limiter = create_shared_rate_limiter(
+            self._manager,
+            rate=self.rate_limit_per_host,
+            burst=self.rate_limit_burst,
+        )
+        with Pool(
+            self.multiprocessing,
+            initializer=install_rate_limiter,
+            initargs=(rate_limiter,),
+        ) as self._pool:
+            # one chain at a time, so a free worker takes the next longest chain
+            results = self._pool.imap_unordered(scrape_task_wrap, tasks, chunksize=1)
+            result = []
+            errors = []
+            deadline = None
+            # Poll so we can stop the pool from THIS thread when shutdown is
+            # requested.  Calling pool.terminate() from a different thread
+            # while the results are awaited on that same pool object causes
+            # a deadlock in the pool's condition variable.
+            while len(result) + len(errors) < len(tasks):
+                if deadline is None and self._shutdown_flag.value:
+                    # the workers see the flag, flush their events and return
+                    Logger.info("Shutdown flag detected, waiting for the chains")
+                    deadline = time.monotonic() + self.shutdown_grace_seconds
+                if deadline is not None and time.monotonic() > deadline:
+                    Logger.warning("Chains didn't stop in time, terminating pool")
+                    self._pool.terminate()
+                    return []
+                try:
+                    result.append(results.next(timeout=1.0))
+                except PoolTimeoutError:
+                    continue
+                except Exception as error:  # pylint: disable=broad-except
+                    Logger.error_execption(error)
+                    errors.append(error)
+            self._pool.close()
+            self._pool.join()
+            if deadline is not None:
+                return []
+            if errors:
+                # like starmap, fail the run once all the chains are done
+                raise errors[0]
+            return result
+
+    def _run_in_event_loop(self, tasks):
+        """run all the chains as tasks of one event loop, in this process"""
+        install_rate_limiter(
+            create_rate_limiter(
+                rate=self.rate_limit_per_host, burst=self.rate_limit_burst
+            )
+        )
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(self._scrape_all(tasks))
+        finally:
+            loop.close()
+
+    async def _scrape_all(self, tasks):
+        """scrape all the chains concurrently, sharing one downloads budget"""
+        download_budget = FairDownloadBudget(self.max_concurrent_downloads)
+        chains = asyncio.gather(
+            *[
+                _scrape_one(
+                    chain_scrapper_class, **kwargs, download_budget=download_budget
+                )
+                for chain_scrapper_class, kwargs in tasks
+            ],
+            return_exceptions=True,
+        )
+        while not chains.done():
+            if self._shutdown_flag.value:
+                Logger.info("Shutdown flag detected, cancelling the chains")
+                chains.cancel()
+                try:
+                    await chains
+                except asyncio.CancelledError:
+                    pass
+                return []
+            await asyncio.wait([chains], timeout=1.0)
+
+        result = chains.result()
+        errors = [error for error in result if isinstance(error, BaseException)]
+        for error in errors:
+            Logger.error_execption(error)
+        if errors:
+            # like the pool, fail the run once all the chains are done
+            raise errors[0]
+        return result
+
     def _close_file_outputs(self):
         """Send end-of-stream sentinel to every queue output so consumers unblock."""
         for file_output in self._file_outputs.values():
@@ -298,8 +554,10 @@ class MainScrapperRunner:  # pylint: disable=too-many-instance-attributes
     def shutdown(self):
         """Stop the scraping process.
 
-        Sets the shutdown flag so the background thread's poll loop terminates
-        the pool from within itself (avoids cross-thread pool deadlocks).
+        Sets the shutdown flag: the chains flush their events and return, and
+        the background thread's poll loop closes the pool from within itself
+        (avoids cross-thread pool deadlocks), terminating it only if they
+        don't stop within shutdown_grace_seconds.
         Immediately closes all queue outputs so blocked consumers unblock.
         """
         Logger.info("Shutdown requested")
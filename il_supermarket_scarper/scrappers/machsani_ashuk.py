@@ -36,14 +36,16 @@ class MahsaniAShukNewSource(ApiWebEngine):
         )
         self.chain_hebrew_name = "מחסני השוק"
 
-    def get_branches(self, chain_id):
+    async def get_branches(self, chain_id):
         """Get available branches for a chain ID"""
-        return self.get_api_data("/webapi/api/getbranches", {"edi": chain_id})
+        return await self.get_api_data("/webapi/api/getbranches", {"edi": chain_id})
 
     async def get_request_url(self, files_types=None, store_id=None, when_date=None):
         """Generate API requests for getting file lists"""
         for chain_id in self.get_chain_id():
-            branches = self.get_api_data("/webapi/api/getbranches", {"edi": chain_id})
+            branches = await self.get_api_data(
+                "/webapi/api/getbranches", {"edi": chain_id}
+            )
             Logger.debug(f"Found {len(branches)} branches for chain {chain_id}")
 
             if store_id is not None:
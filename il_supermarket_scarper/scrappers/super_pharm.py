@@ -49,6 +49,18 @@ class SuperPharm(MultiPageWeb):
     @async_url_connection_retry()
     async def retrieve_file_to_memory(self, file_link, timeout=15):
         """Retrieve file from Super Pharm website"""
+        return await self._resolve_and_download(file_link, timeout=timeout)
+
+    async def retrieve_file_to_stream(self, file_link, timeout=15):
+        """Stream the file from Super Pharm with the session cookies"""
+        url = await self._resolve_url(file_link, timeout=timeout)
+        async for chunk in self._resumable_transport_stream(
+            url, timeout, cookies=self.cookie_jar.get_cookies()
+        ):
+            yield chunk
+
+    async def _resolve_url(self, file_link, timeout=15):
+        """resolve the download link with the session cookies"""
         Logger.debug(f"On a new Session: calling {file_link}")
 
         response_content = await self.session_with_cookies_by_chain(
@@ -56,9 +68,12 @@ class SuperPharm(MultiPageWeb):
         )
         spath = json.loads(response_content.content)
         Logger.debug(f"Found spath: {spath}")
+        return self.url + spath["href"]
 
+    async def _resolve_and_download(self, file_link, timeout=15):
+        """resolve the download link and fetch the file with the session cookies"""
         file_to_save = await self.session_with_cookies_by_chain(
-            self.url + spath["href"], timeout=timeout
+            await self._resolve_url(file_link, timeout=timeout), timeout=timeout
         )
 
         return file_to_save.content
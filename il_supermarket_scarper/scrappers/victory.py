@@ -1,10 +1,13 @@
 import re
+import asyncio
+import contextlib
 from il_supermarket_scarper.engines import ApiWebEngine
 from il_supermarket_scarper.utils import (
     DumpFolderNames,
     FileEntry,
     Logger,
     FileTypesFilters,
+    stream_in_parallel,
 )
 from il_supermarket_scarper.engines import Matrix
 
@@ -23,51 +26,82 @@ class _LaibcatalogApiScraper(ApiWebEngine):
             status_database=status_database,
         )
         self.chain_hebrew_name = None
+        # whether getfiles of a chain ignores the branch, learned once a pass
+        self._branch_agnostic = {}
 
-    def get_branches(self, chain_id):
+    async def _post_scraping(self):
+        """probe the branches again on the next pass, the API may change"""
+        self._branch_agnostic.clear()
+        await super()._post_scraping()
+
+    async def get_branches(self, chain_id):
         """Get available branches for a chain ID"""
-        return self.get_api_data("/webapi/api/getbranches", {"edi": chain_id})
+        return await self.get_api_data("/webapi/api/getbranches", {"edi": chain_id})
 
-    def get_files(self, chain_id, branch_number=None):
+    async def get_files(self, chain_id, branch_number=None):
         """Get available files for a chain ID and optional branch"""
         params = {"edi": chain_id}
         if branch_number is not None:
             params["branchNumber"] = branch_number
-        return self.get_api_data("/webapi/api/getfiles", params)
-
-    async def get_request_url(self, files_types=None, store_id=None, when_date=None):
-        """Generate API requests for getting file lists"""
+        return await self.get_api_data("/webapi/api/getfiles", params)
+
+    async def get_branch_numbers(self, chain_id, store_id=None):
+        """the numbers of the branches of a chain, only store_id's if given"""
+        branches = await self.get_branches(chain_id)
+        Logger.debug(f"Found {len(branches)} branches for chain {chain_id}")
+
+        if store_id is not None:
+            branches = [b for b in branches if str(b.get("number")) == str(store_id)]
+            Logger.debug(f"Filtered to {len(branches)} branches for store {store_id}")
+        return [branch.get("number") for branch in branches]
+
+    async def get_api_pages(self, files_types=None, store_id=None, when_date=None):
+        """
+        The getfiles responses of every chain, its branches fetched concurrently.
+
+        When a branch answers exactly like the whole chain, getfiles ignores
+        the branch, so the chain is listed with one chain-level call instead
+        of one identical call per branch.
+        """
         for chain_id in self.get_chain_id():
-            branches = self.get_branches(chain_id)
-            Logger.debug(f"Found {len(branches)} branches for chain {chain_id}")
-
-            if store_id is not None:
-                branches = [
-                    b for b in branches if str(b.get("number")) == str(store_id)
-                ]
-                Logger.debug(
-                    f"Filtered to {len(branches)} branches for store {store_id}"
-                )
+            branch_numbers = await self.get_branch_numbers(chain_id, store_id)
+            if not branch_numbers:
+                yield await self.get_files(chain_id)
+                continue
 
-            if branches:
-                for branch in branches:
-                    branch_num = branch.get("number")
-                    url = f"{self.url.rstrip('/')}/webapi/api/getfiles?edi={chain_id}"
-                    if branch_num is not None:
-                        url += f"&branchNumber={branch_num}"
-                    yield {
-                        "url": url,
-                        "method": "GET",
-                        "chain_id": chain_id,
-                        "branch_number": branch_num,
-                    }
-            else:
-                yield {
-                    "url": f"{self.url.rstrip('/')}/webapi/api/getfiles?edi={chain_id}",
-                    "method": "GET",
-                    "chain_id": chain_id,
-                    "branch_number": None,
-                }
+            if len(branch_numbers) > 1:
+                if self._branch_agnostic.get(chain_id):
+                    yield await self.get_files(chain_id)
+                    continue
+                if chain_id not in self._branch_agnostic:
+                    chain_files, branch_files = await asyncio.gather(
+                        self.get_files(chain_id),
+                        self.get_files(chain_id, branch_numbers[0]),
+                    )
+                    # a failed call answers [], learn only from two answers
+                    if chain_files and branch_files:
+                        self._branch_agnostic[chain_id] = chain_files == branch_files
+                    if self._branch_agnostic.get(chain_id):
+                        Logger.info(
+                            f"getfiles of {chain_id} is the same for every branch, "
+                            f"listing it once instead of {len(branch_numbers)} times"
+                        )
+                        yield chain_files
+                        continue
+                    if branch_files:
+                        yield branch_files
+                        branch_numbers = branch_numbers[1:]
+
+            pages = stream_in_parallel(
+                lambda branch_number, chain_id=chain_id: self.get_files(
+                    chain_id, branch_number
+                ),
+                branch_numbers,
+                self.listing_concurrency,
+            )
+            async with contextlib.aclosing(pages):
+                async for files in pages:
+                    yield files
 
     def get_data_from_page(self, req_res):
         """Parse the getfiles API response"""
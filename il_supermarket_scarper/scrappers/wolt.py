@@ -1,8 +1,7 @@
 from datetime import timedelta
 from typing import AsyncGenerator
-from bs4 import BeautifulSoup
 
-from il_supermarket_scarper.utils import _now, Logger, FileEntry
+from il_supermarket_scarper.utils import _now, Logger, FileEntry, parse_list_items
 from il_supermarket_scarper.engines.web import WebBase
 from il_supermarket_scarper.utils import DumpFolderNames
 
@@ -10,6 +9,9 @@ from il_supermarket_scarper.utils import DumpFolderNames
 class Wolt(WebBase):
     """scraper for wolt"""
 
+    # the static index pages of the last days, all at once
+    listing_concurrency = 11
+
     def __init__(self, file_output=None, status_database=None):
         super().__init__(
             DumpFolderNames.WOLT,
@@ -43,13 +45,11 @@ class Wolt(WebBase):
 
     def get_data_from_page(self, req_res):
         """get the file list from a page"""
-        soup = BeautifulSoup(req_res.text, features="lxml")
-        return list(
-            map(
-                lambda x: (x.text, self.url.replace("index.html", x.a.attrs["href"])),
-                list(soup.find_all("li")),
-            )
-        )
+        return [
+            (text, self.url.replace("index.html", href))
+            for text, href in parse_list_items(req_res.text)
+            if href is not None
+        ]
 
     async def extract_task_from_entry(self, all_trs) -> AsyncGenerator[FileEntry, None]:
         """extract download links, file names, and file sizes from page list"""
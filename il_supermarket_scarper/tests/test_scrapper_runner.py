@@ -0,0 +1,121 @@
+"""Tests for the chains scheduling and the shutdown of the main runner."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pytest
+
+from il_supermarket_scarper.scrapper_runner import (
+    LAST_RUN_METADATA_KEY,
+    MainScrapperRunner,
+    plan_longest_first,
+)
+from il_supermarket_scarper.scrappers.wolt import Wolt
+from il_supermarket_scarper.scrappers_factory import ScraperFactory
+
+STUCK_FILES = 10
+
+
+def test_plan_longest_first():
+    """test the longest chains start first and the makespan is predicted"""
+    order, predicted = plan_longest_first(
+        {"short": 10, "long": 100, "medium": 50, "other": 40}, workers=2
+    )
+    assert order == ["long", "medium", "other", "short"]
+    # long | medium + other + short
+    assert predicted == 100
+
+    order, predicted = plan_longest_first({"a": 30, "b": 20, "c": 20}, workers=2)
+    assert predicted == 40
+
+
+def test_plan_longest_first_unknown_chains():
+    """test chains that never ran go first, estimated as the longest known one"""
+    order, predicted = plan_longest_first({"a": 10, "new": None, "b": 30}, workers=1)
+    assert order == ["new", "b", "a"]
+    assert predicted == 70
+
+    order, predicted = plan_longest_first({"a": None, "b": None}, workers=2)
+    assert order == ["a", "b"]
+    assert predicted is None
+
+
+@pytest.fixture(name="status_path")
+def fixture_status_path():
+    """a temporary status folder"""
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+
+def test_runner_schedules_from_status_database(status_path):
+    """test the runner orders the chains by their recorded last run"""
+    runner = MainScrapperRunner(
+        enabled_scrapers=["BAREKET", "SHUFERSAL", "VICTORY"],
+        multiprocessing=2,
+        output_configuration={"output_mode": "disk", "base_storage_path": status_path},
+        status_configuration={"database_type": "json", "base_path": status_path},
+    )
+    status_databases = runner._status_databases  # pylint: disable=protected-access
+    for chain, duration in (("BAREKET", 20.0), ("SHUFERSAL", 300.0)):
+        status_databases[chain].set_metadata(
+            LAST_RUN_METADATA_KEY, {"duration": duration, "bytes": 1024}
+        )
+
+    order = runner._schedule_chains()  # pylint: disable=protected-access
+
+    assert order == ["VICTORY", "SHUFERSAL", "BAREKET"]
+    # the new chain is expected to take as long as SHUFERSAL
+    assert runner.last_makespan["predicted"] == 320.0
+    last_run = status_databases["BAREKET"].get_metadata(LAST_RUN_METADATA_KEY)
+    assert last_run["bytes"] == 1024
+
+
+class _StuckChain(Wolt):
+    """a chain that saw some files, then hangs in the middle of its scrape"""
+
+    ready_path = None
+
+    async def scrape(self, *_, **__):  # pylint: disable=arguments-differ
+        self.on_scraping_start(limit=None, files_types=None)
+        for index in range(STUCK_FILES):
+            self.register_saw_file(
+                f"PriceFull7290058249350-{index:03d}-202601121522", None, 1
+            )
+        with open(self.ready_path, "w", encoding="utf-8"):
+            pass
+        await asyncio.sleep(3600)
+        yield None
+
+
+def test_shutdown_flushes_process_workers(status_path, monkeypatch):
+    """test a shutdown mid-scrape persists the buffered events of the workers"""
+    _StuckChain.ready_path = os.path.join(status_path, "ready")
+    monkeypatch.setattr(ScraperFactory, "get", lambda *_, **__: _StuckChain)
+    runner = MainScrapperRunner(
+        enabled_scrapers=["WOLT"],
+        multiprocessing=1,
+        output_configuration={"output_mode": "disk", "base_storage_path": status_path},
+        status_configuration={"database_type": "json", "base_path": status_path},
+    )
+    results = []
+    run = threading.Thread(target=lambda: results.append(runner.run()))
+    run.start()
+
+    deadline = time.monotonic() + 60
+    while not os.path.exists(_StuckChain.ready_path):
+        assert time.monotonic() < deadline, "the chain didn't start"
+        time.sleep(0.1)
+    runner.shutdown()
+    run.join(timeout=60)
+
+    assert not run.is_alive()
+    assert results == [[]]
+    status_databases = runner._status_databases  # pylint: disable=protected-access
+    status_database = status_databases["WOLT"]
+    statuses = status_database.iter_field_values("events", "status")
+    assert statuses.count("saw") == STUCK_FILES
@@ -13,6 +13,7 @@ from .status import (
     hour_files_expected_to_be_accassible,
 )
 from .scraper_status import ScraperStatus
+from .status_summary import StatusSummary
 from .scraper_status_contract import (
     FileName,
     FolderSizeInfo,
@@ -22,23 +23,68 @@ from .scraper_status_contract import (
     FailedStatus,
     EstimatedSizeStatus,
     SawStatus,
+    SummaryStatus,
     VerifiedDownload,
     ScraperStatusOutput,
 )
 from .file_types import FileTypesFilters
+from .file_name_parser import ParsedFileName, parse_file_name
 from .connection import (
     download_connection_retry,
     url_connection_retry,
     disable_when_outside_israel,
     session_with_cookies,
+    session_with_cookies_on_transport,
     url_retrieve_to_memory,
+    url_retrieve_to_stream,
+    iterate_in_thread,
+    resumable_stream,
+    DownloadProgress,
     collect_from_ftp,
     fetch_file_from_ftp_to_memory,
+    fetch_file_from_ftp_to_stream,
     wget_file_to_memory,
     async_url_connection_retry,
 )
-from .loop import execute_in_parallel, multiple_page_aggregtion
-from .exceptions import RestartSessionError
+from .loop import execute_in_parallel, multiple_page_aggregtion, stream_in_parallel
+from .transport import (
+    HttpTransport,
+    RequestsTransport,
+    AiohttpTransport,
+    TransportResponse,
+    create_transport,
+)
+from .cookies import ChainCookieJar
+from .listing_cache import ListingCache, CachedListing
+from .listing_parser import (
+    ListingRow,
+    parse_table_rows,
+    parse_list_items,
+    parse_script_texts,
+    size_of_text,
+)
+from .shared_listing import SharedListings, shared_listings, SHARED_LISTING_TTL
+from .rate_limit import (
+    HostRateLimiter,
+    create_shared_rate_limiter,
+    install_rate_limiter,
+    get_rate_limiter,
+)
+from .concurrency import (
+    ConcurrencyLimiter,
+    FixedConcurrencyLimiter,
+    AIMDConcurrencyLimiter,
+    FairDownloadBudget,
+    create_concurrency_limiter,
+    is_congestion_error,
+)
+from .exceptions import (
+    RestartSessionError,
+    ExtractionError,
+    HttpStatusError,
+    IncompleteDownloadError,
+    ResumeNotSupportedError,
+)
 from .retry import retry_files
 from .validation import is_valid_chain_name, change_xml_encoding
 from .folders_name import DumpFolderNames
@@ -52,7 +98,8 @@ from .file_output import (
     InMemoryQueueHandler,
 )
 from .scraper_config import ScraperConfig
-from .databases import JsonDataBase, MongoDataBase
+from .databases import JsonDataBase, JsonlDataBase, MongoDataBase, SqliteDataBase
 from .scraping_result import ScrapingResult
+from .downloaded_index import DownloadedIndex, BloomFilter
 from .file_entry import FileEntry
 from .scraper_status_contract import *
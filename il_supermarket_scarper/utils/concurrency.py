@@ -0,0 +1,285 @@
+"""Concurrency limiters bounding the parallel downloads of an engine."""
+
+import asyncio
+import collections
+import contextlib
+import os
+import time
+from abc import ABC, abstractmethod
+from ftplib import error_temp
+from typing import Optional
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from .logger import Logger
+from .exceptions import HttpStatusError, RestartSessionError
+
+CONCURRENCY_ENV_VAR = "CONCURRENCY_LIMITER"
+
+_TIMEOUT_ERRORS = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    requests.exceptions.Timeout,
+    ReadTimeoutError,
+)
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """
+    Whether an error means the server is overloaded.
+
+    Timeouts, 5xx responses, FTP 4xx replies (e.g. "421 too many
+    connections") and RestartSessionError count as congestion; any other
+    error (missing file, bad archive...) says nothing about the load.
+    """
+    if isinstance(error, (RestartSessionError, error_temp) + _TIMEOUT_ERRORS):
+        return True
+    if isinstance(error, HttpStatusError):
+        return error.status >= 500
+    # raised by the session helpers for non 200 responses
+    return isinstance(error, ConnectionError) and " returned with status 5" in str(
+        error
+    )
+
+
+class ConcurrencyLimiter(ABC):
+    """
+    Bound on the number of downloads an engine runs at once.
+
+    Downloads hold a slot (``async with limiter:``) and report the outcome
+    of every attempt through ``track()``, which a limiter may use to adapt
+    its limit.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self.max_limit = limit
+        self._in_use = 0
+        self._condition = None
+        self._loop = None
+
+    @property
+    def limit(self) -> int:
+        """the number of downloads currently allowed at once"""
+        return max(1, int(self._limit))
+
+    @property
+    def in_use(self) -> int:
+        """the number of slots currently held"""
+        return self._in_use
+
+    def _get_condition(self):
+        # created lazily, asyncio primitives are bound to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._in_use = 0
+        return self._condition
+
+    async def __aenter__(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        condition = self._get_condition()
+        async with condition:
+            self._in_use -= 1
+            condition.notify_all()
+
+    async def _limit_changed(self):
+        """wake up waiters after the limit grew"""
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def track(self):
+        """report the outcome of the attempt run in the block"""
+        try:
+            yield
+        except Exception as error:
+            if is_congestion_error(error):
+                await self.on_congestion(error)
+            raise
+        await self.on_success()
+
+    @abstractmethod
+    async def on_success(self):
+        """an attempt completed"""
+
+    @abstractmethod
+    async def on_congestion(self, error: BaseException):
+        """an attempt failed because the server is overloaded"""
+
+
+class FixedConcurrencyLimiter(ConcurrencyLimiter):
+    """A limiter that keeps its limit, like a plain semaphore."""
+
+    async def on_success(self):
+        pass
+
+    async def on_congestion(self, error: BaseException):
+        pass
+
+
+class AIMDConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Additive-increase/multiplicative-decrease limiter.
+
+    Every success grows the limit by ``increase / limit`` (one slot per
+    window of successful downloads), a congestion error multiplies it by
+    ``decrease_factor``. Decreases are at most once per ``cooldown``
+    seconds, so the failures of downloads started together count once.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 5.0,
+    ):
+        max_limit = max_limit or limit
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(
+                f"Expected 1 <= min_limit <= max_limit, got {min_limit}, {max_limit}"
+            )
+        super().__init__(min(max(limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._last_decrease = None
+
+    async def on_success(self):
+        previous = self.limit
+        self._limit = min(self.max_limit, self._limit + self.increase / self.limit)
+        if self.limit != previous:
+            Logger.debug(f"Concurrency limit raised to {self.limit}")
+            await self._limit_changed()
+
+    async def on_congestion(self, error: BaseException):
+        now = time.monotonic()
+        if self._last_decrease is not None and (
+            now - self._last_decrease < self.cooldown
+        ):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        Logger.info(
+            f"Concurrency limit cut to {self.limit} after "
+            f"{type(error).__name__}: {str(error)[:200]}"
+        )
+
+
+class FairDownloadBudget:
+    """
+    Global bound on the downloads of chains sharing one event loop.
+
+    When the budget is exhausted, a freed slot goes to the waiting chain
+    holding the fewest slots, so a chain with thousands of files can't
+    starve the others. Meant to be used from a single event loop.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, not {limit}")
+        self.limit = limit
+        self._total = 0
+        self._in_use = {}
+        self._waiters = {}
+
+    def in_use(self, chain=None) -> int:
+        """slots held by a chain, or by all of them"""
+        if chain is None:
+            return self._total
+        return self._in_use.get(chain, 0)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, chain):
+        """hold one download slot of the budget for chain"""
+        await self._acquire(chain)
+        try:
+            yield
+        finally:
+            self._release(chain)
+
+    async def _acquire(self, chain):
+        if self._total < self.limit and not any(self._waiters.values()):
+            self._grant(chain)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(chain, collections.deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # granted just before the cancellation, hand the slot back
+                self._release(chain)
+            elif waiter in self._waiters[chain]:
+                # otherwise _wake_up already dropped it as done
+                self._waiters[chain].remove(waiter)
+            raise
+
+    def _grant(self, chain):
+        self._total += 1
+        self._in_use[chain] = self._in_use.get(chain, 0) + 1
+
+    def _release(self, chain):
+        self._total -= 1
+        self._in_use[chain] -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        """hand free slots to the waiting chains holding the fewest"""
+        while self._total < self.limit:
+            waiting = [chain for chain, waiters in self._waiters.items() if waiters]
+            if not waiting:
+                return
+            chain = min(waiting, key=self.in_use)
+            waiter = self._waiters[chain].popleft()
+            if waiter.done():
+                continue
+            self._grant(chain)
+            waiter.set_result(None)
+
+
+CONCURRENCY_LIMITERS = {
+    "fixed": FixedConcurrencyLimiter,
+    "aimd": AIMDConcurrencyLimiter,
+}
+
+
+def create_concurrency_limiter(
+    limiter_type: Optional[str] = None,
+    limit: int = 5,
+    min_limit: int = 1,
+    max_limit: Optional[int] = None,
+) -> ConcurrencyLimiter:
+    """
+    Create a concurrency limiter.
+
+    Args:
+        limiter_type: "aimd" or "fixed". Defaults to the CONCURRENCY_LIMITER
+            environment variable, then to "aimd".
+        limit: Initial number of parallel downloads
+        min_limit: Lowest limit an adaptive limiter may cut to
+        max_limit: Highest limit an adaptive limiter may grow to
+    """
+    limiter_type = limiter_type or os.getenv(CONCURRENCY_ENV_VAR) or "aimd"
+    if limiter_type not in CONCURRENCY_LIMITERS:
+        raise ValueError(
+            f"Unknown concurrency limiter: {limiter_type}, "
+            f"expected one of {list(CONCURRENCY_LIMITERS)}"
+        )
+    if limiter_type == "fixed":
+        return FixedConcurrencyLimiter(limit)
+    return AIMDConcurrencyLimiter(limit, min_limit=min_limit, max_limit=max_limit)
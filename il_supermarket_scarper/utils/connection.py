@@ -1,15 +1,16 @@
+# pylint: disable=too-many-lines
 import contextlib
 import io
 import os
 import re
 import time
 import socket
-import pickle
 import random
 import asyncio
 import fnmatch
+import ssl
 from html import unescape
-from ftplib import FTP_TLS, error_perm
+from ftplib import error_perm, error_temp
 
 from http.client import RemoteDisconnected
 from http.cookiejar import LoadError
@@ -31,7 +32,12 @@ from .logger import Logger
 from .file_entry import FileEntry
 from .retry import retry
 from .file_cache import file_cache
+from .cookies import load_cookies, save_cookies
+from .exceptions import IncompleteDownloadError, ResumeNotSupportedError
+from .ftp_pool import ftp_connection_pool
+from .rate_limit import get_rate_limiter
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 exceptions = (
     URLError,
@@ -50,6 +56,16 @@ exceptions = (
     LoadError,
 )
 
+try:
+    import aiohttp
+
+    exceptions += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+except ImportError:
+    pass
+
+# errors after which a partial transfer may be continued
+resumable_exceptions = exceptions + (error_temp, EOFError)
+
 
 def download_connection_retry():
     """decorator the define the retry logic of connections tring to download files"""
@@ -115,7 +131,7 @@ def url_connection_retry(init_timeout=15):
     return wrapper
 
 
-def async_url_connection_retry(init_timeout=15):
+def async_url_connection_retry(init_timeout=15, tries=4):
     """Async decorator for retry logic of connections trying to send requests"""
 
     def wrapper(func):
@@ -129,7 +145,7 @@ def async_url_connection_retry(init_timeout=15):
                 requested_timeout_ref[0] = original_timeout
 
             # Manual retry logic for async functions
-            _tries = 4
+            _tries = tries
             _delay = 2
             backoff = 2
             max_delay = 5 * 60
@@ -283,29 +299,82 @@ def session_with_cookies(
 
     session = requests.Session()
     if chain_cookie_name:
-
-        try:
-            with open(chain_cookie_name, "rb") as f:
-                session.cookies.update(pickle.load(f))
-            # session.cookies.load()
-        except FileNotFoundError:
-            Logger.debug("Didn't find cookie file")
-        except Exception as e:
-            # There was an issue with reading the file.
-            os.remove(chain_cookie_name)
-            raise e
+        session.cookies.update(load_cookies(chain_cookie_name))
 
     Logger.debug(
         f"On a new Session requesting url: method={method}, url={url}, body={body}"
     )
 
+    rate_limiter = get_rate_limiter()
+    rate_limiter.acquire(url)
     if method == "POST":
         response_content = session.post(
             url, data=body, timeout=timeout, headers=headers
         )
     else:
         response_content = session.get(url, timeout=timeout, headers=headers)
+    rate_limiter.on_response(
+        url, response_content.status_code, response_content.headers
+    )
+
+    _raise_if_not_ok(url, response_content)
 
+    if chain_cookie_name and not os.path.exists(chain_cookie_name):
+        save_cookies(chain_cookie_name, session.cookies.get_dict())
+
+    return response_content
+
+
+@async_url_connection_retry(
+    init_timeout=60
+)  # Increased default to handle slow servers like Shufersal
+async def session_with_cookies_on_transport(  # pylint: disable=too-many-arguments
+    transport,
+    url,
+    timeout=15,
+    cookie_jar=None,
+    method="GET",
+    body=None,
+    headers=None,
+    accept_not_modified=False,
+):
+    """
+    Request resource with cookies enabled, over a pooled HttpTransport.
+
+    Parameters:
+    - transport: HttpTransport whose connections are reused
+    - url: URL to request
+    - timeout: Request timeout
+    - cookie_jar: Optional ChainCookieJar, cookies to send and keep
+    - method: HTTP method, defaults to GET
+    - body: Data to be sent in the request body (for POST or PUT requests)
+    - headers: Optional dict of custom headers to include in the request
+    - accept_not_modified: return 304 responses (to a conditional request)
+      instead of raising
+    """
+    Logger.debug(
+        f"On a pooled transport requesting url: method={method}, url={url}, body={body}"
+    )
+    response_content = await transport.request(
+        method,
+        url,
+        data=body if method == "POST" else None,
+        headers=headers,
+        cookies=cookie_jar.get_cookies() if cookie_jar else None,
+        timeout=timeout,
+    )
+
+    if not (accept_not_modified and response_content.status_code == 304):
+        _raise_if_not_ok(url, response_content)
+
+    if cookie_jar:
+        cookie_jar.record_first(response_content.cookies)
+
+    return response_content
+
+
+def _raise_if_not_ok(url, response_content):
+    """raise a (retryable) ConnectionError for non 200 responses"""
     if response_content.status_code != 200:
         Logger.debug(
             f"On Session, got status code: {response_content.status_code}"
@@ -316,12 +385,6 @@ def session_with_cookies(
             f" {response_content.status_code}"
         )
 
-    if chain_cookie_name and not os.path.exists(chain_cookie_name):
-        with open(chain_cookie_name, "wb") as f:
-            pickle.dump(session.cookies.get_dict(), f)
-
-    return response_content
-
 
 def get_from_playwrite(page, extraction_type):
     """get the content from the page with playwrite"""
@@ -576,94 +639,249 @@ def get_from_webpage(cached_page, extraction_type):
     return content
 
 
-def url_retrieve_to_memory(url, timeout=30, chunk_size=8192):
-    """Download URL content directly to memory (BytesIO)."""
+async def iterate_in_thread(sync_iterable):
+    """Async generator driving a blocking iterator from worker threads.
+
+    Every ``next()`` call runs in the default executor, so only a single chunk
+    is held in memory at a time and the event loop is never blocked.
+    """
+    iterator = iter(sync_iterable)
+    exhausted = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, exhausted)
+            if item is exhausted:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+class DownloadProgress:  # pylint: disable=too-few-public-methods
+    """
+    State of a download shared between the attempts of a resumable stream.
+
+    ``received`` is the offset the next attempt continues from, ``validator``
+    the ETag/Last-Modified of the first response (sent as If-Range, so a
+    changed file is never stitched to an older partial one).
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.validator = None
+
+
+def range_request_headers(progress):
+    """headers asking to continue a download, empty for a fresh one"""
+    if progress is None or not progress.received:
+        return {}
+    headers = {"Range": f"bytes={progress.received}-"}
+    if progress.validator:
+        headers["If-Range"] = progress.validator
+    return headers
+
+
+def check_range_response(url, progress, status, headers):
+    """
+    Validate a response continues the download, or remember its validator.
+
+    Raises:
+        ResumeNotSupportedError: the server sent something else than the
+            missing part of the file
+    """
+    if progress is None:
+        return
+    if not progress.received:
+        progress.validator = headers.get("ETag") or headers.get("Last-Modified")
+        return
+    content_range = headers.get("Content-Range", "")
+    match = re.match(r"bytes (\d+)-", content_range)
+    if status != 206 or not match or int(match.group(1)) != progress.received:
+        raise ResumeNotSupportedError(
+            f"Can't resume {url} from byte {progress.received}, "
+            f"got status {status} ({content_range or 'no Content-Range'})"
+        )
+
+
+def check_transfer_complete(url, read, expected_size):
+    """raise IncompleteDownloadError if less than the announced bytes arrived"""
+    if expected_size is not None and 0 <= read < expected_size:
+        raise IncompleteDownloadError(
+            f"retrieval of {url} incomplete: got only {read:d} "
+            f"out of {expected_size:d} bytes"
+        )
+
+
+async def resumable_stream(open_stream, max_resumes=5, delay=2):
+    """
+    Async generator: yields the chunks of a download, resuming it after drops.
+
+    ``open_stream(progress)`` must return an async iterator of the file
+    starting at ``progress.received``. When a connection error interrupts
+    the transfer, the stream is reopened from the received offset instead of
+    from byte zero. ResumeNotSupportedError (and errors before the first
+    byte) propagate, so the caller restarts the whole download.
+    """
+    progress = DownloadProgress()
+    resumes = 0
+    while True:
+        try:
+            # closed at once when abandoned, releasing its connection
+            async with contextlib.aclosing(open_stream(progress)) as stream:
+                async for chunk in stream:
+                    progress.received += len(chunk)
+                    yield chunk
+            return
+        except ResumeNotSupportedError:
+            raise
+        except resumable_exceptions as error:
+            if not progress.received or resumes >= max_resumes:
+                raise
+            resumes += 1
+            Logger.warning(
+                f"{type(error).__name__}: {str(error)[:200]}, resuming from byte "
+                f"{progress.received} (resume {resumes}/{max_resumes})"
+            )
+            await asyncio.sleep(delay)
+
+
+def _iter_url_content(  # pylint: disable=too-many-arguments
+    url,
+    timeout=30,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    session=None,
+    progress=None,
+    cookies=None,
+):
+    """Yield the body of an URL chunk by chunk (through session if given).
+
+    With a DownloadProgress that already received bytes, only the rest of
+    the file is requested.
+    """
+    headers = {"Accept-Encoding": None, **range_request_headers(progress)}
+    rate_limiter = get_rate_limiter()
+    rate_limiter.acquire(url)
     with contextlib.closing(
-        requests.get(
-            url, stream=True, timeout=timeout, headers={"Accept-Encoding": None}
+        (session or requests).get(
+            url, stream=True, timeout=timeout, headers=headers, cookies=cookies
         )
     ) as _request:
+        rate_limiter.on_response(url, _request.status_code, _request.headers)
+        check_range_response(url, progress, _request.status_code, _request.headers)
         _request.raise_for_status()
         size = int(_request.headers.get("Content-Length", "-1"))
         read = 0
-        file_buffer = io.BytesIO()
         for chunk in _request.iter_content(chunk_size=chunk_size):
             read += len(chunk)
-            file_buffer.write(chunk)
+            yield chunk
 
-    if size >= 0 and read < size:
-        msg = f"retrieval incomplete: got only {read:d} out of {size:d} bytes"
-        raise ValueError(msg, (url, _request.headers))
+    check_transfer_complete(url, read, size)
 
-    file_buffer.seek(0)  # Reset to beginning for reading
+
+def url_retrieve_to_memory(url, timeout=30, chunk_size=8192):
+    """Download URL content directly to memory (BytesIO)."""
+    file_buffer = io.BytesIO()
+    for chunk in _iter_url_content(url, timeout=timeout, chunk_size=chunk_size):
+        file_buffer.write(chunk)
     return file_buffer.getvalue()  # Return bytes
 
 
-async def collect_from_ftp(
-    ftp_host, ftp_username, ftp_password, ftp_path, arg=None, timeout=60 * 5
+async def url_retrieve_to_stream(url, timeout=30, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Async generator: yields the URL content as byte chunks."""
+    async for chunk in iterate_in_thread(
+        _iter_url_content(url, timeout=timeout, chunk_size=chunk_size)
+    ):
+        yield chunk
+
+
+def compile_glob_patterns(patterns):
+    """
+    Compile glob patterns into one case-insensitive regex.
+
+    Returns:
+        a match function, or None if any name matches (no pattern or a "*")
+    """
+    if patterns is None or isinstance(patterns, str):
+        patterns = [patterns]
+    if any(pattern in (None, "*") for pattern in patterns):
+        return None
+    regex = "|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns)
+    return re.compile(regex, re.IGNORECASE).match
+
+
+async def collect_from_ftp(  # pylint: disable=too-many-arguments
+    ftp_host,
+    ftp_username,
+    ftp_password,
+    ftp_path,
+    arg=None,
+    timeout=60 * 5,
+    max_connections=10,
+    ftp_pool=None,
 ):
-    """Async generator: yields (filename, size) tuples from the FTP server"""
+    """Async generator: yields (filename, size) tuples from the FTP server
+
+    ``arg`` is a glob pattern or a list of them (case-insensitive), the
+    directory is listed once and every name is matched against all of them.
+    The listing takes one of the ``max_connections`` pooled connections.
+    """
     Logger.info(
         f"Open async connection to FTP server with {ftp_host} "
         f", username: {ftp_username} , password: {ftp_password}"
     )
-
-    def _sync_ftp_list():  # pylint: disable=too-many-branches
-        """Synchronous FTP listing using FTP_TLS - returns a list"""
-        ftp = FTP_TLS(ftp_host, ftp_username, ftp_password, timeout=timeout)
-        ftp.trust_server_pasv_ipv4_address = True
-        try:
-            ftp.cwd(ftp_path)
-
+    name_matches = compile_glob_patterns(arg)
+    ftp_pool = ftp_pool or ftp_connection_pool
+
+    def _sync_ftp_list():
+        """Synchronous FTP listing on a pooled connection - returns a list"""
+        with ftp_pool.connection(
+            ftp_host, ftp_username, ftp_password, ftp_path, timeout=timeout
+        ) as ftp:
             # Use MLSD for detailed file info if available, fall back to NLST + SIZE
             files_with_sizes = []
             try:
                 # MLSD provides detailed info including size
-                all_entries = list(ftp.mlsd())
+                for name, facts in ftp.mlsd():
+                    file_type = facts.get("type")
+                    if file_type in ["dir", "cdir", "pdir"]:
+                        # Skip directories
+                        continue
+                    if name_matches is not None and not name_matches(name):
+                        continue
 
-                for name, facts in all_entries:
-                    if facts.get("type") == "file":
-                        size_str = facts.get("size")
+                    size = None
+                    # Unknown types are included, without a size
+                    if file_type == "file":
                         try:
-                            size = int(size_str) if size_str else None
-                        except (ValueError, TypeError):
+                            size = int(facts["size"])
+                        except (KeyError, ValueError, TypeError):
                             size = None
-
-                        # Apply glob filter if arg is provided (case-insensitive)
-                        if arg is None or fnmatch.fnmatch(name.lower(), arg.lower()):
-                            files_with_sizes.append((name, size))
-                    elif facts.get("type") in ["dir", "cdir", "pdir"]:
-                        # Skip directories
-                        pass
-                    else:
-                        # Unknown type - include if matches filter (case-insensitive)
-                        if arg is None or fnmatch.fnmatch(name.lower(), arg.lower()):
-                            files_with_sizes.append((name, None))
+                    files_with_sizes.append((name, size))
             except error_perm:
                 # MLSD not supported, fall back to NLST
-                if arg:
-                    file_list = ftp.nlst(arg)
-                else:
-                    file_list = ftp.nlst()
+                file_list = [
+                    filename
+                    for filename in ftp.nlst()
+                    if name_matches is None or name_matches(filename)
+                ]
 
                 # Get size for each file
+                ftp.voidcmd("TYPE I")  # Set binary mode
                 for filename in file_list:
                     try:
-                        ftp.voidcmd("TYPE I")  # Set binary mode
                         size = ftp.size(filename)
                     except error_perm:
                         size = None
                     files_with_sizes.append((filename, size))
 
             return files_with_sizes
-        finally:
-            try:
-                ftp.quit()
-            except Exception:  # pylint: disable=broad-exception-caught
-                ftp.close()
 
-    # Run synchronous FTP operations in a thread pool and get the list
-    files_list = await asyncio.to_thread(_sync_ftp_list)
+    # Wait for a connection on the loop, then list in a thread
+    async with ftp_pool.slot(ftp_host, ftp_username, ftp_path, max_connections):
+        await get_rate_limiter().acquire_async(ftp_host)
+        files_list = await asyncio.to_thread(_sync_ftp_list)
 
     # Yield each file as an async generator
 
@@ -671,23 +889,129 @@ async def collect_from_ftp(
         yield FileEntry(name=filename, url=None, size=size)
 
 
-def _sync_ftp_download_to_memory(
-    ftp_host, ftp_username, ftp_password, ftp_path, file_name, ftp_timeout
+def _sync_ftp_iter_content(  # pylint: disable=too-many-arguments,too-many-locals
+    ftp_host,
+    ftp_username,
+    ftp_password,
+    ftp_path,
+    file_name,
+    ftp_timeout,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    ftp_pool=None,
+    progress=None,
 ):
-    """Synchronous FTP download using FTP_TLS to BytesIO"""
-    socket.setdefaulttimeout(ftp_timeout)
-    file_buffer = io.BytesIO()
-    ftp = FTP_TLS(ftp_host, ftp_username, ftp_password, timeout=ftp_timeout)
-    ftp.trust_server_pasv_ipv4_address = True
-    ftp.cwd(ftp_path)
-    ftp.retrbinary("RETR " + file_name, file_buffer.write)
-    ftp.quit()
-    file_buffer.seek(0)  # Reset to beginning for reading
-    return file_buffer.getvalue()  # Return bytes
+    """Synchronous FTP download over a pooled connection, yielding the file chunk by chunk
+
+    With a DownloadProgress that already received bytes, the transfer
+    restarts from that offset (REST). The caller holds the pool slot.
+    """
+    offset = progress.received if progress is not None else 0
+    with (ftp_pool or ftp_connection_pool).connection(
+        ftp_host,
+        ftp_username,
+        ftp_password,
+        ftp_path,
+        timeout=ftp_timeout,
+    ) as ftp:
+        ftp.voidcmd("TYPE I")
+        if offset:
+            try:
+                reply = ftp.sendcmd(f"REST {offset}")
+            except error_perm as error:
+                raise ResumeNotSupportedError(
+                    f"FTP server refused to resume {file_name}: {error}"
+                ) from error
+            if not reply.startswith("3"):
+                raise ResumeNotSupportedError(
+                    f"FTP server refused to resume {file_name}: {reply}"
+                )
+        with ftp.transfercmd("RETR " + file_name) as conn:
+            while True:
+                data = conn.recv(chunk_size)
+                if not data:
+                    break
+                yield data
+            if isinstance(conn, ssl.SSLSocket):
+                conn.unwrap()
+        ftp.voidresp()
+
+
+def _ftp_resumable_stream(  # pylint: disable=too-many-arguments
+    ftp_host,
+    ftp_username,
+    ftp_password,
+    ftp_path,
+    file_name,
+    timeout,
+    max_connections=10,
+    ftp_pool=None,
+):
+    """a file from the FTP server as byte chunks, resumed with REST after drops"""
+    ftp_pool = ftp_pool or ftp_connection_pool
+
+    async def open_stream(progress):
+        # the slot is taken on the loop, the threads only move bytes
+        async with ftp_pool.slot(ftp_host, ftp_username, ftp_path, max_connections):
+            await get_rate_limiter().acquire_async(ftp_host)
+            async for chunk in iterate_in_thread(
+                _sync_ftp_iter_content(
+                    ftp_host,
+                    ftp_username,
+                    ftp_password,
+                    ftp_path,
+                    file_name,
+                    timeout,
+                    ftp_pool=ftp_pool,
+                    progress=progress,
+                )
+            ):
+                yield chunk
+
+    return resumable_stream(open_stream)
 
 
-async def fetch_file_from_ftp_to_memory(  # pylint: disable=too-many-locals
-    ftp_host, ftp_username, ftp_password, ftp_path, file_name, timeout=15
+async def fetch_file_from_ftp_to_stream(  # pylint: disable=too-many-arguments
+    ftp_host,
+    ftp_username,
+    ftp_password,
+    ftp_path,
+    file_name,
+    timeout=15,
+    max_connections=10,
+    ftp_pool=None,
+):
+    """Async generator: yields a file from the FTP server as byte chunks.
+
+    The transfer runs on a pooled connection, at most ``max_connections``
+    are open to the same (host, user, path). An interrupted transfer
+    continues from the received offset.
+    """
+    Logger.info(
+        f"Streaming file from FTP server: {ftp_host} "
+        f", username: {ftp_username} , password: {ftp_password}, file: {file_name}"
+    )
+    async for chunk in _ftp_resumable_stream(
+        ftp_host,
+        ftp_username,
+        ftp_password,
+        ftp_path,
+        file_name,
+        timeout,
+        max_connections=max_connections,
+        ftp_pool=ftp_pool,
+    ):
+        yield chunk
+
+
+async def fetch_file_from_ftp_to_memory(  # pylint: disable=too-many-locals,too-many-arguments
+    ftp_host,
+    ftp_username,
+    ftp_password,
+    ftp_path,
+    file_name,
+    timeout=15,
+    max_connections=10,
+    ftp_pool=None,
 ):
     """Download a file from FTP server directly to memory (BytesIO)."""
     Logger.info(
@@ -706,16 +1030,19 @@ async def fetch_file_from_ftp_to_memory(  # pylint: disable=too-many-locals
 
     while _tries:
         try:
-            file_content = await asyncio.to_thread(
-                _sync_ftp_download_to_memory,
+            file_buffer = io.BytesIO()
+            async for chunk in _ftp_resumable_stream(
                 ftp_host,
                 ftp_username,
                 ftp_password,
                 ftp_path,
                 file_name,
                 _timeout,
-            )
-            return file_content
+                max_connections=max_connections,
+                ftp_pool=ftp_pool,
+            ):
+                file_buffer.write(chunk)
+            return file_buffer.getvalue()
         except exceptions as error:
             _tries -= 1
             is_final_attempt = not _tries
@@ -753,6 +1080,7 @@ async def wget_file_to_memory(file_link, timeout=30):
     """Download file to memory using wget (fallback when requests fails)."""
     Logger.debug(f"trying to download file {file_link} to memory (wget fallback).")
 
+    await get_rate_limiter().acquire_async(file_link)
     process = await asyncio.create_subprocess_shell(
         f"wget --timeout={timeout} --output-document=- '{file_link}'",
         stdout=asyncio.subprocess.PIPE,
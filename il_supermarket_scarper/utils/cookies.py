@@ -0,0 +1,73 @@
+"""In-memory cookie jar of a chain, persisted between runs."""
+
+import os
+import pickle
+from threading import Lock
+
+from .logger import Logger
+
+
+class ChainCookieJar:
+    """
+    In-memory cookies of a chain, shared by all the concurrent tasks of an engine.
+
+    Like the cookie file it replaces, the jar keeps the cookies of the first
+    successful response and sends them on every later request. It can be
+    persisted to (and restored from) a file, to keep a session over restarts.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._cookies = {}
+        self._recorded = False
+
+    def get_cookies(self):
+        """a copy of the cookies to send"""
+        with self._lock:
+            return dict(self._cookies)
+
+    def record_first(self, cookies):
+        """keep the cookies of a successful response, if none were kept yet"""
+        with self._lock:
+            if not self._recorded:
+                self._cookies.update(cookies)
+                self._recorded = True
+
+    def clear(self):
+        """drop all cookies"""
+        with self._lock:
+            self._cookies = {}
+            self._recorded = False
+
+    def persist(self, path):
+        """save the cookies to a file"""
+        with self._lock:
+            cookies = dict(self._cookies)
+        save_cookies(path, cookies)
+
+    def restore(self, path):
+        """load cookies saved by persist, if the file exists"""
+        cookies = load_cookies(path)
+        with self._lock:
+            self._cookies = cookies
+            self._recorded = bool(cookies)
+
+
+def load_cookies(chain_cookie_name):
+    """load the cookies saved for a chain, empty if there are none"""
+    try:
+        with open(chain_cookie_name, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        Logger.debug("Didn't find cookie file")
+        return {}
+    except Exception as e:
+        # There was an issue with reading the file.
+        os.remove(chain_cookie_name)
+        raise e
+
+
+def save_cookies(chain_cookie_name, cookies):
+    """save the cookies of a chain"""
+    with open(chain_cookie_name, "wb") as f:
+        pickle.dump(cookies, f)
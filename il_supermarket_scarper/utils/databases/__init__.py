@@ -1,7 +1,10 @@
 import os
 from .base import AbstractDataBase
+from .async_base import AsyncAbstractDataBase, ExecutorDataBase
 from .json_file import JsonDataBase
-from .mongo import MongoDataBase
+from .jsonl_file import JsonlDataBase
+from .mongo import MongoDataBase, AsyncMongoDataBase
+from .sqlite import SqliteDataBase
 from ..folders_name import DumpFolderNames
 from ..file_output import DiskFileOutput, QueueFileOutput, InMemoryQueueHandler
 
@@ -14,7 +17,7 @@ def create_status_database_for_scraper(scraper_name, config):
         config: Configuration dictionary with database_type and other settings
 
     Returns:
-        JsonDataBase or MongoDataBase instance
+        JsonDataBase, JsonlDataBase, SqliteDataBase or MongoDataBase instance
     """
     target_folder = DumpFolderNames[scraper_name].value
     database_name = target_folder
@@ -33,15 +36,30 @@ def create_status_database_for_scraper(scraper_name, config):
         base_path = config.get("base_path", "dumps/status")
         return JsonDataBase(database_name, base_path=base_path)
 
+    if database_type == "jsonl":
+        # append-only JSON lines database
+        base_path = config.get("base_path", "dumps/status")
+        return JsonlDataBase(database_name, base_path=base_path)
+
+    if database_type == "sqlite":
+        # SQLite database, indexed by file name
+        base_path = config.get("base_path", "dumps/status")
+        return SqliteDataBase(database_name, base_path=base_path)
+
     if database_type == "mongo":
         # MongoDB database
         connection_url = config.get("connection_url", "localhost")
         collection_name = config.get("collection_name", "scraper_status")
-        db = MongoDataBase(database_name, connection_url, collection_name)
+        db = MongoDataBase(
+            database_name,
+            connection_url,
+            collection_name,
+            async_driver=config.get("async_driver", False),
+        )
         return db
 
     raise ValueError(
-        f"Unknown database_type: {database_type}. Must be 'json' or 'mongo'"
+        f"Unknown database_type: {database_type}. Must be 'json', 'jsonl', 'sqlite' or 'mongo'"
     )
 
 
@@ -0,0 +1,119 @@
+"""Async database interface for status writes awaited from the event loop."""
+
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .base import AbstractDataBase
+
+
+class AsyncAbstractDataBase(ABC):
+    """Abstract base class for database operations awaited from the event loop."""
+
+    @abstractmethod
+    async def insert_document(self, collection_name, document):
+        """Insert a document into a collection."""
+
+    @abstractmethod
+    async def insert_documents(self, collection_name, document):
+        """Insert a list of documents into a collection."""
+
+    @abstractmethod
+    async def already_downloaded(self, collection_name, query):
+        """Check if a document is already downloaded based on a query."""
+
+    async def already_downloaded_many(self, collection_name, file_names):
+        """The file names of a batch that have a document in a collection."""
+        found = set()
+        for file_name in file_names:
+            if await self.already_downloaded(collection_name, {"file_name": file_name}):
+                found.add(file_name)
+        return found
+
+    async def count_documents(self, collection_name):  # pylint: disable=unused-argument
+        """Count the documents of a collection, None if the database can't tell."""
+        return None
+
+    async def iter_field_values(
+        self, collection_name, field
+    ):  # pylint: disable=unused-argument
+        """The values of a field over the documents of a collection, None if unlisted."""
+        return None
+
+    @abstractmethod
+    async def get_last_modified(self):
+        """Get the last modified timestamp when scraper last wrote to this database."""
+
+    async def get_metadata(self, key, default=None):  # pylint: disable=unused-argument
+        """Get a value kept in the database metadata."""
+        return default
+
+    async def set_metadata(self, key, value):
+        """Keep a value in the database metadata, databases without metadata ignore it."""
+
+    async def close(self):
+        """Release the resources of the database."""
+
+
+class ExecutorDataBase(AsyncAbstractDataBase):
+    """
+    The async interface of a blocking database.
+
+    The calls run in a single worker thread, so the event loop keeps running
+    while the file or network I/O happens, and writes stay in order.
+    """
+
+    def __init__(self, database: AbstractDataBase):
+        self.database = database
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run(self, method, *args):
+        """run a method of the database in the worker thread"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"db-{self.database.database_name}"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(method, *args)
+        )
+
+    async def insert_document(self, collection_name, document):
+        await self._run(self.database.insert_document, collection_name, document)
+
+    async def insert_documents(self, collection_name, document):
+        await self._run(self.database.insert_documents, collection_name, document)
+
+    async def already_downloaded(self, collection_name, query):
+        return await self._run(self.database.already_downloaded, collection_name, query)
+
+    async def already_downloaded_many(self, collection_name, file_names):
+        return await self._run(
+            self.database.already_downloaded_many, collection_name, list(file_names)
+        )
+
+    async def count_documents(self, collection_name):
+        return await self._run(self.database.count_documents, collection_name)
+
+    async def iter_field_values(self, collection_name, field):
+        return await self._run(self._field_values, collection_name, field)
+
+    def _field_values(self, collection_name, field):
+        """the field values of the database, read in the worker thread"""
+        values = self.database.iter_field_values(collection_name, field)
+        return None if values is None else list(values)
+
+    async def get_last_modified(self):
+        return await self._run(self.database.get_last_modified)
+
+    async def get_metadata(self, key, default=None):
+        return await self._run(self.database.get_metadata, key, default)
+
+    async def set_metadata(self, key, value):
+        await self._run(self.database.set_metadata, key, value)
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
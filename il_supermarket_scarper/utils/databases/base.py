@@ -15,6 +15,11 @@ class AbstractDataBase(ABC):
     def insert_document(self, collection_name, document):
         """Insert a document into a collection."""
 
+    def insert_documents(self, collection_name, document):
+        """Insert a list of documents into a collection."""
+        for item in document:
+            self.insert_document(collection_name, item)
+
     @abstractmethod
     def already_downloaded(self, collection_name, query):
         """Check if a document is already downloaded based on a query."""
@@ -26,3 +31,41 @@ class AbstractDataBase(ABC):
     @abstractmethod
     def _update_last_modified(self):
         """Update the last modified timestamp to current time."""
+
+    def already_downloaded_many(self, collection_name, file_names):
+        """The file names of a batch that have a document in a collection."""
+        return {
+            file_name
+            for file_name in file_names
+            if self.already_downloaded(collection_name, {"file_name": file_name})
+        }
+
+    def count_documents(self, collection_name):  # pylint: disable=unused-argument
+        """Count the documents of a collection, None if the database can't tell."""
+        return None
+
+    def iter_field_values(
+        self, collection_name, field
+    ):  # pylint: disable=unused-argument
+        """
+        The values of a field over the documents of a collection, in bulk.
+
+        None if the database can't list them, lookups then go through
+        already_downloaded.
+        """
+        return None
+
+    def as_async(self):
+        """The async interface of the database, running its calls in a worker thread."""
+        from .async_base import (  # pylint: disable=import-outside-toplevel,cyclic-import
+            ExecutorDataBase,
+        )
+
+        return ExecutorDataBase(self)
+
+    def get_metadata(self, key, default=None):  # pylint: disable=unused-argument
+        """Get a value kept in the database metadata (e.g. the last run statistics)."""
+        return default
+
+    def set_metadata(self, key, value):
+        """Keep a value in the database metadata, databases without metadata ignore it."""
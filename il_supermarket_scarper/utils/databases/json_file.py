@@ -106,6 +106,18 @@ class JsonDataBase(AbstractDataBase):
                     Logger.warning(f"File {file_path} is corrupted.")
         return False
 
+    def count_documents(self, collection_name):
+        """Count the documents of a collection."""
+        return len(self._read_database().get(collection_name, []))
+
+    def iter_field_values(self, collection_name, field):
+        """The values of a field over the documents of a collection."""
+        return [
+            document[field]
+            for document in self._read_database().get(collection_name, [])
+            if field in document
+        ]
+
     def _update_last_modified(self):
         """Update the last modified timestamp to current time."""
         data = self._read_database()
@@ -116,27 +128,45 @@ class JsonDataBase(AbstractDataBase):
         data["_metadata"]["last_modified"] = now.isoformat()
         self._write_database(data)
 
+    def get_metadata(self, key, default=None):
+        """Get a value kept in the database metadata."""
+        return self._read_database().get("_metadata", {}).get(key, default)
+
+    @lock_by_string()
+    def set_metadata(self, key, value):
+        """Keep a value in the database metadata."""
+        data = self._read_database()
+        data.setdefault("_metadata", {})[key] = value
+        self._write_database(data)
+
     def get_last_modified(self):
         """Get the last modified timestamp when scraper last wrote to this database."""
         data = self._read_database()
         if "_metadata" in data and "last_modified" in data["_metadata"]:
-            # Parse the timestamp if it's a string (from JSON)
-            last_modified = data["_metadata"]["last_modified"]
-            if isinstance(last_modified, str):
-
-                # Parse ISO format string
-                try:
-                    # Handle timezone-aware ISO strings
-                    if last_modified.endswith("Z"):
-                        last_modified = last_modified.replace("Z", "+00:00")
-                    parsed = datetime.fromisoformat(last_modified)
-                    # Ensure timezone-aware
-                    if parsed.tzinfo is None:
-                        parsed = pytz.timezone("Asia/Jerusalem").localize(parsed)
-                    return parsed
-                except (ValueError, AttributeError) as e:
-                    Logger.warning(f"Failed to parse last_modified timestamp: {e}")
-                    return None
-            # If it's already a datetime object (shouldn't happen with JSON, but handle it)
-            return last_modified
+            return parse_last_modified(data["_metadata"]["last_modified"])
         return None
+
+    def read_documents(self):
+        """All the collections of the database, with its _metadata."""
+        return self._read_database()
+
+
+def parse_last_modified(last_modified):
+    """Parse a last_modified timestamp kept as an ISO format string."""
+    if isinstance(last_modified, str):
+
+        # Parse ISO format string
+        try:
+            # Handle timezone-aware ISO strings
+            if last_modified.endswith("Z"):
+                last_modified = last_modified.replace("Z", "+00:00")
+            parsed = datetime.fromisoformat(last_modified)
+            # Ensure timezone-aware
+            if parsed.tzinfo is None:
+                parsed = pytz.timezone("Asia/Jerusalem").localize(parsed)
+            return parsed
+        except (ValueError, AttributeError) as e:
+            Logger.warning(f"Failed to parse last_modified timestamp: {e}")
+            return None
+    # If it's already a datetime object (shouldn't happen with JSON, but handle it)
+    return last_modified
@@ -0,0 +1,179 @@
+"""Append-only JSON lines status database."""
+
+import os
+import json
+from ..lock_utils import lock_by_string
+from ..logger import Logger
+from ..status import _now
+from .base import AbstractDataBase
+from .json_file import parse_last_modified
+
+
+class JsonlDataBase(AbstractDataBase):
+    """
+    An append-only JSON lines database.
+
+    Each collection is a segment file of one JSON document per line, so
+    inserting a document appends a line instead of rewriting the whole
+    database like JsonDataBase does. The metadata (last_modified...) lives
+    in a small separate file.
+
+    Layout::
+
+        <base_path>/<database_name>/<collection_name>.jsonl
+        <base_path>/<database_name>/_metadata.json
+    """
+
+    METADATA_FILE = "_metadata.json"
+    SEGMENT_SUFFIX = ".jsonl"
+
+    def __init__(self, database_name, base_path="json_db") -> None:
+        super().__init__(database_name)
+        self.base_path = base_path
+        self.database_path = os.path.join(base_path, self.database_name)
+        os.makedirs(self.database_path, exist_ok=True)
+        # segments whose last line was checked since the database was opened
+        self._checked_segments = set()
+
+    def _get_segment_path(self, collection_name):
+        """Get the path of the segment file of a collection."""
+        return os.path.join(
+            self.database_path, f"{collection_name}{self.SEGMENT_SUFFIX}"
+        )
+
+    def _get_metadata_path(self):
+        """Get the path of the metadata file."""
+        return os.path.join(self.database_path, self.METADATA_FILE)
+
+    def _append(self, collection_name, documents):
+        """Append documents to the segment of a collection, in a single write."""
+        lines = "".join(
+            json.dumps(document, default=str) + "\n" for document in documents
+        )
+        segment_path = self._get_segment_path(collection_name)
+        if collection_name not in self._checked_segments:
+            # a crash may have cut the last line, don't glue the next one to it
+            self._checked_segments.add(collection_name)
+            if not self._ends_with_new_line(segment_path):
+                lines = "\n" + lines
+        with open(segment_path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+    @staticmethod
+    def _ends_with_new_line(segment_path):
+        """Whether a segment is missing or ends with a complete line."""
+        if not os.path.exists(segment_path) or os.path.getsize(segment_path) == 0:
+            return True
+        with open(segment_path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def _read_segment(self, collection_name):
+        """Yield the documents of a collection, skipping damaged lines."""
+        segment_path = self._get_segment_path(collection_name)
+        if not os.path.exists(segment_path):
+            return
+        with open(segment_path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # e.g. a line cut by a crash in the middle of a write
+                    Logger.warning(
+                        f"Skipping corrupted line {line_number} of {segment_path}"
+                    )
+
+    def _read_metadata(self):
+        """Read the metadata file."""
+        metadata_path = self._get_metadata_path()
+        if not os.path.exists(metadata_path):
+            return {}
+        with open(metadata_path, "r", encoding="utf-8") as file:
+            try:
+                return json.load(file)
+            except json.JSONDecodeError:
+                Logger.warning(f"File {metadata_path} is corrupted, resetting it.")
+                return {}
+
+    def _write_metadata(self, metadata):
+        """Replace the metadata file, readers never see a partial file."""
+        metadata_path = self._get_metadata_path()
+        temp_path = f"{metadata_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(metadata, file, default=str, indent=4)
+        os.replace(temp_path, metadata_path)
+
+    @lock_by_string()
+    def insert_documents(self, collection_name, document):
+        """Append documents to a collection."""
+        self._append(collection_name, document)
+        self._update_last_modified()
+
+    @lock_by_string()
+    def insert_document(self, collection_name, document):
+        """Append a document to a collection."""
+        self._append(collection_name, [document])
+        self._update_last_modified()
+
+    def already_downloaded(self, collection_name, query):
+        """Find a document in a collection based on a query."""
+        for document in self._read_segment(collection_name):
+            if all(item in document.items() for item in query.items()):
+                return True
+        return False
+
+    def count_documents(self, collection_name):
+        """Count the documents of a collection."""
+        return sum(1 for _ in self._read_segment(collection_name))
+
+    def iter_field_values(self, collection_name, field):
+        """The values of a field over the documents of a collection."""
+        return (
+            document[field]
+            for document in self._read_segment(collection_name)
+            if field in document
+        )
+
+    def _update_last_modified(self):
+        """Update the last modified timestamp to current time."""
+        metadata = self._read_metadata()
+        # Store as ISO format string for reliable parsing
+        metadata["last_modified"] = _now().isoformat()
+        self._write_metadata(metadata)
+
+    def get_last_modified(self):
+        """Get the last modified timestamp when scraper last wrote to this database."""
+        last_modified = self._read_metadata().get("last_modified")
+        if last_modified is None:
+            return None
+        return parse_last_modified(last_modified)
+
+    def get_metadata(self, key, default=None):
+        """Get a value kept in the database metadata."""
+        return self._read_metadata().get(key, default)
+
+    @lock_by_string()
+    def set_metadata(self, key, value):
+        """Keep a value in the database metadata."""
+        metadata = self._read_metadata()
+        metadata[key] = value
+        self._write_metadata(metadata)
+
+    def read_documents(self):
+        """
+        All the collections of the database, with its _metadata.
+
+        The same view as the file of a JsonDataBase, e.g. for validating
+        it with ScraperStatusOutput.
+        """
+        data = {}
+        for file_name in os.listdir(self.database_path):
+            if file_name.endswith(self.SEGMENT_SUFFIX):
+                collection_name = file_name[: -len(self.SEGMENT_SUFFIX)]
+                data[collection_name] = list(self._read_segment(collection_name))
+        metadata = self._read_metadata()
+        if metadata:
+            data["_metadata"] = metadata
+        return dict(sorted(data.items()))
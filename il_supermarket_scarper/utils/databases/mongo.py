@@ -1,23 +1,77 @@
+from ..logger import Logger
 from ..status import _now
 from .base import AbstractDataBase
+from .async_base import AsyncAbstractDataBase
 
 
-pymongo_installed = True
+pymongo_installed = True  # pylint: disable=invalid-name
 try:
     import pymongo
+    from pymongo.errors import BulkWriteError
 except ImportError:
-    pymongo_installed = False
+    pymongo_installed = False  # pylint: disable=invalid-name
+
+    class BulkWriteError(Exception):
+        """stands in for pymongo's, which nothing raises without it"""
+
+
+async_mongo_installed = True  # pylint: disable=invalid-name
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    except ImportError:
+        async_mongo_installed = False  # pylint: disable=invalid-name
+
+
+# the fields the status collections are looked up by
+INDEXES = {
+    "verified_downloads": ["file_name"],
+    "events": ["task_id", "status"],
+}
+# the values of a single $in lookup
+IN_QUERY_BATCH_SIZE = 1000
+# MongoDB's duplicate key error code
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _only_duplicates(error) -> bool:
+    """whether a bulk insert failed only on documents already inserted"""
+    write_errors = error.details.get("writeErrors", [])
+    return bool(write_errors) and all(
+        write_error.get("code") == DUPLICATE_KEY_ERROR for write_error in write_errors
+    )
 
 
 class MongoDataBase(AbstractDataBase):
     """A class that represents a MongoDB database."""
 
-    def __init__(self, database_name, connection_url, collection_name) -> None:
+    def __init__(
+        self, database_name, connection_url, collection_name, async_driver=False
+    ) -> None:
+        """
+        Args:
+            async_driver: use an async MongoDB client (pymongo's
+                AsyncMongoClient, or motor) from the event loop, instead of
+                running the blocking client in a worker thread
+        """
         super().__init__(database_name)
         self.myclient = None
         self.store_db = None
         self.connection_url = connection_url
         self.collection_name = collection_name
+        self.async_driver = async_driver
+
+    def as_async(self):
+        """The async interface of the database, with the async driver if enabled."""
+        if self.async_driver:
+            if async_mongo_installed:
+                return AsyncMongoDataBase(
+                    self.database_name, self.connection_url, self.collection_name
+                )
+            Logger.warning("No async MongoDB driver installed, using a worker thread")
+        return super().as_async()
 
     def create_connection(self):
         """Create a connection to the MongoDB database."""
@@ -26,6 +80,13 @@ class MongoDataBase(AbstractDataBase):
                 f"{self.connection_url}/{self.collection_name}"
             )
             self.store_db = self.myclient[self.database_name]
+            self.create_indexes()
+
+    def create_indexes(self):
+        """Create the indexes of the status collections, if missing."""
+        for collection_name, fields in INDEXES.items():
+            for field in fields:
+                self.store_db[collection_name].create_index(field)
 
     def insert_document(self, collection_name, document):
         """Insert a document into a MongoDB collection."""
@@ -34,12 +95,55 @@ class MongoDataBase(AbstractDataBase):
         self.store_db[collection_name].insert_one(document)
         self._update_last_modified()
 
+    def insert_documents(self, collection_name, document):
+        """Insert a list of documents into a MongoDB collection, in one bulk write."""
+        if not document:
+            return
+        if self.store_db is None:
+            self.create_connection()
+        try:
+            self.store_db[collection_name].insert_many(document, ordered=False)
+        except BulkWriteError as error:
+            # a retried batch, whose documents were partly inserted already
+            if not _only_duplicates(error):
+                raise
+        self._update_last_modified()
+
     def already_downloaded(self, collection_name, query):
         """Find a document in a MongoDB collection."""
         if self.store_db is None:
             self.create_connection()
         return self.store_db[collection_name].find_one(query)
 
+    def already_downloaded_many(self, collection_name, file_names):
+        """The file names found in a MongoDB collection, with batched $in lookups."""
+        if self.store_db is None:
+            self.create_connection()
+        file_names = list(file_names)
+        found = set()
+        for start in range(0, len(file_names), IN_QUERY_BATCH_SIZE):
+            cursor = self.store_db[collection_name].find(
+                {"file_name": {"$in": file_names[start : start + IN_QUERY_BATCH_SIZE]}},
+                {"file_name": 1, "_id": 0},
+            )
+            found.update(document["file_name"] for document in cursor)
+        return found
+
+    def count_documents(self, collection_name):
+        """Count the documents of a MongoDB collection."""
+        if self.store_db is None:
+            self.create_connection()
+        return self.store_db[collection_name].count_documents({})
+
+    def iter_field_values(self, collection_name, field):
+        """The values of a field over the documents of a MongoDB collection."""
+        if self.store_db is None:
+            self.create_connection()
+        cursor = self.store_db[collection_name].find(
+            {field: {"$exists": True}}, {field: 1, "_id": 0}
+        )
+        return (document[field] for document in cursor)
+
     def _update_last_modified(self):
         """Update the last modified timestamp to current time."""
         if self.store_db is None:
@@ -48,6 +152,21 @@ class MongoDataBase(AbstractDataBase):
             {}, {"$set": {"last_modified": _now()}}, upsert=True
         )
 
+    def get_metadata(self, key, default=None):
+        """Get a value kept in the database metadata."""
+        if self.store_db is None:
+            self.create_connection()
+        metadata = self.store_db["_metadata"].find_one({})
+        if metadata and key in metadata:
+            return metadata[key]
+        return default
+
+    def set_metadata(self, key, value):
+        """Keep a value in the database metadata."""
+        if self.store_db is None:
+            self.create_connection()
+        self.store_db["_metadata"].update_one({}, {"$set": {key: value}}, upsert=True)
+
     def get_last_modified(self):
         """Get the last modified timestamp when scraper last wrote to this database."""
         if self.store_db is None:
@@ -56,3 +175,98 @@ class MongoDataBase(AbstractDataBase):
         if metadata and "last_modified" in metadata:
             return metadata["last_modified"]
         return None
+
+
+class AsyncMongoDataBase(AsyncAbstractDataBase):
+    """A MongoDB database used through an async client."""
+
+    def __init__(self, database_name, connection_url, collection_name) -> None:
+        self.database_name = database_name
+        self.connection_url = connection_url
+        self.collection_name = collection_name
+        self.myclient = None
+        self.store_db = None
+
+    def create_connection(self):
+        """Create a connection to the MongoDB database, on the running event loop."""
+        self.myclient = AsyncMongoClient(
+            f"{self.connection_url}/{self.collection_name}"
+        )
+        self.store_db = self.myclient[self.database_name]
+
+    async def _get_db(self):
+        if self.store_db is None:
+            self.create_connection()
+            for collection_name, fields in INDEXES.items():
+                for field in fields:
+                    await self.store_db[collection_name].create_index(field)
+        return self.store_db
+
+    async def insert_document(self, collection_name, document):
+        await (await self._get_db())[collection_name].insert_one(document)
+        await self._update_last_modified()
+
+    async def insert_documents(self, collection_name, document):
+        if not document:
+            return
+        try:
+            await (await self._get_db())[collection_name].insert_many(
+                document, ordered=False
+            )
+        except BulkWriteError as error:
+            if not _only_duplicates(error):
+                raise
+        await self._update_last_modified()
+
+    async def already_downloaded(self, collection_name, query):
+        return await (await self._get_db())[collection_name].find_one(query)
+
+    async def already_downloaded_many(self, collection_name, file_names):
+        file_names = list(file_names)
+        collection = (await self._get_db())[collection_name]
+        found = set()
+        for start in range(0, len(file_names), IN_QUERY_BATCH_SIZE):
+            cursor = collection.find(
+                {"file_name": {"$in": file_names[start : start + IN_QUERY_BATCH_SIZE]}},
+                {"file_name": 1, "_id": 0},
+            )
+            found.update([document["file_name"] async for document in cursor])
+        return found
+
+    async def count_documents(self, collection_name):
+        return await (await self._get_db())[collection_name].count_documents({})
+
+    async def iter_field_values(self, collection_name, field):
+        cursor = (await self._get_db())[collection_name].find(
+            {field: {"$exists": True}}, {field: 1, "_id": 0}
+        )
+        return [document[field] async for document in cursor]
+
+    async def _update_last_modified(self):
+        """Update the last modified timestamp to current time."""
+        await (await self._get_db())["_metadata"].update_one(
+            {}, {"$set": {"last_modified": _now()}}, upsert=True
+        )
+
+    async def get_last_modified(self):
+        return await self.get_metadata("last_modified")
+
+    async def get_metadata(self, key, default=None):
+        metadata = await (await self._get_db())["_metadata"].find_one({})
+        if metadata and key in metadata:
+            return metadata[key]
+        return default
+
+    async def set_metadata(self, key, value):
+        await (await self._get_db())["_metadata"].update_one(
+            {}, {"$set": {key: value}}, upsert=True
+        )
+
+    async def close(self):
+        if self.myclient is not None:
+            result = self.myclient.close()
+            if hasattr(result, "__await__"):
+                # pymongo's AsyncMongoClient.close is a coroutine, motor's isn't
+                await result
+            self.myclient = None
+            self.store_db = None
@@ -0,0 +1,229 @@
+"""SQLite status database with indexed file lookups."""
+
+import os
+import json
+import sqlite3
+import threading
+from ..status import _now
+from .base import AbstractDataBase
+from .json_file import parse_last_modified
+
+
+class SqliteDataBase(AbstractDataBase):
+    """
+    A class that represents a SQLite database.
+
+    Each collection is a table of JSON documents, with their file_name in an
+    indexed column so already_downloaded looks a file up instead of scanning
+    every document. The database runs in WAL mode (readers like the health
+    check don't block the scraper) and every insert, with its last_modified
+    update, is a single transaction.
+    """
+
+    def __init__(self, database_name, base_path="sqlite_db") -> None:
+        super().__init__(database_name)
+        self.base_path = base_path
+        self.database_file = os.path.join(base_path, f"{self.database_name}.sqlite")
+        os.makedirs(self.base_path, exist_ok=True)
+        self._connection = None
+        self._lock = threading.Lock()
+        self._tables = set()
+
+    def __getstate__(self):
+        """Connections can't be pickled, each process opens its own."""
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_lock"] = None
+        state["_tables"] = set()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get_connection(self):
+        """Open the database on first use."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.database_file, timeout=30, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS _metadata (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def _table(collection_name):
+        """The quoted table name of a collection."""
+        escaped = collection_name.replace('"', '""')
+        return f'"{escaped}"'
+
+    def _ensure_table(self, connection, collection_name):
+        """Create the table of a collection and its file_name index."""
+        if collection_name in self._tables:
+            return
+        table = self._table(collection_name)
+        index = self._table(f"{collection_name}_file_name")
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(id INTEGER PRIMARY KEY, file_name TEXT, document TEXT NOT NULL)"
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (file_name)")
+        self._tables.add(collection_name)
+
+    def _has_table(self, connection, collection_name):
+        """Whether a collection has a table."""
+        if collection_name in self._tables:
+            return True
+        return (
+            connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                (collection_name,),
+            ).fetchone()
+            is not None
+        )
+
+    @staticmethod
+    def _encode(document):
+        """The file_name column and JSON text of a document."""
+        return document.get("file_name"), json.dumps(document, default=str)
+
+    def insert_documents(self, collection_name, document):
+        """Insert documents into a collection, in a single transaction."""
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                self._ensure_table(connection, collection_name)
+                connection.executemany(
+                    f"INSERT INTO {self._table(collection_name)} "
+                    "(file_name, document) VALUES (?, ?)",
+                    [self._encode(item) for item in document],
+                )
+                self._set_metadata_value(
+                    connection, "last_modified", _now().isoformat()
+                )
+
+    def insert_document(self, collection_name, document):
+        """Insert a document into a collection."""
+        self.insert_documents(collection_name, [document])
+
+    def already_downloaded(self, collection_name, query):
+        """Find a document in a collection, by its indexed file_name if queried."""
+        with self._lock:
+            connection = self._get_connection()
+            if not self._has_table(connection, collection_name):
+                return False
+            table = self._table(collection_name)
+            if "file_name" in query:
+                rows = connection.execute(
+                    f"SELECT document FROM {table} WHERE file_name = ?",
+                    (query["file_name"],),
+                )
+            else:
+                rows = connection.execute(f"SELECT document FROM {table}")
+            for (document,) in rows:
+                document = json.loads(document)
+                if all(item in document.items() for item in query.items()):
+                    return True
+        return False
+
+    def count_documents(self, collection_name):
+        """Count the documents of a collection."""
+        with self._lock:
+            connection = self._get_connection()
+            if not self._has_table(connection, collection_name):
+                return 0
+            return connection.execute(
+                f"SELECT COUNT(*) FROM {self._table(collection_name)}"
+            ).fetchone()[0]
+
+    def iter_field_values(self, collection_name, field):
+        """The values of a field over the documents of a collection."""
+        with self._lock:
+            connection = self._get_connection()
+            if not self._has_table(connection, collection_name):
+                return []
+            table = self._table(collection_name)
+            if field == "file_name":
+                rows = connection.execute(
+                    f"SELECT file_name FROM {table} WHERE file_name IS NOT NULL"
+                ).fetchall()
+                return [value for (value,) in rows]
+            values = []
+            for (document,) in connection.execute(f"SELECT document FROM {table}"):
+                document = json.loads(document)
+                if field in document:
+                    values.append(document[field])
+            return values
+
+    @staticmethod
+    def _set_metadata_value(connection, key, value):
+        """Upsert a metadata value, in the transaction of connection."""
+        connection.execute(
+            "INSERT INTO _metadata (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, default=str)),
+        )
+
+    def _update_last_modified(self):
+        """Update the last modified timestamp to current time."""
+        self.set_metadata("last_modified", _now().isoformat())
+
+    def get_last_modified(self):
+        """Get the last modified timestamp when scraper last wrote to this database."""
+        last_modified = self.get_metadata("last_modified")
+        if last_modified is None:
+            return None
+        return parse_last_modified(last_modified)
+
+    def get_metadata(self, key, default=None):
+        """Get a value kept in the database metadata."""
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute("SELECT value FROM _metadata WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return default if row is None else json.loads(row[0])
+
+    def set_metadata(self, key, value):
+        """Keep a value in the database metadata."""
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                self._set_metadata_value(connection, key, value)
+
+    def read_documents(self):
+        """All the collections of the database, with its _metadata."""
+        with self._lock:
+            connection = self._get_connection()
+            data = {}
+            collections = connection.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type='table' AND name != '_metadata' ORDER BY name"
+            ).fetchall()
+            for (collection_name,) in collections:
+                data[collection_name] = [
+                    json.loads(document)
+                    for (document,) in connection.execute(
+                        f"SELECT document FROM {self._table(collection_name)} "
+                        "ORDER BY id"
+                    )
+                ]
+            metadata = {
+                key: json.loads(value)
+                for key, value in connection.execute("SELECT key, value FROM _metadata")
+            }
+        if metadata:
+            data["_metadata"] = metadata
+        return dict(sorted(data.items()))
+
+    def close(self):
+        """Close the connection, it is opened again on the next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,94 @@
+"""In-memory index of the files a chain already downloaded."""
+
+import hashlib
+import math
+from typing import Callable, Iterable, Optional
+
+
+class BloomFilter:
+    """
+    A compact set that may answer false positives, but never false negatives.
+
+    Sized for ``capacity`` items at a false positive rate of ``error_rate``.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        """the bits of item, from two halves of one digest (double hashing)"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str):
+        """add item to the filter"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class DownloadedIndex:
+    """
+    The names of the files already downloaded, loaded once per scrape.
+
+    Lookups are set operations in memory instead of a database query per
+    file. Histories larger than ``bloom_threshold`` are kept in a Bloom
+    filter instead of a set: a miss is certain, a hit is confirmed with the
+    exact (slower) ``confirm`` lookup.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        expected_size: int = 0,
+        bloom_threshold: Optional[int] = None,
+        confirm: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Args:
+            names: the names of the files already downloaded
+            expected_size: how many names there are, to size the Bloom filter
+            bloom_threshold: keep more names than this in a Bloom filter,
+                None always keeps an exact set
+            confirm: exact lookup of a name, required with a Bloom filter
+        """
+        if bloom_threshold is not None and expected_size > bloom_threshold:
+            if confirm is None:
+                raise ValueError("A Bloom filter index requires a confirm lookup")
+            # room for the files downloaded during the scrape
+            self._names = BloomFilter(2 * expected_size)
+        else:
+            self._names = set()
+        self._confirm = confirm
+        self._count = 0
+        for name in names:
+            self.add(name)
+
+    @property
+    def is_exact(self) -> bool:
+        """whether the index answers without confirming hits"""
+        return isinstance(self._names, set)
+
+    def add(self, name: str):
+        """record a downloaded file"""
+        self._names.add(name)
+        self._count += 1
+
+    def __contains__(self, name: str) -> bool:
+        if name not in self._names:
+            return False
+        return self.is_exact or self._confirm(name)
+
+    def __len__(self) -> int:
+        return len(self._names) if self.is_exact else self._count
@@ -0,0 +1,139 @@
+"""Buffered writes of status documents to a status database."""
+
+import asyncio
+import contextlib
+from typing import Optional
+
+from .logger import Logger
+from .databases import AbstractDataBase, AsyncAbstractDataBase
+
+
+class BufferedEventSink:  # pylint: disable=too-many-instance-attributes
+    """
+    Queue documents in memory and write them to a collection in batches.
+
+    A batch is written (with one insert_documents call) once ``batch_size``
+    documents are queued, and every ``flush_interval`` seconds by a
+    background task of the running event loop. Once started on a loop, the
+    batches are written through the async interface of the database, so
+    the downloads keep running meanwhile. aclose() (or close() outside the
+    loop) stops the task and writes what is left.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        database: AbstractDataBase,
+        collection_name: str,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        async_database: Optional[AsyncAbstractDataBase] = None,
+    ):
+        self.database = database
+        self.async_database = async_database or database.as_async()
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._documents = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._pending_flushes = set()
+
+    def __len__(self):
+        return len(self._documents)
+
+    @property
+    def started(self) -> bool:
+        """whether the batches are written from the event loop"""
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def start(self):
+        """flush periodically from the running event loop, if there is one"""
+        if self.started:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no loop, batches are written synchronously
+            return
+        # asyncio primitives are bound to the loop they are used on
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = loop.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        """write the queued documents every flush_interval seconds"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_async()
+
+    def add(self, document):
+        """queue a document, writing the batch when it is full"""
+        self._documents.append(document)
+        if len(self._documents) < self.batch_size:
+            return
+        if self.started:
+            flush = self._flush_task.get_loop().create_task(self.flush_async())
+            self._pending_flushes.add(flush)
+            flush.add_done_callback(self._pending_flushes.discard)
+        else:
+            self.flush()
+
+    def _take_documents(self):
+        """the queued documents, emptying the queue"""
+        documents, self._documents = self._documents, []
+        return documents
+
+    def _write_failed(self, documents, error):
+        """keep the documents of a failed write for the next flush"""
+        Logger.error(
+            f"Failed writing {len(documents)} documents "
+            f"to {self.collection_name}: {error}"
+        )
+        self._documents = documents + self._documents
+
+    def flush(self):
+        """write the queued documents, blocking"""
+        documents = self._take_documents()
+        if not documents:
+            return
+        try:
+            self.database.insert_documents(self.collection_name, documents)
+        except Exception as error:  # pylint: disable=broad-except
+            self._write_failed(documents, error)
+
+    async def flush_async(self):
+        """write the queued documents, in order with the other async flushes"""
+        async with self._flush_lock:
+            documents = self._take_documents()
+            if not documents:
+                return
+            try:
+                await self.async_database.insert_documents(
+                    self.collection_name, documents
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                self._write_failed(documents, error)
+
+    def _stop_flushing(self):
+        """cancel the periodic flush task"""
+        if self._flush_task is not None:
+            with contextlib.suppress(RuntimeError):
+                # the loop of the task may already be closed
+                self._flush_task.cancel()
+            self._flush_task = None
+
+    async def aclose(self):
+        """stop flushing periodically, wait for the writes and write what is left"""
+        if not self.started:
+            self._stop_flushing()
+            self.flush()
+            return
+        async with self._flush_lock:
+            # not in the middle of a write, which the cancellation could cut
+            self._stop_flushing()
+        await asyncio.gather(*self._pending_flushes)
+        await self.flush_async()
+
+    def close(self):
+        """stop flushing periodically and write what is left, blocking"""
+        self._stop_flushing()
+        self.flush()
@@ -1,2 +1,23 @@
 class RestartSessionError(Exception):
     """This error will be raised if we would like to retry to downalod after a session restart"""
+
+
+class ExtractionError(ValueError):
+    """This error will be raised if a downloaded file couldn't be extracted"""
+
+
+class HttpStatusError(OSError):
+    """This error will be raised if a server answered with an error status code"""
+
+    def __init__(self, status, url):
+        super().__init__(f"Response for {url}, returned with status {status}")
+        self.status = status
+        self.url = url
+
+
+class IncompleteDownloadError(ConnectionError):
+    """This error will be raised if a transfer ended before the whole file arrived"""
+
+
+class ResumeNotSupportedError(ConnectionError):
+    """This error will be raised if a server can't continue a partial transfer"""
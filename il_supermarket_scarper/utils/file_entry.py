@@ -2,6 +2,8 @@
 
 from typing import NamedTuple, Optional
 
+from .file_name_parser import ParsedFileName, parse_file_name
+
 
 class FileEntry(NamedTuple):
     """
@@ -14,3 +16,8 @@ class FileEntry(NamedTuple):
     name: str
     url: str
     size: Optional[int]
+
+    @property
+    def parsed(self) -> ParsedFileName:
+        """the type, chain, store and publish time in the file name"""
+        return parse_file_name(self.name)
@@ -0,0 +1,72 @@
+"""Parse the fields of the price transparency file names once."""
+
+import datetime
+import functools
+import re
+from typing import NamedTuple, Optional
+
+from .file_types import FileTypesFilters, classify_file_name
+
+# names parsed once and kept, listings repeat them through the filters
+FILE_NAMES_CACHE_SIZE = 2**16
+
+# PriceFull7290875100001-009-202601121522(.gz)
+# Promo7290700100008-000-207-20250224-103225
+# Price7290172900007-001-20250101123456
+FILE_NAME_PATTERN = re.compile(
+    r"(?P<chain_id>\d{13})?"
+    r"(?P<segments>(?:-\d+)*?)"
+    r"-(?P<date>\d{8})(?:(?P<time>\d{4})(?:\d{2})?|-(?P<seconds_time>\d{4})\d{2})?"
+    r"(?=-|\.|$)"
+)
+CHAIN_ID_PATTERN = re.compile(r"\d{13}")
+
+
+class ParsedFileName(NamedTuple):
+    """The fields of a file name, None where the name doesn't have them."""
+
+    file_type: Optional[FileTypesFilters]
+    chain_id: Optional[str]
+    store_id: Optional[int]
+    timestamp: Optional[datetime.datetime]
+
+    @property
+    def date(self) -> Optional[datetime.date]:
+        """the day the file was published"""
+        return None if self.timestamp is None else self.timestamp.date()
+
+
+def _parse_timestamp(date, time):
+    """the timestamp of the date (YYYYMMDD) and time (HHMM) of a name"""
+    time = time or "0000"
+    try:
+        return datetime.datetime(
+            int(date[:4]), int(date[4:6]), int(date[6:]), int(time[:2]), int(time[2:])
+        )
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=FILE_NAMES_CACHE_SIZE)
+def parse_file_name(file_name: str) -> ParsedFileName:
+    """
+    Parse the type, chain, store and publish time of a file name.
+
+    The store is the number right before the timestamp. Parsed names are
+    cached, so the filters of a listing parse each name once.
+    """
+    types = classify_file_name(file_name)
+    file_type = FileTypesFilters[types[0]] if types else None
+    match = FILE_NAME_PATTERN.search(file_name)
+    if match is None:
+        chain_id = CHAIN_ID_PATTERN.search(file_name)
+        return ParsedFileName(file_type, chain_id and chain_id.group(), None, None)
+    segments = match.group("segments")
+    return ParsedFileName(
+        file_type,
+        match.group("chain_id"),
+        int(segments.rsplit("-", 1)[-1]) if segments else None,
+        _parse_timestamp(
+            match.group("date"), match.group("time") or match.group("seconds_time")
+        ),
+    )
@@ -1,12 +1,96 @@
 """Abstract file output interface for saving scraped files."""
 
 import asyncio
+import contextlib
+import io
 import multiprocessing
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Any, Dict, AsyncGenerator
+from typing import Any, Dict, AsyncGenerator, AsyncIterator, Awaitable, Callable
 import os
 from .logger import Logger
-from .gzip_utils import extract_xml_from_gz_in_memory
+from .exceptions import ExtractionError
+from .gzip_utils import extract_xml_from_gz_in_memory, StreamDecompressor
+
+
+async def drain_chunks(
+    chunks: AsyncIterator[bytes], write: Callable[[bytes], Awaitable[Any]]
+) -> int:
+    """
+    Feed every chunk of an async byte iterator to ``write``.
+
+    The iterator is closed even if writing fails, so the underlying
+    connection is released right away.
+
+    Returns:
+        Number of bytes consumed.
+    """
+    received = 0
+    try:
+        async for chunk in chunks:
+            await write(chunk)
+            received += len(chunk)
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return received
+
+
+class _PassThroughSink:  # pylint: disable=too-few-public-methods
+    """Write streamed chunks to a file object as they are"""
+
+    def __init__(self, target):
+        self.write = target.write
+
+    def finish(self):
+        """nothing is buffered"""
+
+
+class _RawCopySink:  # pylint: disable=too-few-public-methods
+    """
+    Copy the downloaded bytes aside while a sink extracts them.
+
+    An extraction error is held until finish, so the whole download is still
+    copied and can be kept as it is.
+    """
+
+    def __init__(self, sink, raw_target):
+        self.sink = sink
+        self.raw_target = raw_target
+        self.error = None
+
+    def write(self, chunk):
+        """copy the chunk, then extract it unless the extraction failed"""
+        self.raw_target.write(chunk)
+        if self.error is None:
+            try:
+                self.sink.write(chunk)
+            except ExtractionError as exception:
+                self.error = exception
+
+    def finish(self):
+        """raise the extraction error, if any"""
+        if self.error is not None:
+            raise self.error
+        self.sink.finish()
+
+
+class _OutputError(Exception):
+    """An OSError of the output files, as opposed to one of the download"""
+
+
+def _on_output(func, *args):
+    """call func on the output files, wrapping their OSErrors"""
+    try:
+        return func(*args)
+    except OSError as exception:
+        raise _OutputError(str(exception)) from exception
+
+
+async def _to_output(func, *args):
+    """call func on the output files in a thread, wrapping their OSErrors"""
+    return await asyncio.to_thread(_on_output, func, *args)
 
 
 class FileOutput(ABC):
@@ -33,6 +117,47 @@ class FileOutput(ABC):
             Dict with keys: file_name, saved, error, metadata
         """
 
+    async def save_stream(
+        self,
+        file_link: str,
+        file_name: str,
+        chunks: AsyncIterator[bytes],
+        metadata: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Save a file delivered as an async iterator of byte chunks.
+
+        Errors raised while reading ``chunks`` (connection drops, timeouts)
+        propagate to the caller after any partial output was discarded, so the
+        download can be retried. Errors while extracting or persisting the
+        complete file are reported in the returned dict, like ``save_file``.
+
+        The default implementation buffers the chunks and delegates to
+        ``save_file``; subclasses override it to consume the chunks
+        incrementally.
+
+        Args:
+            file_link: The URL where the file was downloaded from
+            file_name: The name of the file
+            chunks: Async iterator yielding the raw file content
+            metadata: Optional metadata about the file (chain_id, store_id, etc.)
+
+        Returns:
+            Dict with keys: file_name, saved, error, metadata
+        """
+        file_buffer = io.BytesIO()
+
+        async def _write(chunk):
+            file_buffer.write(chunk)
+
+        await drain_chunks(chunks, _write)
+        return await self.save_file(
+            file_link=file_link,
+            file_name=file_name,
+            file_content=file_buffer.getvalue(),
+            metadata=metadata,
+        )
+
     async def _extract_if_compressed(
         self, file_content: bytes, file_name: str, extract_gz: bool = True
     ) -> tuple[bytes, str, bool]:
@@ -55,6 +180,22 @@ class FileOutput(ABC):
             Logger.error(f"Failed to extract {file_name}: {e}")
             return file_content, file_name, False
 
+    def _stream_sink(
+        self, file_name: str, extract_gz: bool = True
+    ) -> tuple[Callable[[Any], Any], str]:
+        """
+        Pick the stage streamed chunks are written through.
+
+        Returns:
+            (factory wrapping a writable file object, filename to save under)
+        """
+        if not extract_gz or not file_name.endswith(".gz"):
+            return _PassThroughSink, file_name
+        return (
+            lambda target: StreamDecompressor(target, file_name),
+            os.path.splitext(file_name)[0] + ".xml",
+        )
+
     @abstractmethod
     def make_sure_accassible(self):
         """create the storage path"""
@@ -128,6 +269,73 @@ class DiskFileOutput(FileOutput):
             "metadata": metadata or {},
         }
 
+    async def save_stream(  # pylint: disable=too-many-locals
+        self,
+        file_link: str,
+        file_name: str,
+        chunks: AsyncIterator[bytes],
+        metadata: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write chunks (decompressed on the fly) to a partial file, then rename it.
+
+        A compressed download is also copied as it arrives, so when it can't be
+        extracted the raw file is kept, like save_file does.
+        """
+        sink_factory, target_name = self._stream_sink(file_name, self.extract_gz)
+        part_paths = [os.path.join(self.storage_path, target_name + ".part")]
+        if target_name != file_name:
+            part_paths.append(os.path.join(self.storage_path, file_name + ".part"))
+        saved = False
+        extract_successfully = False
+        error = None
+        try:
+            with contextlib.ExitStack() as part_files:
+                files = [
+                    part_files.enter_context(_on_output(open, path, "wb"))
+                    for path in part_paths
+                ]
+                sink = sink_factory(files[0])
+                if len(files) > 1:
+                    sink = _RawCopySink(sink, files[1])
+
+                async def _write(chunk):
+                    await _to_output(sink.write, chunk)
+
+                received = await drain_chunks(chunks, _write)
+                await _to_output(sink.finish)
+
+            _on_output(os.replace, part_paths[0], part_paths[0][: -len(".part")])
+            file_name = target_name
+            saved = True
+            extract_successfully = True
+            Logger.debug(
+                f"Saved {file_link} ({received} bytes) to {self.storage_path}/{file_name}"
+            )
+        except ExtractionError as exception:
+            Logger.error(f"Failed to extract {file_name}: {exception}")
+            error = str(exception)
+            try:
+                _on_output(os.replace, part_paths[-1], part_paths[-1][: -len(".part")])
+                saved = True
+            except _OutputError as output_error:
+                Logger.error(f"Error saving {file_link} to disk: {output_error}")
+        except _OutputError as exception:
+            Logger.error(f"Error saving {file_link} to disk: {exception}")
+            error = str(exception)
+        finally:
+            for part_path in part_paths:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+        return {
+            "file_name": file_name,
+            "saved": saved,
+            "extract_successfully": extract_successfully,
+            "error": error,
+            "metadata": metadata or {},
+        }
+
     def make_sure_accassible(self):
         """create the storage path"""
         if not os.path.exists(self.storage_path):
@@ -157,6 +365,7 @@ class QueueFileOutput(FileOutput):
         self,
         queue_handler: "AbstractQueueHandler",
         storage_path: str = "/tmp/il_supermarket_status",
+        spool_max_size: int = 8 * 1024 * 1024,
     ):
         """
         Initialize queue file output.
@@ -164,9 +373,12 @@ class QueueFileOutput(FileOutput):
         Args:
             queue_handler: An implementation of AbstractQueueHandler
             storage_path: Path for storing status files (default: /tmp/il_supermarket_status)
+            spool_max_size: Bytes of a streamed download kept in memory before
+                spilling to a temporary file (default: 8MB)
         """
         self.queue_handler: AbstractQueueHandler = queue_handler
         self.storage_path = storage_path
+        self.spool_max_size = spool_max_size
         os.makedirs(storage_path, exist_ok=True)
 
     async def save_file(
@@ -212,6 +424,64 @@ class QueueFileOutput(FileOutput):
             "metadata": metadata or {},
         }
 
+    async def save_stream(
+        self,
+        file_link: str,
+        file_name: str,
+        chunks: AsyncIterator[bytes],
+        metadata: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """Spool chunks as they arrive, then extract and send the file to the queue.
+
+        The queue message carries the whole file, so only the download itself
+        is bounded; large transfers spill to a temporary file.
+        """
+        sink_factory, target_name = self._stream_sink(file_name)
+        saved = False
+        extract_successfully = False
+        error = None
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_max_size) as spool:
+            sink = sink_factory(spool)
+
+            async def _write(chunk):
+                await asyncio.to_thread(sink.write, chunk)
+
+            try:
+                received = await drain_chunks(chunks, _write)
+                await asyncio.to_thread(sink.finish)
+                extract_successfully = True
+                Logger.debug(f"Received {received} bytes for {file_name}.")
+            except ExtractionError as exception:
+                Logger.error(f"Failed to extract {file_name}: {exception}")
+                error = str(exception)
+
+            if extract_successfully:
+                file_name = target_name
+                try:
+                    spool.seek(0)
+                    await self.queue_handler.send(
+                        {
+                            "file_name": file_name,
+                            "file_link": file_link,
+                            "file_content": await asyncio.to_thread(spool.read),
+                            "metadata": metadata or {},
+                        }
+                    )
+                    saved = True
+                    Logger.debug(f"Sent {file_name} to queue")
+                except Exception as exception:  # pylint: disable=broad-except
+                    Logger.error(f"Error sending {file_link} to queue: {exception}")
+                    Logger.error_execption(exception)
+                    error = str(exception)
+
+        return {
+            "file_name": file_name,
+            "saved": saved,
+            "extract_successfully": extract_successfully,
+            "error": error,
+            "metadata": metadata or {},
+        }
+
     def get_output_location(self) -> str:
         """Return the queue location."""
         return f"queue:{self.queue_handler.get_queue_name()}"
@@ -70,19 +70,21 @@ class FileTypesFilters(Enum):
             )
         )
 
+    @staticmethod
+    def types_of_file(filename):
+        """the names of all the types a file is from"""
+        return classify_file_name(filename)
+
     @classmethod
     def is_file_from_type(cls, filename, file_type):
         """check if file from certain type"""
-        string_to_look_in = getattr(cls, file_type).value
-        return cls.filter_file(filename, **string_to_look_in)
+        return file_type in cls.types_of_file(filename)
 
     @classmethod
     def get_type_from_file(cls, filename):
         """get file type from filename"""
-        for file_type_name in cls.all_types():
-            if cls.is_file_from_type(filename, file_type_name):
-                return getattr(cls, file_type_name)
-        return None
+        types = cls.types_of_file(filename)
+        return getattr(cls, types[0]) if types else None
 
     @classmethod
     def filter(cls, file_type, iterable, by_function=lambda x: x):
@@ -95,3 +97,27 @@ class FileTypesFilters(Enum):
                 iterable,
             )
         )
+
+
+# (name, should_contain, should_not_contain) of every type, in order
+FILE_TYPES_RULES = tuple(
+    (
+        file_type.name,
+        file_type.value["should_contain"],
+        file_type.value["should_not_contain"],
+    )
+    for file_type in FileTypesFilters
+)
+
+
+def classify_file_name(filename):
+    """the names of all the types a file is from, filter_file of every type"""
+    lowered = filename.lower()
+    if "null" in lowered:
+        return ()
+    return tuple(
+        name
+        for name, should_contain, should_not_contain in FILE_TYPES_RULES
+        if should_contain in lowered
+        and (should_not_contain is None or should_not_contain not in lowered)
+    )
@@ -0,0 +1,170 @@
+"""Pool of logged-in FTP connections reused between downloads."""
+
+import asyncio
+import contextlib
+import threading
+import time
+import weakref
+from ftplib import FTP_TLS, all_errors, error_perm
+
+from .logger import Logger
+
+
+def ftp_tls_factory(ftp_host, ftp_username, ftp_password, timeout):
+    """open a logged-in FTP_TLS connection"""
+    ftp = FTP_TLS(ftp_host, ftp_username, ftp_password, timeout=timeout)
+    ftp.trust_server_pasv_ipv4_address = True
+    return ftp
+
+
+class FtpConnectionPool:
+    """
+    Logged-in FTP connections kept open between transfers.
+
+    Connections are keyed by (host, user, path), so chains sharing a host
+    don't share sessions. An idle connection is health checked with NOOP
+    before it is handed out again. The number of connections per key is
+    bounded by slots taken on the event loop (see slot), so transfers
+    waiting for a connection never hold an executor thread.
+    """
+
+    def __init__(self, ftp_factory=ftp_tls_factory, max_idle_seconds=60):
+        """
+        Args:
+            ftp_factory: callable(host, user, password, timeout) returning a
+                logged-in ftplib connection
+            max_idle_seconds: idle connections older than this are closed
+                instead of being reused
+        """
+        self.ftp_factory = ftp_factory
+        self.max_idle_seconds = max_idle_seconds
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._bounds = {}
+        self._slots = weakref.WeakKeyDictionary()
+
+    def max_connections(self, ftp_host, ftp_username, ftp_path):
+        """the bound of a key, None until its first slot"""
+        with self._lock:
+            return self._bounds.get((ftp_host, ftp_username, ftp_path))
+
+    def _semaphore(self, key, max_connections):
+        """the semaphore of key on the running loop, sized by the first caller"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            bound = self._bounds.setdefault(key, max_connections)
+            if bound != max_connections:
+                Logger.warning(
+                    f"FTP connections to {key} are already bounded to {bound}, "
+                    f"ignoring {max_connections}"
+                )
+            semaphores = self._slots.setdefault(loop, {})
+            if key not in semaphores:
+                semaphores[key] = asyncio.Semaphore(bound)
+            return semaphores[key]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, ftp_host, ftp_username, ftp_path, max_connections=10):
+        """
+        Wait on the event loop for one of the max_connections of a key.
+
+        Take the slot before running connection() in a thread, and hold it
+        while the connection is used. The bound of a key is set once, by
+        its first slot: callers should all pass their engine's bound.
+        """
+        async with self._semaphore((ftp_host, ftp_username, ftp_path), max_connections):
+            yield
+
+    def _take_idle(self, key):
+        """pop a healthy idle connection, or None"""
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                ftp, released_at = idle.pop()
+            if time.monotonic() - released_at > self.max_idle_seconds:
+                self._close(ftp, graceful=True)
+                continue
+            try:
+                ftp.voidcmd("NOOP")
+                return ftp
+            except all_errors as error:
+                Logger.debug(f"Dropping broken FTP connection: {error}")
+                self._close(ftp)
+
+    @contextlib.contextmanager
+    def connection(  # pylint: disable=too-many-arguments
+        self,
+        ftp_host,
+        ftp_username,
+        ftp_password,
+        ftp_path,
+        timeout=15,
+    ):
+        """
+        Borrow a connection, already in ftp_path, for the duration of the block.
+
+        A connection is returned to the pool when the block completes (or the
+        server refused a command), any other error, or abandoning a transfer,
+        closes it. This never waits for a free connection: async callers
+        bound their connections with slot() first.
+        """
+        key = (ftp_host, ftp_username, ftp_path)
+        ftp = self._take_idle(key)
+        if ftp is None:
+            ftp = self.ftp_factory(
+                ftp_host, ftp_username, ftp_password, timeout=timeout
+            )
+            try:
+                ftp.cwd(ftp_path)
+            except BaseException:
+                self._close(ftp)
+                raise
+        ftp.sock.settimeout(timeout)
+
+        try:
+            yield ftp
+        except error_perm:
+            # the server refused the command, the session itself is fine
+            self._release(key, ftp)
+            raise
+        except BaseException:
+            self._close(ftp)
+            raise
+        self._release(key, ftp)
+
+    def _release(self, key, ftp):
+        with self._lock:
+            self._idle.setdefault(key, []).append((ftp, time.monotonic()))
+
+    def close_idle(self, ftp_host=None, ftp_username=None, ftp_path=None):
+        """close the idle connections of a key, or all of them"""
+        with self._lock:
+            if ftp_host is None:
+                keys = list(self._idle)
+            else:
+                keys = [(ftp_host, ftp_username, ftp_path)]
+            to_close = [ftp for key in keys for ftp, _ in self._idle.pop(key, [])]
+        for ftp in to_close:
+            self._close(ftp, graceful=True)
+
+    def idle_count(self, ftp_host, ftp_username, ftp_path):
+        """number of idle connections of a key"""
+        with self._lock:
+            return len(self._idle.get((ftp_host, ftp_username, ftp_path), []))
+
+    @staticmethod
+    def _close(ftp, graceful=False):
+        """close a connection, saying goodbye only if it is in a known state"""
+        if graceful:
+            try:
+                ftp.quit()
+                return
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+        ftp.close()
+
+
+# connections shared by all the engines of the process
+ftp_connection_pool = FtpConnectionPool()
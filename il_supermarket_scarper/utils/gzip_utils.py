@@ -1,60 +1,273 @@
-import gzip
-import shutil
 import io
+import struct
+import shutil
+import tempfile
+import zlib
 import zipfile
-from .exceptions import RestartSessionError
+from .exceptions import RestartSessionError, ExtractionError
 
 GZIP_MAGIC_BYTES = b"\x1f\x8b"
 ZIP_MAGIC_BYTES = b"PK"
 
+ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+REPORT_HEAD_SIZE = 1024
+DECOMPRESS_PIECE_SIZE = 256 * 1024
+
 
 def extract_xml_from_gz_in_memory(source_file, file_name):
     """Extract xml from gz file or stream"""
 
-    source_buffer = io.BytesIO(source_file)
     output_buffer = io.BytesIO()
+    decompressor = StreamDecompressor(output_buffer, file_name)
+    decompressor.write(source_file)
+    decompressor.finish()
+    return output_buffer.getvalue()
 
-    magic_bytes = source_buffer.read(2)
-    source_buffer.seek(0)
 
-    try:
-        if magic_bytes == GZIP_MAGIC_BYTES:
-            with gzip.open(source_buffer, "rb") as infile:
-                shutil.copyfileobj(infile, output_buffer)
+def extract_xml_from_gz_file(source_buffer, output_buffer, file_name):
+    """Extract xml from a gz/zip file object into another file object"""
+
+    decompressor = StreamDecompressor(output_buffer, file_name)
+    while chunk := source_buffer.read(DECOMPRESS_PIECE_SIZE):
+        decompressor.write(chunk)
+    decompressor.finish()
+
+
+class StreamDecompressor:  # pylint: disable=too-many-instance-attributes
+    """
+    Decompress a gz/zip download chunk by chunk into a writable file object.
+
+    The format is sniffed from the magic bytes of the first chunk. Gzip
+    (including multi member files) and the first entry of a zip are inflated
+    as the bytes arrive; zip entries that can't be read from the local header
+    alone are spooled and extracted with zipfile on finish.
+
+    Failures are reported through report_failed_zip, so a "link expired" page
+    served instead of the file still raises RestartSessionError.
+    """
+
+    def __init__(self, output_buffer, file_name, piece_size=DECOMPRESS_PIECE_SIZE):
+        self.output_buffer = output_buffer
+        self.file_name = file_name
+        self.piece_size = piece_size
+        self.compressed_size = 0
+        self.head = bytearray()
+        self._pending = b""
+        self._feed = self._sniff
+        self._decompressor = None
+        self._crc = None
+        self._expected_crc = None
+        self._stored_left = 0
+        self._spool = None
+        self._done = False
+        self._error = None
+
+    def write(self, chunk):
+        """Decompress one chunk of compressed bytes into the output"""
+        try:
+            self.compressed_size += len(chunk)
+            if len(self.head) < REPORT_HEAD_SIZE:
+                self.head += chunk[: REPORT_HEAD_SIZE - len(self.head)]
+            self._feed(chunk)
+        except (RestartSessionError, ExtractionError):
+            raise
+        except Exception as exception:  # pylint: disable=broad-except
+            self._report(exception)
+
+    def finish(self):
+        """Validate the stream was complete and flush what's left"""
+        try:
+            if self._error is not None:
+                raise self._error
+            if self._spool is not None:
+                self._extract_spooled_zip()
+            elif self._feed == self._sniff:  # pylint: disable=comparison-with-callable
+                raise ValueError(
+                    f"Unknown compression format. Magic bytes: {self._pending.hex()}"
+                )
+            elif not self._done:
+                raise EOFError(
+                    "Compressed file ended before the end-of-stream marker was reached"
+                )
+        except (RestartSessionError, ExtractionError):
+            raise
+        except Exception as exception:  # pylint: disable=broad-except
+            self._report(exception)
+
+    def _report(self, exception):
+        report_failed_zip(
+            exception,
+            io.BytesIO(bytes(self.head)),
+            self.file_name,
+            buffer_size=self.compressed_size,
+        )
 
+    def _sniff(self, chunk):
+        self._pending += chunk
+        if len(self._pending) < len(GZIP_MAGIC_BYTES):
+            return
+        data, self._pending = self._pending, b""
+        magic_bytes = data[: len(GZIP_MAGIC_BYTES)]
+        if magic_bytes == GZIP_MAGIC_BYTES:
+            self._feed = self._gzip
         elif magic_bytes == ZIP_MAGIC_BYTES:
-            with zipfile.ZipFile(source_buffer) as the_zip:
-                with the_zip.open(the_zip.infolist()[0]) as the_file:
-                    shutil.copyfileobj(the_file, output_buffer)
+            self._feed = self._zip_header
         else:
-            raise ValueError(
+            # keep reading so the report holds the head of the response
+            self._error = ValueError(
                 f"Unknown compression format. Magic bytes: {magic_bytes.hex()}"
             )
+            self._feed = self._unknown
+        self._feed(data)
 
-    except Exception as exception:  # pylint: disable=broad-except
-        report_failed_zip(exception, source_buffer, file_name)
+    def _unknown(self, chunk):  # pylint: disable=unused-argument
+        if len(self.head) >= REPORT_HEAD_SIZE:
+            raise self._error
 
-    output_buffer.seek(0)
-    return output_buffer.getvalue()
+    def _inflate(self, data):
+        """Inflate data in bounded pieces, return what is left after the stream end"""
+        while True:
+            piece = self._decompressor.decompress(data, self.piece_size)
+            if piece:
+                if self._crc is not None:
+                    self._crc = zlib.crc32(piece, self._crc)
+                self.output_buffer.write(piece)
+            if self._decompressor.eof:
+                return self._decompressor.unused_data
+            data = self._decompressor.unconsumed_tail
+            if not data and len(piece) < self.piece_size:
+                return b""
+
+    def _gzip(self, chunk):
+        data = chunk
+        while data:
+            if self._decompressor is None:
+                # gzip allows zero padding between and after members
+                data = data.lstrip(b"\x00")
+                if not data:
+                    return
+                self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                self._done = False
+            data = self._inflate(data)
+            if self._decompressor.eof:
+                self._decompressor = None
+                self._done = True
+
+    def _zip_header(self, chunk):
+        self._pending += chunk
+        if len(self._pending) < ZIP_LOCAL_HEADER.size:
+            return
+        (
+            signature,
+            _,
+            flags,
+            method,
+            _,
+            _,
+            crc,
+            compressed_size,
+            _,
+            name_length,
+            extra_length,
+        ) = ZIP_LOCAL_HEADER.unpack_from(self._pending)
+        data_offset = ZIP_LOCAL_HEADER.size + name_length + extra_length
+        if len(self._pending) < data_offset:
+            return
+        data, self._pending = self._pending, b""
+
+        has_descriptor = flags & 0x08
+        if signature != ZIP_LOCAL_HEADER_SIGNATURE or flags & 0x01:
+            self._start_spool(data)
+        elif method == ZIP_DEFLATED:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            if not has_descriptor:
+                self._crc, self._expected_crc = 0, crc
+            self._feed = self._zip_deflated
+            self._feed(data[data_offset:])
+        elif (
+            method == ZIP_STORED
+            and not has_descriptor
+            and compressed_size != 0xFFFFFFFF
+        ):
+            self._stored_left = compressed_size
+            self._crc, self._expected_crc = 0, crc
+            self._feed = self._zip_stored
+            self._feed(data[data_offset:])
+        else:
+            self._start_spool(data)
+
+    def _zip_deflated(self, chunk):
+        if self._done:
+            return
+        self._inflate(chunk)
+        if self._decompressor.eof:
+            self._check_crc()
+
+    def _zip_stored(self, chunk):
+        if self._done:
+            return
+        data = chunk[: self._stored_left]
+        self._stored_left -= len(data)
+        self._crc = zlib.crc32(data, self._crc)
+        self.output_buffer.write(data)
+        if self._stored_left == 0:
+            self._check_crc()
+
+    def _check_crc(self):
+        self._done = True
+        if self._expected_crc is not None and self._crc != self._expected_crc:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {self.file_name}")
+
+    def _start_spool(self, data):
+        self._spool = (
+            tempfile.SpooledTemporaryFile(  # pylint: disable=consider-using-with
+                max_size=8 * 1024 * 1024
+            )
+        )
+        self._feed = self._spool.write
+        self._feed(data)
+
+    def _extract_spooled_zip(self):
+        try:
+            self._spool.seek(0)
+            with zipfile.ZipFile(self._spool) as the_zip:
+                with the_zip.open(the_zip.infolist()[0]) as the_file:
+                    shutil.copyfileobj(the_file, self.output_buffer, self.piece_size)
+        finally:
+            self._spool.close()
+            self._spool = None
+        self._done = True
+
+
+def _buffer_size(source_buffer):
+    """Size in bytes of a seekable file object"""
+    source_buffer.seek(0, io.SEEK_END)
+    return source_buffer.tell()
 
 
-def report_failed_zip(exception, source_buffer, file_name):
+def report_failed_zip(exception, source_buffer, file_name, buffer_size=None):
     """Report a file wasn't able to be extracted"""
+    if buffer_size is None:
+        buffer_size = _buffer_size(source_buffer)
     try:
         source_buffer.seek(0)
-        content = source_buffer.read(1024).decode("utf-8")  # Read first 1KB
+        content = source_buffer.read(REPORT_HEAD_SIZE).decode("utf-8")  # Read first 1KB
 
         if "link expired" in content.lower():
             raise RestartSessionError()
 
-        raise ValueError(
+        raise ExtractionError(
             f"Error extracting file: {file_name} with error: {str(exception)}, "
-            f"buffer size: {source_buffer.getbuffer().nbytes} bytes, "
+            f"buffer size: {buffer_size} bytes, "
             f"trimed_file_contant: {content[:100]}"
         )
     except UnicodeDecodeError as exc:
-        raise ValueError(
+        raise ExtractionError(
             f"Error extracting file: {file_name} with error: {str(exception)}, "
-            f"buffer size: {source_buffer.getbuffer().nbytes} bytes, "
+            f"buffer size: {buffer_size} bytes, "
             f"can't decode content"
         ) from exc
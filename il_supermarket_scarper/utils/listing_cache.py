@@ -0,0 +1,78 @@
+"""Cache of parsed listing pages, revalidated with conditional GETs."""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, NamedTuple, Optional
+
+
+class CachedListing(NamedTuple):
+    """a parsed listing page with the validators of the response it came from"""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+
+class ListingCache:
+    """
+    Parsed listing pages of a chain, revalidated with conditional GETs.
+
+    Entries are keyed by request (url, method, body) and keep the ETag and
+    Last-Modified of the response they were parsed from. On the next pass
+    these are sent as If-None-Match/If-Modified-Since, and a 304 answer
+    reuses the parsed value instead of transferring and parsing the page.
+    The least recently used entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(url, method="GET", body=None, kind="files"):
+        """the cache key of a request, kind tells apart different parses of a page"""
+        body = body if isinstance(body, (str, bytes)) else repr(body)
+        return (kind, url, method, body)
+
+    def get(self, key) -> Optional[CachedListing]:
+        """the cached listing of a request, or None"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
+
+    def conditional_headers(self, key):
+        """the If-None-Match/If-Modified-Since headers to revalidate a request"""
+        cached = self.get(key)
+        if cached is None:
+            return {}
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def store(self, key, response_headers, value):
+        """keep a parsed listing, if its response can be revalidated"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = CachedListing(etag, last_modified, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """drop all cached listings"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
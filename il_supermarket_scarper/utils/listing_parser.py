@@ -0,0 +1,153 @@
+"""
+Fast extraction of the entries of listing pages.
+
+The pages are streamed through lxml's iterparse, keeping only the element
+being read, instead of building a BeautifulSoup tree of the whole page. A
+page lxml can't stream is parsed with BeautifulSoup into the same values.
+"""
+
+import io
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from .logger import Logger
+from .status import UnitSize, convert_nl_size_to_bytes
+
+SIZE_PATTERN = re.compile(r"\b\d+(\.\d+)?\s*(KB|MB|GB)\b")
+SIZE_UNITS = ("KB", "MB", "GB")
+
+
+class ListingRow(NamedTuple):
+    """a table row of a listing page"""
+
+    href: Optional[str]
+    name: Optional[str]
+    size: Optional[float]
+    text: str
+    cells: Tuple[str, ...]
+
+
+def size_of_text(text):
+    """the size in bytes of the first "<number> KB|MB|GB" in text, or None"""
+    if not any(unit in text for unit in SIZE_UNITS):
+        return None
+    size_match = SIZE_PATTERN.search(text)
+    if size_match is None:
+        return None
+    return convert_nl_size_to_bytes(size_match.group(0), to_unit=UnitSize.BYTES)
+
+
+def name_of_href(href):
+    """the file name of a link, without directories and extensions"""
+    if href is None:
+        return None
+    return href.split(".")[0].split("/")[-1]
+
+
+def _row(href, text, cells):
+    """a listing row from the link and texts of a tr"""
+    return ListingRow(href, name_of_href(href), size_of_text(text), text, cells)
+
+
+def _iter_elements(page, tag):
+    """the tag elements of an html page, each dropped once read"""
+    for _, element in etree.iterparse(
+        io.BytesIO(page.encode("utf-8")),
+        events=("end",),
+        tag=tag,
+        html=True,
+        encoding="utf-8",
+    ):
+        yield element
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _table_rows_with_lxml(page):
+    rows = []
+    for element in _iter_elements(page, "tr"):
+        link = next(element.iter("a"), None)
+        rows.append(
+            _row(
+                link.get("href") if link is not None else None,
+                "".join(element.itertext()),
+                tuple(
+                    "".join(piece.strip() for piece in cell.itertext())
+                    for cell in element.iter("td")
+                ),
+            )
+        )
+    return rows
+
+
+def _table_rows_with_soup(page):
+    soup = BeautifulSoup(page, features="lxml")
+    rows = []
+    for element in list(soup.find_all("tr")):
+        link = element.a
+        rows.append(
+            _row(
+                link.attrs.get("href") if link is not None else None,
+                element.text,
+                tuple(cell.get_text(strip=True) for cell in element.find_all("td")),
+            )
+        )
+    return rows
+
+
+def _list_items_with_lxml(page):
+    items = []
+    for element in _iter_elements(page, "li"):
+        link = next(element.iter("a"), None)
+        items.append(
+            (
+                "".join(element.itertext()),
+                link.get("href") if link is not None else None,
+            )
+        )
+    return items
+
+
+def _list_items_with_soup(page):
+    soup = BeautifulSoup(page, features="lxml")
+    return [
+        (element.text, element.a.attrs.get("href") if element.a is not None else None)
+        for element in list(soup.find_all("li"))
+    ]
+
+
+def _scripts_with_lxml(page):
+    return [element.text or "" for element in _iter_elements(page, "script")]
+
+
+def _scripts_with_soup(page):
+    soup = BeautifulSoup(page, features="lxml")
+    return [element.text for element in list(soup.find_all("script"))]
+
+
+def _parse(page, fast, fallback):
+    """the values of the fast parser, or of BeautifulSoup if lxml can't read page"""
+    try:
+        return fast(page)
+    except (etree.LxmlError, ValueError) as error:
+        Logger.debug(f"Parsing the page with BeautifulSoup, lxml failed: {error}")
+        return fallback(page)
+
+
+def parse_table_rows(page) -> List[ListingRow]:
+    """the tr rows of a listing page, in document order"""
+    return _parse(page, _table_rows_with_lxml, _table_rows_with_soup)
+
+
+def parse_list_items(page) -> List[Tuple[str, Optional[str]]]:
+    """the (text, href) of the li items of a listing page"""
+    return _parse(page, _list_items_with_lxml, _list_items_with_soup)
+
+
+def parse_script_texts(page) -> List[str]:
+    """the text of the script elements of a page"""
+    return _parse(page, _scripts_with_lxml, _scripts_with_soup)
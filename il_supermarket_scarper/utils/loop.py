@@ -1,6 +1,11 @@
+import asyncio
+import collections
 import concurrent.futures
+import functools
 from .logger import Logger
 
+_EXHAUSTED = object()
+
 
 def defualt_aggregtion_function(all_done):
     """format the scraping result to the final input"""
@@ -68,3 +73,52 @@ def run_tasks(
     else:
         # Or just iterate over all
         return [function_to_execute(arg) for arg in iterable]
+
+
+async def _next_now(items):
+    """the next item of a (sync) iterator"""
+    return next(items, _EXHAUSTED)
+
+
+async def stream_in_parallel(
+    function_to_execute, iterable, max_concurrency, ordered=False
+):
+    """
+    Yield the results of an async function over iterable, as they complete.
+
+    iterable may be an async iterable. At most max_concurrency calls run at
+    once, and a call only starts when the consumer asks for the next result:
+    a consumer that stops early stops the calls, the running ones are
+    cancelled when the generator is closed. With ordered, the results are
+    yielded in the order of iterable instead, from a window of
+    max_concurrency running calls.
+    """
+    if hasattr(iterable, "__aiter__"):
+        items = aiter(iterable)
+        next_item = functools.partial(anext, items, _EXHAUSTED)
+    else:
+        items = iter(iterable)
+        next_item = functools.partial(_next_now, items)
+    running = collections.deque()
+    try:
+        while True:
+            while len(running) < max_concurrency:
+                item = await next_item()
+                if item is _EXHAUSTED:
+                    break
+                running.append(asyncio.ensure_future(function_to_execute(item)))
+            if not running:
+                return
+            if ordered:
+                result = await running[0]
+                running.popleft()
+                yield result
+                continue
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.remove(task)
+                yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,169 @@
+"""Per-host request rate limiting, shared by the processes of a scraping run."""
+
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from .logger import Logger
+
+RATE_LIMIT_ENV_VAR = "RATE_LIMIT_PER_HOST"
+RATE_LIMIT_BURST_ENV_VAR = "RATE_LIMIT_BURST"
+
+
+def _host_of(url):
+    """the host a request goes to, the url itself if it has none (e.g. an FTP host)"""
+    return urlsplit(url).hostname or url
+
+
+def parse_retry_after(value, now=None) -> Optional[float]:
+    """seconds to wait from a Retry-After header (delay or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - (now or time.time()))
+
+
+class HostRateLimiter:
+    """
+    Token bucket per host: ``rate`` requests per second, bursts of ``burst``.
+
+    Unlimited unless a rate is configured, the hosts' 429s are still honored.
+
+    The buckets live in ``state`` guarded by ``lock``. By default these are
+    a plain dict and lock, limiting the current process; with a Manager
+    dict and lock (see create_shared_rate_limiter) every process of the
+    pool draws from the same buckets. A 429 (or 503) response with
+    Retry-After pauses its host for everyone.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        rate: float = 0.0,
+        burst: int = 20,
+        state=None,
+        lock=None,
+        default_backoff: float = 10.0,
+    ):
+        """
+        Args:
+            rate: requests per second allowed to a host, 0 disables the limiter
+            burst: requests allowed at once after an idle period
+            state: dict-like holding the buckets, shared to limit several processes
+            lock: lock guarding state
+            default_backoff: pause after a 429 without Retry-After, in seconds
+        """
+        self.rate = rate
+        self.burst = burst
+        self.default_backoff = default_backoff
+        self._state = {} if state is None else state
+        self._lock = threading.Lock() if lock is None else lock
+
+    def reserve(self, url) -> float:
+        """take a token for the host of url, returning how long to wait before using it"""
+        host = _host_of(url)
+        if not self.rate:
+            # unlimited, unless the host asked to pause
+            with self._lock:
+                blocked_until = self._state.get(host, (0.0, 0.0, 0.0))[2]
+            return max(0.0, blocked_until - time.time())
+        with self._lock:
+            now = time.time()
+            tokens, updated_at, blocked_until = self._state.get(
+                host, (float(self.burst), now, 0.0)
+            )
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+            # tokens may go negative: later callers queue behind earlier ones
+            tokens -= 1
+            self._state[host] = (tokens, now, blocked_until)
+        wait = max(0.0, -tokens / self.rate)
+        return max(wait, blocked_until - now)
+
+    def acquire(self, url):
+        """wait until a request to the host of url is allowed"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url):
+        """wait until a request to the host of url is allowed, without blocking the loop"""
+        wait = await asyncio.to_thread(self.reserve, url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def block(self, url, seconds):
+        """pause all requests to the host of url for seconds"""
+        host = _host_of(url)
+        with self._lock:
+            now = time.time()
+            tokens, updated_at, blocked_until = self._state.get(
+                host, (float(self.burst), now, 0.0)
+            )
+            self._state[host] = (tokens, updated_at, max(blocked_until, now + seconds))
+        Logger.warning(f"Pausing requests to {host} for {seconds:.0f} seconds")
+
+    def on_response(self, url, status, headers):
+        """honor a 429/503 response (and its Retry-After) of the host of url"""
+        if status not in (429, 503):
+            return
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+        if retry_after is None:
+            if status != 429:
+                return
+            retry_after = self.default_backoff
+        self.block(url, retry_after)
+
+
+def create_shared_rate_limiter(manager, rate=None, burst=None) -> HostRateLimiter:
+    """
+    A limiter whose buckets are kept by a multiprocessing Manager.
+
+    Args:
+        manager: a started multiprocessing.Manager
+        rate: requests per second per host, defaults to the RATE_LIMIT_PER_HOST
+            environment variable, then to 0 (unlimited)
+        burst: defaults to the RATE_LIMIT_BURST environment variable, then to 2 * rate
+    """
+    rate, burst = _settings(rate, burst)
+    return HostRateLimiter(
+        rate=rate, burst=burst, state=manager.dict(), lock=manager.Lock()
+    )
+
+
+def create_rate_limiter(rate=None, burst=None) -> HostRateLimiter:
+    """A limiter of the current process, with the same defaults as the shared one."""
+    return HostRateLimiter(*_settings(rate, burst))
+
+
+def _settings(rate=None, burst=None):
+    """the rate and burst, from the arguments or the environment"""
+    rate = rate if rate is not None else float(os.getenv(RATE_LIMIT_ENV_VAR, "0"))
+    if burst is None:
+        burst = int(os.getenv(RATE_LIMIT_BURST_ENV_VAR, "0")) or max(1, int(2 * rate))
+    return rate, burst
+
+
+# limits the current process until a shared limiter is installed
+_rate_limiter = create_rate_limiter()
+
+
+def install_rate_limiter(rate_limiter: HostRateLimiter):
+    """use rate_limiter in this process, e.g. as a multiprocessing.Pool initializer"""
+    global _rate_limiter  # pylint: disable=global-statement
+    _rate_limiter = rate_limiter
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """the rate limiter of this process"""
+    return _rate_limiter
@@ -4,11 +4,14 @@ from typing import Optional
 import uuid
 from .status import log_folder_details, _now
 from .databases import JsonDataBase, AbstractDataBase
+from .downloaded_index import DownloadedIndex
+from .event_sink import BufferedEventSink
+from .status_summary import StatusSummary
 from .file_output import FileOutput
 from .scraping_result import ScrapingResult
 
 
-class ScraperStatus:
+class ScraperStatus:  # pylint: disable=too-many-instance-attributes
     """A class that abstracts the database interface for scraper status."""
 
     STARTED = "started"
@@ -18,12 +21,34 @@ class ScraperStatus:
     FAILED = "failed"
     ESTIMATED_SIZE = "estimated_size"
     VERIFIED_DOWNLOADS = "verified_downloads"
+    # histories of more downloaded files are indexed by a Bloom filter
+    DOWNLOADED_INDEX_BLOOM_THRESHOLD = 1_000_000
+    # events are written in batches of up to EVENTS_BATCH_SIZE,
+    # at least every EVENTS_FLUSH_INTERVAL seconds
+    EVENTS_BATCH_SIZE = 100
+    EVENTS_FLUSH_INTERVAL = 5.0
+    # files looked up together when the database can't be indexed in memory
+    DOWNLOADED_LOOKUP_BATCH_SIZE = 100
+    # how much of the per-file events is written: "full" writes every event,
+    # "summarize_saw" rolls the saw events up into one summary event per task,
+    # "summarize" rolls up the collected events too.
+    # downloads and failures are always written per file.
+    SUMMARY = "summary"
+    VERBOSITY_FULL = "full"
+    VERBOSITY_SUMMARIZE_SAW = "summarize_saw"
+    VERBOSITY_SUMMARIZE = "summarize"
+    SUMMARIZED_STATUSES = {
+        VERBOSITY_FULL: (),
+        VERBOSITY_SUMMARIZE_SAW: (SAW,),
+        VERBOSITY_SUMMARIZE: (SAW, COLLECTED),
+    }
 
     def __init__(
         self,
         database_name,
         status_database: Optional[AbstractDataBase] = None,
         file_output: Optional[FileOutput] = None,
+        status_verbosity: str = VERBOSITY_FULL,
     ) -> None:
         # Use provided database or create default JsonDataBase
         if status_database is None:
@@ -35,10 +60,51 @@ class ScraperStatus:
         else:
             self.database = status_database
         self.task_id = None
+        self.status_verbosity = None
+        self.set_status_verbosity(status_verbosity)
+        # the summaries of the rolled up statuses, of the current task
+        self._summaries = {}
+        # the downloaded files, loaded when a scrape first filters its files
+        self.downloaded_index: Optional[DownloadedIndex] = None
+        self._downloaded_index_loaded = False
+        # status writes awaited from the event loop, overlapping the downloads
+        self.async_database = self.database.as_async()
+        self.events = BufferedEventSink(
+            self.database,
+            "events",
+            batch_size=self.EVENTS_BATCH_SIZE,
+            flush_interval=self.EVENTS_FLUSH_INTERVAL,
+            async_database=self.async_database,
+        )
+        # written one by one, so a restart doesn't download them again
+        self.verified_downloads = BufferedEventSink(
+            self.database,
+            self.VERIFIED_DOWNLOADS,
+            batch_size=1,
+            flush_interval=self.EVENTS_FLUSH_INTERVAL,
+            async_database=self.async_database,
+        )
+
+    def set_status_verbosity(self, status_verbosity: str):
+        """Choose which statuses are rolled up into a summary event."""
+        if status_verbosity not in self.SUMMARIZED_STATUSES:
+            raise ValueError(
+                f"status_verbosity must be one of {list(self.SUMMARIZED_STATUSES)}, "
+                f"but got {status_verbosity}"
+            )
+        self.status_verbosity = status_verbosity
 
     def on_scraping_start(self, limit, files_types, **additional_info):
         """Report that scraping has started."""
         self.task_id = str(uuid.uuid4())
+        self._summaries = {
+            status: StatusSummary(status)
+            for status in self.SUMMARIZED_STATUSES[self.status_verbosity]
+        }
+        self.downloaded_index = None
+        self._downloaded_index_loaded = False
+        self.events.start()
+        self.verified_downloads.start()
 
         self._insert_global_status(
             ScraperStatus.STARTED,
@@ -55,6 +121,9 @@ class ScraperStatus:
         **additional_info,
     ):
         """Report that file details have been collected."""
+        if ScraperStatus.SAW in self._summaries:
+            self._summaries[ScraperStatus.SAW].add(file_name, size)
+            return
         # Convert to comma-separated strings to match contract
         self._insert_event(
             ScraperStatus.SAW,
@@ -71,6 +140,9 @@ class ScraperStatus:
         **additional_info,
     ):
         """Report that file details have been collected."""
+        if ScraperStatus.COLLECTED in self._summaries:
+            self._summaries[ScraperStatus.COLLECTED].add(file_name_collected_from_site)
+            return
 
         self._insert_event(
             ScraperStatus.COLLECTED,
@@ -92,37 +164,87 @@ class ScraperStatus:
         self._insert_event(ScraperStatus.DOWNLOADED, **event_data)
         self._add_downloaded_files_to_list(results)
 
+    async def _load_downloaded_index(self) -> Optional[DownloadedIndex]:
+        """Load the downloaded files in bulk, None if the database can't list them."""
+        # read once, off the event loop, the names are counted after reading
+        file_names = await self.async_database.iter_field_values(
+            self.VERIFIED_DOWNLOADS, "file_name"
+        )
+        if file_names is None:
+            return None
+        return DownloadedIndex(
+            file_names,
+            expected_size=len(file_names),
+            bloom_threshold=self.DOWNLOADED_INDEX_BLOOM_THRESHOLD,
+            confirm=self._is_downloaded_in_database,
+        )
+
+    def _is_downloaded_in_database(self, file_name):
+        """Look a downloaded file up in the database."""
+        return self.database.already_downloaded(
+            self.VERIFIED_DOWNLOADS, {"file_name": file_name}
+        )
+
     async def filter_already_downloaded(
         self, files_names_to_scrape, filelist, by_function=lambda x: x
     ):
         """Filter files already existing in long-term memory or previously downloaded."""
+        async for batch in self._batches_with_downloaded(filelist, by_function):
+            for file, already_downloaded in batch:
+                required_file = (
+                    files_names_to_scrape is None
+                    or by_function(file) in files_names_to_scrape
+                )
+                if not already_downloaded and required_file:
+                    yield file
+
+    async def _batches_with_downloaded(self, filelist, by_function):
+        """
+        Batches of (file, already downloaded) pairs.
+
+        With an index each file is its own batch, otherwise the files are
+        looked up in the database DOWNLOADED_LOOKUP_BATCH_SIZE at a time.
+        """
+        if not self._downloaded_index_loaded:
+            self.downloaded_index = await self._load_downloaded_index()
+            self._downloaded_index_loaded = True
+        batch = []
         async for file in filelist:
-            already_downloaded = self.database.already_downloaded(
-                self.VERIFIED_DOWNLOADS, {"file_name": by_function(file)}
-            )
-            required_file = (
-                files_names_to_scrape is None
-                or by_function(file) in files_names_to_scrape
-            )
-            if not already_downloaded and required_file:
-                yield file
+            if self.downloaded_index is not None:
+                yield [(file, by_function(file) in self.downloaded_index)]
+                continue
+            batch.append(file)
+            if len(batch) >= self.DOWNLOADED_LOOKUP_BATCH_SIZE:
+                yield await self._lookup_downloaded(batch, by_function)
+                batch = []
+        if batch:
+            yield await self._lookup_downloaded(batch, by_function)
+
+    async def _lookup_downloaded(self, files, by_function):
+        """The files paired with whether the database has them downloaded."""
+        downloaded = await self.async_database.already_downloaded_many(
+            self.VERIFIED_DOWNLOADS, [by_function(file) for file in files]
+        )
+        return [(file, by_function(file) in downloaded) for file in files]
 
     def _add_downloaded_files_to_list(self, results: ScrapingResult):
         """Add downloaded files to the database collection."""
         if results.extract_succefully:
-            self.database.insert_document(
-                self.VERIFIED_DOWNLOADS,
+            self.verified_downloads.add(
                 {
                     "file_name": results.file_name,
                     "system_timestamp": _now(),
                     "task_id": self.task_id,
-                },
+                }
             )
+            if self.downloaded_index is not None:
+                self.downloaded_index.add(results.file_name)
 
     def on_scrape_completed(
         self, folder_name: str, completed_successfully: bool = True
     ):
         """Report when scraping is completed."""
+        self.flush_events()
         self._insert_global_status(
             ScraperStatus.ESTIMATED_SIZE,
             folder_size=log_folder_details(folder_name),
@@ -150,11 +272,29 @@ class ScraperStatus:
         self.database.insert_document("global_status", document)
 
     def _insert_event(self, status, **additional_info):
-        """Insert an event update (collected, downloaded, failed)."""
+        """Queue an event update (saw, collected, downloaded, failed)."""
         document = {
             "status": status,
             "system_timestamp": _now(),
             "task_id": self.task_id,
             **additional_info,
         }
-        self.database.insert_document("events", document)
+        self.events.add(document)
+
+    def _insert_summaries(self):
+        """Queue the summary events of the task, once."""
+        summaries, self._summaries = self._summaries, {}
+        for summary in summaries.values():
+            self._insert_event(ScraperStatus.SUMMARY, **summary.as_document())
+
+    def flush_events(self):
+        """Write the queued events, and stop flushing them periodically."""
+        self._insert_summaries()
+        self.verified_downloads.close()
+        self.events.close()
+
+    async def flush_events_async(self):
+        """Wait for the status writes, and write the queued events."""
+        self._insert_summaries()
+        await self.verified_downloads.aclose()
+        await self.events.aclose()
@@ -9,7 +9,7 @@ from pydantic.networks import AnyUrl
 from pydantic import BaseModel, Field
 from pydantic_core import core_schema
 
-from il_supermarket_scarper.utils.file_types import FileTypesFilters
+from il_supermarket_scarper.utils.file_name_parser import parse_file_name
 
 
 FILENAME_REGEX = re.compile(r"^[a-zA-Z0-9._-]+$")
@@ -34,7 +34,7 @@ class FileName(str):
             raise ValueError("Filename cannot be empty")
 
         value = value.replace("NULL", "")
-        if FileTypesFilters.get_type_from_file(value) is None:
+        if parse_file_name(value).file_type is None:
             raise ValueError(f"File {value} is not a valid filename")
 
         return value
@@ -127,6 +127,19 @@ class SawStatus(BaseModel):
     size: Optional[Union[int, float]] = None
 
 
+class SummaryStatus(BaseModel):
+    """Status event standing for the per-file events of a status, in one task."""
+
+    task_id: str
+    status: str = "summary"
+    system_timestamp: Optional[datetime] = None
+    summarized_status: str
+    count: int
+    total_size: Union[int, float] = 0
+    files_without_size: int = 0
+    names_digest: str
+
+
 class VerifiedDownload(BaseModel):
     """Record of a verified downloaded file."""
 
@@ -149,9 +162,9 @@ class ScraperStatusOutput(BaseModel):
     global_status: List[Union[StartedStatus, EstimatedSizeStatus]] = Field(
         default_factory=list
     )
-    events: List[Union[SawStatus, CollectedStatus, DownloadedStatus, FailedStatus]] = (
-        Field(default_factory=list)
-    )
+    events: List[
+        Union[SawStatus, CollectedStatus, DownloadedStatus, FailedStatus, SummaryStatus]
+    ] = Field(default_factory=list)
     verified_downloads: List[VerifiedDownload] = Field(default_factory=list)
 
     def _build_per_file_status_data(self):
@@ -176,6 +189,7 @@ class ScraperStatusOutput(BaseModel):
             }
         )
         per_file_status_counter = defaultdict(list)
+        summarized_statuses = set()
 
         for event in self.events:
             if isinstance(event, SawStatus):
@@ -193,12 +207,19 @@ class ScraperStatusOutput(BaseModel):
                 fn = event.file_name
                 per_file[fn]["failed"] = True
                 per_file_status_counter[fn].append("failed")
+            elif isinstance(event, SummaryStatus):
+                summarized_statuses.add(event.summarized_status)
 
         for vd in self.verified_downloads:
             fn = vd.file_name
             per_file[fn]["verified"] = True
             per_file_status_counter[fn].append("verified")
 
+        # a summary stands for the events of every file in its status
+        for status in per_file.values():
+            for summarized_status in summarized_statuses:
+                status[summarized_status] = True
+
         return per_file, per_file_status_counter
 
     @staticmethod
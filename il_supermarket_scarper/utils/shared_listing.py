@@ -0,0 +1,102 @@
+"""Listing pages shared by the chains of one portal within a process."""
+
+import asyncio
+import time
+from threading import Lock
+
+SHARED_LISTING_TTL = 60
+
+
+class SharedListings:
+    """
+    Parsed listing pages shared by all the chains of a process.
+
+    Chains hosted on the same portal list the same page. The first chain to
+    ask for a key fetches and parses it; chains asking meanwhile await that
+    fetch (single flight) and the result is reused for ttl seconds. A fetch
+    in flight on another event loop is not awaited, the page is fetched again.
+    """
+
+    def __init__(self, ttl=SHARED_LISTING_TTL):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._values = {}
+        self._in_flight = {}
+
+    def _reserve(self, key, loop):
+        """the cached value, or the fetch to await and whether the caller owns it"""
+        with self._lock:
+            now = time.monotonic()
+            cached = self._values.get(key)
+            if cached is not None and cached[0] > now:
+                return cached, None, False
+            pending = self._in_flight.get(key)
+            if pending is not None and pending.get_loop() is loop:
+                return None, pending, False
+            pending = loop.create_future()
+            self._in_flight[key] = pending
+            return None, pending, True
+
+    def _release(self, key, pending, value=None, store=False):
+        """stop tracking a fetch, keeping its value if it succeeded"""
+        with self._lock:
+            if self._in_flight.get(key) is pending:
+                del self._in_flight[key]
+            if store:
+                now = time.monotonic()
+                self._values = {
+                    cached_key: cached
+                    for cached_key, cached in self._values.items()
+                    if cached[0] > now
+                }
+                self._values[key] = (now + self.ttl, value)
+
+    async def get_or_fetch(self, key, fetch):
+        """
+        The shared value of key, calling fetch() only if no one did lately.
+
+        Args:
+            key: hashable key of the listing, typically its ListingCache.key
+            fetch: callable returning an awaitable of the parsed listing
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            cached, pending, owner = self._reserve(key, loop)
+            if cached is not None:
+                return cached[1]
+            if owner:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # the owner was cancelled, not us: fetch it ourselves
+                if not pending.cancelled():
+                    raise
+
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            self._release(key, pending)
+            pending.cancel()
+            raise
+        except Exception as error:
+            self._release(key, pending)
+            pending.set_exception(error)
+            # the waiters, if any, get it; don't warn when there are none
+            pending.exception()
+            raise
+        self._release(key, pending, value, store=True)
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        """drop all the shared listings"""
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+
+shared_listings = SharedListings()
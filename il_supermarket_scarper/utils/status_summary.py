@@ -0,0 +1,54 @@
+"""Per-task roll up of the status events of many files."""
+
+import hashlib
+from typing import Optional, Union
+
+DIGEST_MODULO = 2**64
+
+
+class StatusSummary:
+    """
+    The counts of the files that reached a status during a task.
+
+    Stands for the per-file documents of the status: how many files, their
+    total size, and a digest of their names. The digest doesn't depend on
+    the order the files were reported in, so two tasks that listed the same
+    files have the same digest.
+    """
+
+    def __init__(self, status: str):
+        self.status = status
+        self.count = 0
+        self.total_size = 0
+        self.files_without_size = 0
+        self._digest = 0
+
+    @staticmethod
+    def _name_hash(file_name: str) -> int:
+        """a 64 bit hash of a file name"""
+        digest = hashlib.blake2b(file_name.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def add(self, file_name: str, size: Optional[Union[int, float]] = None):
+        """count a file"""
+        self.count += 1
+        if size is None:
+            self.files_without_size += 1
+        else:
+            self.total_size += size
+        self._digest = (self._digest + self._name_hash(file_name)) % DIGEST_MODULO
+
+    @property
+    def names_digest(self) -> str:
+        """the digest of the names of the files, as hex"""
+        return f"{self._digest:016x}"
+
+    def as_document(self) -> dict:
+        """the fields of the summary event"""
+        return {
+            "summarized_status": self.status,
+            "count": self.count,
+            "total_size": self.total_size,
+            "files_without_size": self.files_without_size,
+            "names_digest": self.names_digest,
+        }
@@ -0,0 +1,14 @@
+"""Fixtures shared by the tests of the utils."""
+
+import shutil
+import tempfile
+
+import pytest
+
+
+@pytest.fixture(name="base_path")
+def fixture_base_path():
+    """a temporary status folder"""
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
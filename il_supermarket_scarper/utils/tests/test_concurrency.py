@@ -0,0 +1,175 @@
+"""Tests for the download concurrency limiters."""
+
+import asyncio
+import ftplib
+
+import pytest
+
+from il_supermarket_scarper.utils import (
+    AIMDConcurrencyLimiter,
+    FairDownloadBudget,
+    FixedConcurrencyLimiter,
+    HttpStatusError,
+    RestartSessionError,
+    create_concurrency_limiter,
+    is_congestion_error,
+)
+
+
+def test_is_congestion_error():
+    """test only load related errors count as congestion"""
+    assert is_congestion_error(asyncio.TimeoutError())
+    assert is_congestion_error(HttpStatusError(503, "http://x"))
+    assert is_congestion_error(RestartSessionError())
+    assert is_congestion_error(ftplib.error_temp("421 Too many connections"))
+    assert is_congestion_error(
+        ConnectionError("Response for http://x, returned with status 502")
+    )
+    assert not is_congestion_error(HttpStatusError(404, "http://x"))
+    assert not is_congestion_error(ftplib.error_perm("550 No such file"))
+    assert not is_congestion_error(ValueError("bad archive"))
+
+
+def test_aimd_grows_and_cuts():
+    """test the limit grows a slot per window and halves on congestion"""
+
+    async def run_test():
+        limiter = AIMDConcurrencyLimiter(4, min_limit=2, max_limit=6, cooldown=60)
+        for _ in range(4):
+            async with limiter.track():
+                pass
+        assert limiter.limit == 5
+
+        for _ in range(50):
+            async with limiter.track():
+                pass
+        assert limiter.limit == 6
+
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                async with limiter.track():
+                    raise asyncio.TimeoutError()
+        # the cooldown merges failures of downloads started together
+        assert limiter.limit == 3
+
+        limiter.cooldown = 0
+        for _ in range(3):
+            with pytest.raises(HttpStatusError):
+                async with limiter.track():
+                    raise HttpStatusError(500, "http://x")
+        assert limiter.limit == 2
+
+        with pytest.raises(ValueError):
+            async with limiter.track():
+                raise ValueError("not a load problem")
+        assert limiter.limit == 2
+
+    asyncio.run(run_test())
+
+
+def test_limiter_bounds_running_downloads():
+    """test no more slots than the limit are held at once"""
+
+    async def run_test(limiter):
+        running = []
+        peak = []
+
+        async def download():
+            async with limiter:
+                running.append(1)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*[download() for _ in range(20)])
+        return max(peak)
+
+    assert asyncio.run(run_test(FixedConcurrencyLimiter(3))) == 3
+    assert asyncio.run(run_test(AIMDConcurrencyLimiter(2, max_limit=8))) == 2
+
+
+def test_create_concurrency_limiter(monkeypatch):
+    """test the limiter type is picked from the argument or the environment"""
+    assert isinstance(create_concurrency_limiter(limit=3), AIMDConcurrencyLimiter)
+    monkeypatch.setenv("CONCURRENCY_LIMITER", "fixed")
+    limiter = create_concurrency_limiter(limit=3, max_limit=9)
+    assert isinstance(limiter, FixedConcurrencyLimiter)
+    assert limiter.limit == limiter.max_limit == 3
+    with pytest.raises(ValueError):
+        create_concurrency_limiter("unknown")
+
+
+def test_fair_download_budget_shares_slots():
+    """test freed slots go to the chain holding the fewest, within the budget"""
+
+    async def run_test():
+        budget = FairDownloadBudget(4)
+        peak = []
+        order = []
+
+        async def download(chain):
+            async with budget.slot(chain):
+                order.append(chain)
+                peak.append(budget.in_use())
+                await asyncio.sleep(0.01)
+
+        # a big chain queues first, a small one arrives later
+        big = [asyncio.create_task(download("big")) for _ in range(20)]
+        await asyncio.sleep(0)
+        small = [asyncio.create_task(download("small")) for _ in range(4)]
+        await asyncio.gather(*big, *small)
+        return budget, peak, order
+
+    budget, peak, order = asyncio.run(run_test())
+    assert max(peak) == 4
+    assert budget.in_use() == 0
+    # the small chain doesn't wait for the 20 files of the big one
+    assert max(index for index, chain in enumerate(order) if chain == "small") < 12
+
+
+def test_fair_download_budget_cancelled_waiter():
+    """test a cancelled waiter doesn't leak a slot"""
+
+    async def run_test():
+        budget = FairDownloadBudget(1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with budget.slot("a"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+        async with budget.slot("b"):
+            assert budget.in_use("b") == 1
+        return budget.in_use()
+
+    assert asyncio.run(run_test()) == 0
+
+
+def test_fair_download_budget_waiter_cancelled_while_released():
+    """test a waiter cancelled before a release skips it re-raises the cancel"""
+
+    async def run_test():
+        budget = FairDownloadBudget(1)
+
+        async def wait_for_slot():
+            async with budget.slot("b"):
+                pass
+
+        async with budget.slot("a"):
+            waiter = asyncio.create_task(wait_for_slot())
+            await asyncio.sleep(0)
+            waiter.cancel()
+        # the release popped the cancelled waiter before it could run
+        (result,) = await asyncio.gather(waiter, return_exceptions=True)
+        assert isinstance(result, asyncio.CancelledError)
+        return budget.in_use()
+
+    assert asyncio.run(run_test()) == 0
@@ -0,0 +1,224 @@
+"""Tests for the status databases."""
+
+import asyncio
+import os
+import pickle
+import threading
+
+from il_supermarket_scarper.utils import (
+    JsonDataBase,
+    JsonlDataBase,
+    ScrapingResult,
+    SqliteDataBase,
+)
+from il_supermarket_scarper.utils.databases import (
+    AsyncMongoDataBase,
+    ExecutorDataBase,
+    create_status_database_for_scraper,
+)
+from il_supermarket_scarper.utils.scraper_status import ScraperStatus
+from il_supermarket_scarper.utils.scraper_status_contract import ScraperStatusOutput
+
+FILE_NAME = "PriceFull7290058249350-001-202601121522"
+
+
+def _record_a_download(database):
+    """go through the statuses of downloading one file"""
+    status = ScraperStatus("wolt", status_database=database)
+    status.on_scraping_start(limit=None, files_types=None)
+    status.register_saw_file(FILE_NAME, "http://x/f.gz", 100)
+    status.register_collected_file(FILE_NAME, "http://x/f.gz")
+    status.register_downloaded_file(
+        ScrapingResult(
+            file_name=FILE_NAME,
+            downloaded=True,
+            extract_succefully=True,
+            error=None,
+            restart_and_retry=False,
+        )
+    )
+    status.on_scrape_completed(os.path.dirname(database.base_path))
+
+
+def _without_timestamps(documents):
+    """the documents, without the fields changing from one run to another"""
+    return {
+        collection: [
+            {
+                key: value
+                for key, value in document.items()
+                if key not in ("system_timestamp", "task_id")
+            }
+            for document in collection_documents
+        ]
+        for collection, collection_documents in documents.items()
+        if collection != "_metadata"
+    }
+
+
+def test_jsonl_same_view_as_json(base_path):
+    """test the JSON lines database reads back like the JSON one"""
+    json_database = JsonDataBase("wolt", os.path.join(base_path, "json"))
+    jsonl_database = JsonlDataBase("wolt", os.path.join(base_path, "jsonl"))
+    _record_a_download(json_database)
+    _record_a_download(jsonl_database)
+
+    documents = jsonl_database.read_documents()
+    assert _without_timestamps(documents) == _without_timestamps(
+        json_database.read_documents()
+    )
+    assert ScraperStatusOutput(**documents).validate_file_status()
+    assert jsonl_database.already_downloaded(
+        ScraperStatus.VERIFIED_DOWNLOADS, {"file_name": FILE_NAME}
+    )
+    assert not jsonl_database.already_downloaded(
+        ScraperStatus.VERIFIED_DOWNLOADS, {"file_name": "other"}
+    )
+    assert jsonl_database.get_last_modified() is not None
+
+
+def test_jsonl_appends(base_path):
+    """test inserts append lines, the metadata is kept apart"""
+    database = JsonlDataBase("wolt", base_path)
+    database.insert_document("events", {"n": 1})
+    database.insert_documents("events", [{"n": 2}, {"n": 3}])
+    database.set_metadata("last_run", {"duration": 1.5})
+
+    with open(
+        os.path.join(base_path, "wolt", "events.jsonl"), "r", encoding="utf-8"
+    ) as file:
+        assert file.read() == '{"n": 1}\n{"n": 2}\n{"n": 3}\n'
+    assert database.get_metadata("last_run") == {"duration": 1.5}
+    assert database.get_metadata("missing", 0) == 0
+
+
+def test_jsonl_skips_cut_line(base_path):
+    """test a line cut by a crash doesn't lose the rest of the collection"""
+    JsonlDataBase("wolt", base_path).insert_document("events", {"n": 1})
+    with open(
+        os.path.join(base_path, "wolt", "events.jsonl"), "a", encoding="utf-8"
+    ) as file:
+        file.write('{"n": ')
+
+    # reopened after the crash
+    database = JsonlDataBase("wolt", base_path)
+    database.insert_document("events", {"n": 2})
+    database.insert_document("events", {"n": 3})
+
+    assert database.read_documents()["events"] == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert database.already_downloaded("events", {"n": 2})
+
+
+def test_create_jsonl_database(base_path):
+    """test the jsonl database is selected from the configuration"""
+    database = create_status_database_for_scraper(
+        "WOLT", {"database_type": "jsonl", "base_path": base_path}
+    )
+    assert isinstance(database, JsonlDataBase)
+
+
+def test_sqlite_same_view_as_json(base_path):
+    """test the SQLite database reads back like the JSON one"""
+    json_database = JsonDataBase("wolt", os.path.join(base_path, "json"))
+    sqlite_database = SqliteDataBase("wolt", os.path.join(base_path, "sqlite"))
+    _record_a_download(json_database)
+    _record_a_download(sqlite_database)
+
+    documents = sqlite_database.read_documents()
+    assert _without_timestamps(documents) == _without_timestamps(
+        json_database.read_documents()
+    )
+    assert ScraperStatusOutput(**documents).validate_file_status()
+    assert sqlite_database.get_last_modified() is not None
+
+
+def test_sqlite_already_downloaded(base_path):
+    """test lookups by the indexed file name and by other fields"""
+    database = SqliteDataBase("wolt", base_path)
+    assert not database.already_downloaded("verified_downloads", {"file_name": "a"})
+    database.insert_documents(
+        "verified_downloads",
+        [{"file_name": f"file{index}", "task_id": "t1"} for index in range(1000)],
+    )
+
+    assert database.already_downloaded("verified_downloads", {"file_name": "file7"})
+    assert database.already_downloaded(
+        "verified_downloads", {"file_name": "file7", "task_id": "t1"}
+    )
+    assert not database.already_downloaded(
+        "verified_downloads", {"file_name": "file7", "task_id": "t2"}
+    )
+    assert database.already_downloaded("verified_downloads", {"task_id": "t1"})
+    plan = database._get_connection().execute(  # pylint: disable=protected-access
+        "EXPLAIN QUERY PLAN SELECT document FROM verified_downloads WHERE file_name = ?",
+        ("file7",),
+    )
+    assert "USING INDEX" in " ".join(str(step) for step in plan)
+
+
+def test_sqlite_database_pickles(base_path):
+    """test the database can be handed to the pool processes"""
+    database = SqliteDataBase("wolt", base_path)
+    database.set_metadata("last_run", {"duration": 3.0})
+
+    copy = pickle.loads(pickle.dumps(database))
+    copy.insert_document("events", {"file_name": "a"})
+
+    assert copy.get_metadata("last_run") == {"duration": 3.0}
+    assert database.already_downloaded("events", {"file_name": "a"})
+    assert isinstance(
+        create_status_database_for_scraper(
+            "WOLT", {"database_type": "sqlite", "base_path": base_path}
+        ),
+        SqliteDataBase,
+    )
+
+
+class _SlowDataBase(JsonlDataBase):
+    """a database whose writes wait for the test to release them"""
+
+    def __init__(self, base_path):
+        super().__init__("wolt", base_path)
+        self.release = threading.Event()
+
+    def insert_documents(self, collection_name, document):
+        assert self.release.wait(5)
+        super().insert_documents(collection_name, document)
+
+
+def test_executor_database_keeps_the_loop_running(base_path):
+    """test a slow write runs while the other tasks of the loop keep going"""
+    database = _SlowDataBase(base_path)
+
+    async def run_test():
+        async_database = database.as_async()
+        assert isinstance(async_database, ExecutorDataBase)
+        write = asyncio.create_task(
+            async_database.insert_documents("events", [{"n": 1}])
+        )
+        # the loop isn't blocked by the pending write
+        await asyncio.sleep(0.05)
+        assert not write.done()
+        database.release.set()
+        await write
+        found = await async_database.already_downloaded("events", {"n": 1})
+        await async_database.set_metadata("last_run", 1)
+        assert await async_database.get_metadata("last_run") == 1
+        assert await async_database.count_documents("events") == 1
+        assert await async_database.iter_field_values("events", "n") == [1]
+        await async_database.close()
+        return found
+
+    assert asyncio.run(run_test())
+
+
+def test_mongo_async_driver_option():
+    """test the async MongoDB client is used only when asked for"""
+    config = {"database_type": "mongo", "connection_url": "mongodb://localhost"}
+    database = create_status_database_for_scraper("WOLT", config)
+    assert isinstance(database.as_async(), ExecutorDataBase)
+
+    database = create_status_database_for_scraper(
+        "WOLT", {**config, "async_driver": True}
+    )
+    assert isinstance(database.as_async(), AsyncMongoDataBase)
@@ -0,0 +1,146 @@
+"""Tests for the in-memory index of downloaded files."""
+
+import asyncio
+import threading
+
+from il_supermarket_scarper.utils import (
+    BloomFilter,
+    DownloadedIndex,
+    JsonDataBase,
+    ScrapingResult,
+)
+from il_supermarket_scarper.utils.scraper_status import ScraperStatus
+
+
+def test_bloom_filter():
+    """test no false negatives and few false positives"""
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f"PriceFull-{index}")
+
+    assert all(f"PriceFull-{index}" in bloom for index in range(1000))
+    false_positives = sum(f"Promo-{index}" in bloom for index in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_index_confirms_hits():
+    """test a Bloom filter index confirms its hits with the exact lookup"""
+    names = {f"file{index}" for index in range(100)}
+    confirmed = []
+
+    def confirm(name):
+        confirmed.append(name)
+        return name in names
+
+    index = DownloadedIndex(
+        names, expected_size=len(names), bloom_threshold=10, confirm=confirm
+    )
+    assert not index.is_exact
+    assert "file5" in index
+    assert confirmed == ["file5"]
+    assert not any(f"other{number}" in index for number in range(100))
+    assert len(confirmed) < 10
+    assert len(index) == 100
+
+
+def test_exact_index():
+    """test small histories are kept in a set, without confirmations"""
+    index = DownloadedIndex(["a", "b"], expected_size=2, bloom_threshold=10)
+    index.add("c")
+    assert index.is_exact
+    assert "c" in index and "d" not in index
+    assert len(index) == 3
+
+
+class _CountingDataBase(JsonDataBase):
+    """a JSON database counting the per-file lookups and the bulk listings"""
+
+    lookups = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.listings = []
+
+    def already_downloaded(self, collection_name, query):
+        """count the lookup"""
+        self.lookups += 1
+        return super().already_downloaded(collection_name, query)
+
+    def count_documents(self, collection_name):
+        """record the count as a listing"""
+        self.listings.append(threading.current_thread())
+        return super().count_documents(collection_name)
+
+    def iter_field_values(self, collection_name, field):
+        """record the listing and the thread it ran in"""
+        self.listings.append(threading.current_thread())
+        return super().iter_field_values(collection_name, field)
+
+
+def test_status_filters_with_the_index(base_path):
+    """test the downloaded files are filtered without a database lookup per file"""
+    database = _CountingDataBase("wolt", base_path)
+    database.insert_documents(
+        ScraperStatus.VERIFIED_DOWNLOADS, [{"file_name": "a"}, {"file_name": "b"}]
+    )
+    status = ScraperStatus("wolt", status_database=database)
+    status.on_scraping_start(limit=None, files_types=None)
+    status.register_downloaded_file(
+        ScrapingResult(
+            file_name="c",
+            downloaded=True,
+            extract_succefully=True,
+            error=None,
+            restart_and_retry=False,
+        )
+    )
+
+    async def files():
+        for name in ["a", "b", "c", "d"]:
+            yield name
+
+    async def run_test():
+        return [name async for name in status.filter_already_downloaded(None, files())]
+
+    assert asyncio.run(run_test()) == ["d"]
+    assert database.lookups == 0
+    # the downloaded files were read once, off the event loop
+    assert len(database.listings) == 1
+    assert database.listings[0] is not threading.main_thread()
+
+
+class _UnindexedDataBase(_CountingDataBase):
+    """a database that can't list its downloaded files"""
+
+    batches = []
+
+    def iter_field_values(self, *_):
+        """the database can't list the files"""
+        return None
+
+    def already_downloaded_many(self, collection_name, file_names):
+        """record the size of the batch"""
+        self.batches.append(len(file_names))
+        return super().already_downloaded_many(collection_name, file_names)
+
+
+def test_status_looks_up_in_batches_without_index(base_path, monkeypatch):
+    """test the files are looked up in the database in batches"""
+    database = _UnindexedDataBase("wolt", base_path)
+    database.insert_documents(
+        ScraperStatus.VERIFIED_DOWNLOADS, [{"file_name": "file3"}]
+    )
+    status = ScraperStatus("wolt", status_database=database)
+    monkeypatch.setattr(status, "DOWNLOADED_LOOKUP_BATCH_SIZE", 4)
+    status.on_scraping_start(limit=None, files_types=None)
+
+    async def files():
+        for index in range(10):
+            yield f"file{index}"
+
+    async def run_test():
+        return [name async for name in status.filter_already_downloaded(None, files())]
+
+    assert len(asyncio.run(run_test())) == 9
+    assert status.downloaded_index is None
+    assert database.batches == [4, 4, 2]
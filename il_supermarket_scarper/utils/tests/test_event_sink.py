@@ -0,0 +1,78 @@
+"""Tests for the buffered writes of status events."""
+
+import asyncio
+
+from il_supermarket_scarper.utils.databases import AbstractDataBase
+from il_supermarket_scarper.utils.event_sink import BufferedEventSink
+
+
+class _RecordingDataBase(AbstractDataBase):
+    """a database recording the batches written to it"""
+
+    def __init__(self):
+        super().__init__("recording")
+        self.batches = []
+        self.fail = False
+
+    def insert_documents(self, collection_name, document):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append((collection_name, list(document)))
+
+    def insert_document(self, collection_name, document):
+        self.insert_documents(collection_name, [document])
+
+    def already_downloaded(self, collection_name, query):
+        return False
+
+    def get_last_modified(self):
+        return None
+
+    def _update_last_modified(self):
+        pass
+
+
+def test_sink_writes_full_batches():
+    """test documents are written once a batch is full, and the rest on close"""
+    database = _RecordingDataBase()
+    sink = BufferedEventSink(database, "events", batch_size=3)
+    for index in range(7):
+        sink.add({"n": index})
+
+    assert [len(batch) for _, batch in database.batches] == [3, 3]
+    assert len(sink) == 1
+    sink.close()
+    assert database.batches[-1] == ("events", [{"n": 6}])
+
+
+def test_sink_flushes_periodically():
+    """test the background task writes a partial batch after the interval"""
+    database = _RecordingDataBase()
+
+    async def run_test():
+        sink = BufferedEventSink(database, "events", flush_interval=0.05)
+        sink.start()
+        sink.add({"n": 1})
+        await asyncio.sleep(0.12)
+        written = list(database.batches)
+        sink.add({"n": 2})
+        sink.close()
+        return written
+
+    assert asyncio.run(run_test()) == [("events", [{"n": 1}])]
+    assert database.batches[-1] == ("events", [{"n": 2}])
+
+
+def test_sink_keeps_documents_of_failed_writes():
+    """test a failed write is retried with the next flush"""
+    database = _RecordingDataBase()
+    sink = BufferedEventSink(database, "events", batch_size=2)
+    database.fail = True
+    sink.add({"n": 1})
+    sink.add({"n": 2})
+    assert len(sink) == 2
+
+    database.fail = False
+    sink.add({"n": 3})
+    sink.close()
+    assert database.batches == [("events", [{"n": 1}, {"n": 2}, {"n": 3}])]
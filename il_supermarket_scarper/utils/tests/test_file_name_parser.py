@@ -0,0 +1,53 @@
+import datetime
+
+from il_supermarket_scarper.utils import FileEntry, FileTypesFilters, parse_file_name
+
+
+def test_parse_store_file_name():
+    """test the fields of a YYYYMMDDHHMM file name"""
+    parsed = parse_file_name("PriceFull7290875100001-009-202601121522.gz")
+    assert parsed.file_type == FileTypesFilters.PRICE_FULL_FILE
+    assert parsed.chain_id == "7290875100001"
+    assert parsed.store_id == 9
+    assert parsed.timestamp == datetime.datetime(2026, 1, 12, 15, 22)
+    assert parsed.date == datetime.date(2026, 1, 12)
+
+
+def test_parse_sub_chain_file_name():
+    """test the store is the number before a YYYYMMDD-HHMMSS timestamp"""
+    parsed = parse_file_name("Promo7290700100008-000-207-20250224-103225")
+    assert parsed.file_type == FileTypesFilters.PROMO_FILE
+    assert parsed.chain_id == "7290700100008"
+    assert parsed.store_id == 207
+    assert parsed.timestamp == datetime.datetime(2025, 2, 24, 10, 32)
+
+
+def test_parse_seconds_file_name():
+    """test the fields of a YYYYMMDDHHMMSS file name"""
+    parsed = parse_file_name("Price7290172900007-001-20250101123456.gz")
+    assert parsed.file_type == FileTypesFilters.PRICE_FILE
+    assert parsed.chain_id == "7290172900007"
+    assert parsed.store_id == 1
+    assert parsed.timestamp == datetime.datetime(2025, 1, 1, 12, 34)
+
+
+def test_parse_partial_file_names():
+    """test the missing fields of names that don't follow the format"""
+    parsed = parse_file_name("Stores7290027600007-000")
+    assert parsed.file_type == FileTypesFilters.STORE_FILE
+    assert parsed.chain_id == "7290027600007"
+    assert parsed.store_id is None
+    assert parsed.timestamp is None and parsed.date is None
+
+    # not a date
+    assert parse_file_name("Price7290058249350-001-202613121522").timestamp is None
+    assert parse_file_name("NULLPrice7290058249350-001-202601121522").file_type is None
+    assert parse_file_name("index.html") == (None, None, None, None)
+
+
+def test_file_entry_parsed():
+    """test the file entries carry the fields of their name"""
+    entry = FileEntry("Promo7290875100001-066-202601051222.gz", "http://x", None)
+    name, _, _ = entry
+    assert entry.parsed == parse_file_name(name)
+    assert entry.parsed.store_id == 66
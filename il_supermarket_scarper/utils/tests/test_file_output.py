@@ -1,6 +1,7 @@
 """Tests for file output configuration."""
 
 import asyncio
+import gzip
 import os
 import tempfile
 
@@ -74,6 +75,129 @@ class TestFileOutput:
 
         asyncio.run(run_test())
 
+    def test_disk_file_output_stream(self):
+        """Test disk file output writes a chunked gz stream extracted to disk."""
+
+        async def chunks(content, size=4):
+            for i in range(0, len(content), size):
+                yield content[i : i + size]
+
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output = DiskFileOutput(tmpdir)
+
+                result = await output.save_stream(
+                    file_link="http://example.com/test.gz",
+                    file_name="test.gz",
+                    chunks=chunks(gzip.compress(b"<xml>test</xml>")),
+                    metadata={"chain": "test"},
+                )
+
+                assert result["saved"] is True
+                assert result["extract_successfully"] is True
+                assert result["file_name"] == "test.xml"
+                assert os.listdir(tmpdir) == ["test.xml"]
+                with open(os.path.join(tmpdir, "test.xml"), "rb") as f:
+                    assert f.read() == b"<xml>test</xml>"
+
+        asyncio.run(run_test())
+
+    def test_disk_file_output_stream_interrupted(self):
+        """Test a failing stream propagates and leaves no partial file behind."""
+
+        async def broken_chunks():
+            yield b"<xml>"
+            raise ConnectionResetError("connection dropped")
+
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output = DiskFileOutput(tmpdir)
+
+                with pytest.raises(ConnectionResetError):
+                    await output.save_stream(
+                        file_link="http://example.com/test.xml",
+                        file_name="test.xml",
+                        chunks=broken_chunks(),
+                    )
+                assert not os.listdir(tmpdir)
+
+        asyncio.run(run_test())
+
+    def test_disk_file_output_stream_bad_gz(self):
+        """Test a corrupted gz stream is reported and kept as it was downloaded."""
+
+        async def chunks():
+            yield gzip.compress(b"<xml>test</xml>")[:-4]
+
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output = DiskFileOutput(tmpdir)
+
+                result = await output.save_stream(
+                    file_link="http://example.com/test.gz",
+                    file_name="test.gz",
+                    chunks=chunks(),
+                )
+
+                assert result["saved"] is True
+                assert result["extract_successfully"] is False
+                assert result["error"] is not None
+                assert result["file_name"] == "test.gz"
+                assert os.listdir(tmpdir) == ["test.gz"]
+                with open(os.path.join(tmpdir, "test.gz"), "rb") as f:
+                    assert f.read() == gzip.compress(b"<xml>test</xml>")[:-4]
+
+        asyncio.run(run_test())
+
+    def test_disk_file_output_stream_write_error(self):
+        """Test a failure writing the file is reported, not raised."""
+
+        async def chunks():
+            yield b"<xml>test</xml>"
+
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output = DiskFileOutput(os.path.join(tmpdir, "out"), extract_gz=False)
+                os.rmdir(output.storage_path)
+
+                result = await output.save_stream(
+                    file_link="http://example.com/test.xml",
+                    file_name="test.xml",
+                    chunks=chunks(),
+                )
+
+                assert result["saved"] is False
+                assert result["error"] is not None
+
+        asyncio.run(run_test())
+
+    def test_queue_file_output_stream(self):
+        """Test queue file output spools a chunked stream into one message."""
+
+        async def chunks(content, size=4):
+            for i in range(0, len(content), size):
+                yield content[i : i + size]
+
+        async def run_test():
+            handler = InMemoryQueueHandler("test_stream_queue")
+            output = QueueFileOutput(handler, spool_max_size=8)
+
+            result = await output.save_stream(
+                file_link="http://example.com/test.gz",
+                file_name="test.gz",
+                chunks=chunks(gzip.compress(b"<xml>test</xml>")),
+            )
+
+            assert result["saved"] is True
+            assert result["file_name"] == "test.xml"
+            async for message in handler.get_all_messages():
+                assert message["file_name"] == "test.xml"
+                assert message["file_content"] == b"<xml>test</xml>"
+                break
+            await handler.close()
+
+        asyncio.run(run_test())
+
     def test_scraper_config_defaults(self):
         """Test ScraperConfig default values."""
         config = ScraperConfig()
@@ -0,0 +1,284 @@
+"""Tests for the pooled FTP connections, against a local pyftpdlib server."""
+
+import asyncio
+import concurrent.futures
+import ftplib
+import socket
+import threading
+
+import pytest
+
+from il_supermarket_scarper.utils.connection import (
+    DownloadProgress,
+    _sync_ftp_iter_content,
+    collect_from_ftp,
+    compile_glob_patterns,
+    fetch_file_from_ftp_to_memory,
+    fetch_file_from_ftp_to_stream,
+)
+from il_supermarket_scarper.engines.cerberus import Cerberus
+from il_supermarket_scarper.utils import (
+    DiskFileOutput,
+    DumpFolderNames,
+    FilterState,
+    JsonDataBase,
+)
+from il_supermarket_scarper.utils.ftp_pool import FtpConnectionPool, ftp_connection_pool
+
+pyftpdlib_authorizers = pytest.importorskip("pyftpdlib.authorizers")
+pyftpdlib_handlers = pytest.importorskip("pyftpdlib.handlers")
+pyftpdlib_servers = pytest.importorskip("pyftpdlib.servers")
+
+FILE_CONTENT = b"<root>" + b"<Item/>" * 20_000 + b"</root>"
+
+
+@pytest.fixture(name="ftp_server")
+def fixture_ftp_server(tmp_path):
+    """run a local FTP server serving two files, counting logins"""
+    (tmp_path / "a.xml").write_bytes(FILE_CONTENT)
+    (tmp_path / "b.xml").write_bytes(FILE_CONTENT[::-1])
+    (tmp_path / "PriceFull7290027600007-001-202501010000.gz").write_bytes(b"gz")
+    (tmp_path / "Promo7290027600007-002-202501010000.gz").write_bytes(b"gz")
+    (tmp_path / "Stores7290027600007-000-202501010000.xml").write_bytes(b"xml")
+
+    authorizer = pyftpdlib_authorizers.DummyAuthorizer()
+    authorizer.add_user("user", "pass", str(tmp_path), perm="elr")
+    logins = []
+
+    class _Handler(pyftpdlib_handlers.FTPHandler):
+        def on_login(self, username):
+            """count the logins"""
+            logins.append(username)
+
+    _Handler.authorizer = authorizer
+    server = pyftpdlib_servers.FTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.address[1], logins
+    server.close_all()
+
+
+def _factory_for(port):
+    """a factory opening plain FTP connections to the local server"""
+
+    def _factory(ftp_host, ftp_username, ftp_password, timeout):
+        ftp = ftplib.FTP(timeout=timeout)
+        ftp.connect(ftp_host, port)
+        ftp.login(ftp_username, ftp_password)
+        return ftp
+
+    return _factory
+
+
+def _pool_for(port):
+    """a pool opening plain FTP connections to the local server"""
+    return FtpConnectionPool(ftp_factory=_factory_for(port))
+
+
+def test_connection_reused_across_downloads(ftp_server):
+    """test sequential downloads log in once and reuse the connection"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    async def run_test():
+        for file_name in ["a.xml", "b.xml", "a.xml"]:
+            content = await fetch_file_from_ftp_to_memory(
+                "127.0.0.1", "user", "pass", "/", file_name, ftp_pool=pool
+            )
+            assert content == (
+                FILE_CONTENT if file_name == "a.xml" else FILE_CONTENT[::-1]
+            )
+
+    asyncio.run(run_test())
+    assert len(logins) == 1
+    assert pool.idle_count("127.0.0.1", "user", "/") == 1
+    pool.close_idle()
+
+
+def test_concurrent_downloads_bounded(ftp_server):
+    """test concurrent streams never open more than max_connections"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    async def download(file_name):
+        chunks = [
+            chunk
+            async for chunk in fetch_file_from_ftp_to_stream(
+                "127.0.0.1",
+                "user",
+                "pass",
+                "/",
+                file_name,
+                max_connections=2,
+                ftp_pool=pool,
+            )
+        ]
+        return b"".join(chunks)
+
+    async def run_test():
+        return await asyncio.gather(*[download("a.xml") for _ in range(6)])
+
+    assert all(content == FILE_CONTENT for content in asyncio.run(run_test()))
+    assert len(logins) <= 2
+    assert pool.idle_count("127.0.0.1", "user", "/") == len(logins)
+    pool.close_idle()
+
+
+def test_waiting_downloads_hold_no_thread(ftp_server):
+    """test downloads waiting for a connection don't starve a small executor"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    async def download():
+        chunks = [
+            chunk
+            async for chunk in fetch_file_from_ftp_to_stream(
+                "127.0.0.1",
+                "user",
+                "pass",
+                "/",
+                "a.xml",
+                max_connections=2,
+                ftp_pool=pool,
+            )
+        ]
+        return b"".join(chunks)
+
+    async def run_test():
+        asyncio.get_running_loop().set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        )
+        return await asyncio.wait_for(
+            asyncio.gather(*[download() for _ in range(6)]), timeout=60
+        )
+
+    assert all(content == FILE_CONTENT for content in asyncio.run(run_test()))
+    assert len(logins) <= 2
+    assert pool.max_connections("127.0.0.1", "user", "/") == 2
+    pool.close_idle()
+
+
+def test_broken_connection_replaced(ftp_server):
+    """test a connection failing the NOOP health check is replaced"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    with pool.connection("127.0.0.1", "user", "pass", "/") as ftp:
+        broken = ftp
+    broken.sock.shutdown(socket.SHUT_RDWR)
+
+    with pool.connection("127.0.0.1", "user", "pass", "/") as ftp:
+        assert ftp is not broken
+        assert "a.xml" in ftp.nlst()
+    assert len(logins) == 2
+    pool.close_idle()
+
+
+def test_missing_file_keeps_connection(ftp_server):
+    """test a refused RETR doesn't drop the pooled connection"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    with pytest.raises(ftplib.error_perm):
+        with pool.connection("127.0.0.1", "user", "pass", "/") as ftp:
+            ftp.retrbinary("RETR missing.xml", lambda _: None)
+
+    with pool.connection("127.0.0.1", "user", "pass", "/") as ftp:
+        ftp.voidcmd("NOOP")
+    assert len(logins) == 1
+    pool.close_idle()
+
+
+def test_compile_glob_patterns():
+    """test all patterns are matched at once, ignoring case"""
+    name_matches = compile_glob_patterns(["*pricef*", "*promo[0-9]*001-*"])
+    assert name_matches("PriceFull7290027600007-001-202501010000.gz")
+    assert name_matches("Promo7290027600007-001-202501010000.gz")
+    assert not name_matches("Promo7290027600007-002-202501010000.gz")
+    assert not name_matches("Stores7290027600007-000-202501010000.xml")
+    assert compile_glob_patterns(["*pricef*", "*"]) is None
+    assert compile_glob_patterns(None) is None
+
+
+def test_collect_from_ftp_single_listing(ftp_server):
+    """test several patterns are served by a single login and listing"""
+    port, logins = ftp_server
+    pool = _pool_for(port)
+
+    async def run_test():
+        return [
+            entry
+            async for entry in collect_from_ftp(
+                "127.0.0.1",
+                "user",
+                "pass",
+                "/",
+                ["*pricef*", "*promo[0-9]*", "*store*"],
+                ftp_pool=pool,
+            )
+        ]
+
+    entries = asyncio.run(run_test())
+    assert sorted(entry.name for entry in entries) == [
+        "PriceFull7290027600007-001-202501010000.gz",
+        "Promo7290027600007-002-202501010000.gz",
+        "Stores7290027600007-000-202501010000.xml",
+    ]
+    assert all(entry.size is not None for entry in entries)
+    assert len(logins) == 1
+    pool.close_idle()
+
+
+def test_ftp_transfer_restarts_from_offset(ftp_server):
+    """test a transfer with received bytes continues from there (REST)"""
+    port, _ = ftp_server
+    pool = _pool_for(port)
+    progress = DownloadProgress()
+    progress.received = 12_345
+
+    content = b"".join(
+        _sync_ftp_iter_content(
+            "127.0.0.1",
+            "user",
+            "pass",
+            "/",
+            "a.xml",
+            15,
+            ftp_pool=pool,
+            progress=progress,
+        )
+    )
+    assert content == FILE_CONTENT[12_345:]
+    pool.close_idle()
+
+
+def test_cerberus_pool_bound_is_limiter_ceiling(ftp_server, tmp_path, monkeypatch):
+    """test a chain's FTP connections are bounded by its limiter ceiling"""
+    port, _ = ftp_server
+    monkeypatch.setattr(ftp_connection_pool, "ftp_factory", _factory_for(port))
+    engine = Cerberus(
+        DumpFolderNames.RAMI_LEVY,
+        "7290058140886",
+        ftp_host="127.0.0.1",
+        ftp_username="user",
+        ftp_password="pass",
+        file_output=DiskFileOutput(str(tmp_path / "out")),
+        status_database=JsonDataBase(
+            DumpFolderNames.RAMI_LEVY.value, str(tmp_path / "status")
+        ),
+    )
+    engine.concurrency_limiter_type = "aimd"
+
+    async def run_test():
+        return [
+            entry
+            async for entry in engine.collect_files_details_from_site(FilterState())
+        ]
+
+    try:
+        assert asyncio.run(run_test())
+        ceiling = engine.get_concurrency_limiter().max_limit
+        assert ceiling > engine.max_threads
+        assert ftp_connection_pool.max_connections("127.0.0.1", "user", "/") == ceiling
+    finally:
+        ftp_connection_pool.close_idle("127.0.0.1", "user", "/")
@@ -1,7 +1,34 @@
+import gzip
+import io
 import os
+import zipfile
 import pytest
 
-from il_supermarket_scarper.utils.gzip_utils import extract_xml_from_gz_in_memory
+from il_supermarket_scarper.utils import RestartSessionError
+from il_supermarket_scarper.utils.gzip_utils import (
+    extract_xml_from_gz_in_memory,
+    StreamDecompressor,
+)
+
+XML_CONTENT = b"<root>" + b"<Item><Price>1.00</Price></Item>" * 5000 + b"</root>"
+
+
+def _decompress_in_chunks(content, file_name="test.gz", chunk_size=7):
+    """feed content to a stream decompressor in small chunks"""
+    output_buffer = io.BytesIO()
+    decompressor = StreamDecompressor(output_buffer, file_name, piece_size=1024)
+    for i in range(0, len(content), chunk_size):
+        decompressor.write(content[i : i + chunk_size])
+    decompressor.finish()
+    return output_buffer.getvalue()
+
+
+def _zip_bytes(compression):
+    """zip XML_CONTENT into bytes"""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", compression=compression) as the_zip:
+        the_zip.writestr("test.xml", XML_CONTENT)
+    return zip_buffer.getvalue()
 
 
 def test_unzip_bad_file():
@@ -18,3 +45,41 @@ def test_unzip_bad_file():
 
     with pytest.raises(ValueError):
         extract_xml_from_gz_in_memory(file_content, file_name)
+
+
+def test_stream_gzip():
+    """test decompressing a (multi member) gzip in small chunks"""
+    content = gzip.compress(XML_CONTENT[:1000]) + gzip.compress(XML_CONTENT[1000:])
+    assert _decompress_in_chunks(content) == XML_CONTENT
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED])
+def test_stream_zip(compression):
+    """test decompressing a zip in small chunks"""
+    assert _decompress_in_chunks(_zip_bytes(compression)) == XML_CONTENT
+
+
+def test_stream_zip_with_data_descriptor():
+    """test a zip written to a stream (sizes after the data) is extracted"""
+
+    class _Unseekable(io.BytesIO):
+        def seekable(self):
+            return False
+
+    zip_buffer = _Unseekable()
+    with zipfile.ZipFile(zip_buffer, "w", compression=zipfile.ZIP_STORED) as the_zip:
+        with the_zip.open("test.xml", "w") as the_file:
+            the_file.write(XML_CONTENT)
+    assert _decompress_in_chunks(zip_buffer.getvalue()) == XML_CONTENT
+
+
+def test_stream_truncated_gzip():
+    """test a gzip cut in the middle is reported"""
+    with pytest.raises(ValueError):
+        _decompress_in_chunks(gzip.compress(XML_CONTENT)[:-100])
+
+
+def test_stream_link_expired():
+    """test an expired link page served instead of the file restarts the session"""
+    with pytest.raises(RestartSessionError):
+        _decompress_in_chunks(b"<html><body>Link Expired</body></html>")
@@ -0,0 +1,59 @@
+from il_supermarket_scarper.utils import (
+    ListingRow,
+    parse_list_items,
+    parse_script_texts,
+    parse_table_rows,
+)
+from il_supermarket_scarper.utils.listing_parser import (
+    _list_items_with_soup,
+    _scripts_with_soup,
+    _table_rows_with_soup,
+)
+
+TABLE_PAGE = (
+    "<html><body><table>"
+    "<tr><th>file</th><th>chain</th><th>size</th></tr>"
+    '<tr><td><a href="files/PriceFull7290455000004-001-202601121522.xml.gz">f</a>'
+    "</td><td> ח. כהן <!-- chain --></td><td>1.5 MB</td></tr>"
+    "<tr><td>no link</td><td>ויקטורי</td><td>-</td></tr>"
+    "</table></body></html>"
+)
+LIST_PAGE = (
+    '<ul><li><a href="PriceFull7290058249350-001-202601121522.gz">'
+    "PriceFull7290058249350-001-202601121522</a></li><li>no link</li></ul>"
+)
+SCRIPT_PAGE = (
+    "<html><head><script>const path = './20260112';\n"
+    'const files = [{"name": "a.gz"}];\n</script><script></script></head></html>'
+)
+
+
+def test_parse_table_rows():
+    """test the link, name, size and cells of the rows of a table"""
+    rows = parse_table_rows(TABLE_PAGE)
+    assert len(rows) == 3
+    header, priced, unlinked = rows[0], rows[1], rows[2]
+    assert header.href is None and header.cells == ()
+    assert priced == ListingRow(
+        "files/PriceFull7290455000004-001-202601121522.xml.gz",
+        "PriceFull7290455000004-001-202601121522",
+        1.5 * 1024 * 1024,
+        "f ח. כהן 1.5 MB",
+        ("f", "ח. כהן", "1.5 MB"),
+    )
+    assert unlinked.href is None and unlinked.name is None
+    assert unlinked.size is None
+
+
+def test_fast_paths_match_beautifulsoup():
+    """test lxml extracts the same values as the BeautifulSoup fallback"""
+    assert parse_table_rows(TABLE_PAGE) == _table_rows_with_soup(TABLE_PAGE)
+    assert parse_list_items(LIST_PAGE) == _list_items_with_soup(LIST_PAGE)
+    assert parse_script_texts(SCRIPT_PAGE) == _scripts_with_soup(SCRIPT_PAGE)
+
+
+def test_unreadable_page_falls_back():
+    """test a page lxml can't stream is parsed with BeautifulSoup"""
+    assert not parse_table_rows("")
+    assert not parse_list_items("")
+    assert not parse_script_texts("")
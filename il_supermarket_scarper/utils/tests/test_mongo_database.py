@@ -0,0 +1,130 @@
+"""Tests for the MongoDB status database, against mongomock."""
+
+import asyncio
+
+import pytest
+
+from il_supermarket_scarper.utils import MongoDataBase
+from il_supermarket_scarper.utils.databases import mongo
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class _AsyncCollection:  # pylint: disable=too-few-public-methods
+    """a mongomock collection behind the async client API"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+    def find(self, *args, **kwargs):
+        """an async cursor"""
+
+        async def documents():
+            for document in self.collection.find(*args, **kwargs):
+                yield document
+
+        return documents()
+
+
+class _AsyncClient:
+    """a mongomock client behind the async client API"""
+
+    def __init__(self, url):
+        self.client = mongomock.MongoClient(url)
+
+    def __getitem__(self, database_name):
+        database = self.client[database_name]
+
+        class _Database:  # pylint: disable=too-few-public-methods
+            def __getitem__(self, collection_name):
+                return _AsyncCollection(database[collection_name])
+
+        return _Database()
+
+    def close(self):
+        """close the client"""
+        self.client.close()
+
+
+@pytest.fixture(name="database")
+def fixture_database(monkeypatch):
+    """a MongoDB status database on an in-memory server"""
+    monkeypatch.setattr(mongo.pymongo, "MongoClient", mongomock.MongoClient)
+    return MongoDataBase("wolt", "mongodb://localhost", "scraper_status")
+
+
+def test_indexes_created(database):
+    """test the lookup fields are indexed on connection"""
+    database.create_connection()
+    assert "file_name_1" in database.store_db["verified_downloads"].index_information()
+    events_indexes = database.store_db["events"].index_information()
+    assert {"task_id_1", "status_1"} <= set(events_indexes)
+
+
+def test_bulk_insert_and_one_metadata_update(database, monkeypatch):
+    """test a batch is one insert_many and one last_modified upsert"""
+    updates = []
+    # pylint: disable-next=protected-access
+    update_last_modified = database._update_last_modified
+
+    def counting_update_last_modified():
+        updates.append(1)
+        update_last_modified()
+
+    monkeypatch.setattr(
+        database, "_update_last_modified", counting_update_last_modified
+    )
+    documents = [{"status": "saw", "file_name": f"f{index}"} for index in range(50)]
+    database.insert_documents("events", documents)
+
+    assert database.count_documents("events") == 50
+    assert len(updates) == 1
+    assert database.get_last_modified() is not None
+
+    # a retried batch doesn't fail on its already inserted documents
+    database.insert_documents("events", documents)
+    assert database.count_documents("events") == 50
+
+
+def test_already_downloaded_many(database):
+    """test the batched lookup finds the downloaded files over several $in batches"""
+    database.insert_documents(
+        "verified_downloads",
+        [{"file_name": f"f{index}"} for index in range(0, 3000, 2)],
+    )
+    found = database.already_downloaded_many(
+        "verified_downloads", [f"f{index}" for index in range(3000)]
+    )
+    assert found == {f"f{index}" for index in range(0, 3000, 2)}
+
+
+def test_async_database_matches_the_sync_one(monkeypatch):
+    """test the async client counts, lists fields and keeps metadata"""
+    monkeypatch.setattr(mongo, "AsyncMongoClient", _AsyncClient)
+    database = MongoDataBase(
+        "wolt", "mongodb://localhost", "scraper_status", async_driver=True
+    )
+
+    async def run_test():
+        async_database = database.as_async()
+        assert isinstance(async_database, mongo.AsyncMongoDataBase)
+        await async_database.insert_documents(
+            "events", [{"status": "saw", "file_name": f"f{i}"} for i in range(5)]
+        )
+        assert await async_database.count_documents("events") == 5
+        assert await async_database.iter_field_values("events", "status") == ["saw"] * 5
+        assert await async_database.get_metadata("last_run") is None
+        await async_database.set_metadata("last_run", {"files": 5})
+        assert await async_database.get_metadata("last_run") == {"files": 5}
+        assert await async_database.get_last_modified() is not None
+        await async_database.close()
+
+    asyncio.run(run_test())
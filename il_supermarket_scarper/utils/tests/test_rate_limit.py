@@ -0,0 +1,102 @@
+"""Tests for the per-host rate limiter."""
+
+import asyncio
+import time
+from multiprocessing import Manager, Pool
+
+import pytest
+
+from il_supermarket_scarper.utils.rate_limit import (
+    RATE_LIMIT_ENV_VAR,
+    HostRateLimiter,
+    create_rate_limiter,
+    create_shared_rate_limiter,
+    get_rate_limiter,
+    install_rate_limiter,
+    parse_retry_after,
+)
+
+
+def test_bucket_allows_burst_then_rate():
+    """test a burst passes at once and later requests are spaced by the rate"""
+    limiter = HostRateLimiter(rate=10, burst=3)
+    waits = [limiter.reserve("https://a.co.il/file.gz") for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+    # other hosts have their own bucket
+    assert limiter.reserve("https://b.co.il/file.gz") == 0.0
+
+
+def test_disabled_limiter():
+    """test a zero rate, the default, only waits for a paused host"""
+    limiter = HostRateLimiter()
+    assert all(limiter.reserve("https://a.co.il") == 0.0 for _ in range(10))
+    limiter.on_response("https://a.co.il/x", 429, {"Retry-After": "30"})
+    assert limiter.reserve("https://a.co.il/y") == pytest.approx(30, abs=0.5)
+    assert limiter.reserve("https://b.co.il/y") == 0.0
+
+
+def test_rate_from_the_environment(monkeypatch):
+    """test the hosts are unlimited unless a rate is configured"""
+    monkeypatch.delenv(RATE_LIMIT_ENV_VAR, raising=False)
+    assert create_rate_limiter().rate == 0
+    monkeypatch.setenv(RATE_LIMIT_ENV_VAR, "5")
+    limiter = create_rate_limiter()
+    assert (limiter.rate, limiter.burst) == (5, 10)
+    assert create_rate_limiter(rate=2).rate == 2
+
+
+def test_retry_after_pauses_host():
+    """test 429 responses pause the host for Retry-After seconds"""
+    limiter = HostRateLimiter(rate=100, burst=100, default_backoff=7)
+    limiter.on_response("https://a.co.il/x", 429, {"Retry-After": "30"})
+    assert limiter.reserve("https://a.co.il/y") == pytest.approx(30, abs=0.5)
+    assert limiter.reserve("https://b.co.il/y") == 0.0
+
+    limiter.on_response("https://b.co.il/x", 429, {})
+    assert limiter.reserve("https://b.co.il/y") == pytest.approx(7, abs=0.5)
+
+    # 503 pauses only when the server says for how long
+    limiter.on_response("https://c.co.il/x", 503, {})
+    limiter.on_response("https://c.co.il/x", 200, {"Retry-After": "30"})
+    assert limiter.reserve("https://c.co.il/y") == 0.0
+
+
+def test_parse_retry_after():
+    """test both Retry-After formats"""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(
+        "Wed, 21 Oct 2015 07:28:00 GMT", now=1445412480 - 60
+    ) == pytest.approx(60)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_acquire_async_waits():
+    """test the async acquire sleeps for the reserved wait"""
+    limiter = HostRateLimiter(rate=20, burst=1)
+
+    async def run_test():
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire_async("https://a.co.il")
+        return time.monotonic() - start
+
+    assert asyncio.run(run_test()) >= 0.09
+
+
+def _reserve_in_worker(url):
+    """reserve a request with the limiter installed in the worker"""
+    return get_rate_limiter().reserve(url)
+
+
+def test_shared_bucket_across_processes():
+    """test the pool processes draw from one bucket per host"""
+    with Manager() as manager:
+        limiter = create_shared_rate_limiter(manager, rate=10, burst=2)
+        with Pool(2, initializer=install_rate_limiter, initargs=(limiter,)) as pool:
+            waits = pool.map(_reserve_in_worker, ["https://a.co.il/x"] * 6)
+    # the budget is global: 2 free requests, the others queue 0.1s apart
+    assert sum(1 for wait in waits if wait == 0.0) == 2
+    assert max(waits) == pytest.approx(0.4, abs=0.1)
@@ -0,0 +1,134 @@
+"""Tests for rolling the status events up into summaries."""
+
+import shutil
+import tempfile
+
+import pytest
+
+from il_supermarket_scarper.utils import (
+    JsonDataBase,
+    ScrapingResult,
+    StatusSummary,
+)
+from il_supermarket_scarper.utils.scraper_status import ScraperStatus
+from il_supermarket_scarper.utils.scraper_status_contract import ScraperStatusOutput
+
+FILE_NAMES = [f"PriceFull7290058249350-{store:03d}-202601121522" for store in range(5)]
+
+
+@pytest.fixture(name="database")
+def fixture_database():
+    """a JSON status database in a temporary folder"""
+    path = tempfile.mkdtemp()
+    yield JsonDataBase("wolt", path)
+    shutil.rmtree(path)
+
+
+def test_summary_digest_ignores_order():
+    """test the same files give the same digest, whatever their order"""
+    forward = StatusSummary("saw")
+    backward = StatusSummary("saw")
+    for file_name in FILE_NAMES:
+        forward.add(file_name, 10)
+    for file_name in reversed(FILE_NAMES):
+        backward.add(file_name, 10)
+    backward.add("another", None)
+
+    assert forward.as_document() == {
+        "summarized_status": "saw",
+        "count": 5,
+        "total_size": 50,
+        "files_without_size": 0,
+        "names_digest": forward.names_digest,
+    }
+    assert backward.count == 6
+    assert backward.files_without_size == 1
+    assert backward.names_digest != forward.names_digest
+
+    backward = StatusSummary("saw")
+    for file_name in reversed(FILE_NAMES):
+        backward.add(file_name, 10)
+    assert backward.names_digest == forward.names_digest
+
+
+def _scrape(database, status_verbosity):
+    """see all the files, download the first one and fail the second"""
+    status = ScraperStatus(
+        "wolt", status_database=database, status_verbosity=status_verbosity
+    )
+    status.on_scraping_start(limit=None, files_types=None)
+    for file_name in FILE_NAMES:
+        status.register_saw_file(file_name, f"http://x/{file_name}.gz", 100)
+    for file_name in FILE_NAMES[:2]:
+        status.register_collected_file(file_name, f"http://x/{file_name}.gz")
+    status.register_downloaded_file(
+        ScrapingResult(
+            file_name=FILE_NAMES[0],
+            downloaded=True,
+            extract_succefully=True,
+            error=None,
+            restart_and_retry=False,
+        )
+    )
+    status.register_download_fail(ValueError("broken"), FILE_NAMES[1])
+    status.on_scrape_completed(database.base_path)
+    return database.read_documents()
+
+
+def test_summarize_saw(database):
+    """test the saw events are rolled up, the others stay per file"""
+    documents = _scrape(database, ScraperStatus.VERBOSITY_SUMMARIZE_SAW)
+
+    statuses = [event["status"] for event in documents["events"]]
+    assert statuses.count(ScraperStatus.SAW) == 0
+    assert statuses.count(ScraperStatus.COLLECTED) == 2
+    assert statuses.count(ScraperStatus.DOWNLOADED) == 1
+    assert statuses.count(ScraperStatus.FAILED) == 1
+    (summary,) = [
+        event
+        for event in documents["events"]
+        if event["status"] == ScraperStatus.SUMMARY
+    ]
+    assert summary["summarized_status"] == ScraperStatus.SAW
+    assert summary["count"] == len(FILE_NAMES)
+    assert summary["total_size"] == 100 * len(FILE_NAMES)
+    assert summary["task_id"] == documents["events"][0]["task_id"]
+
+
+def test_summarize_collected_too(database):
+    """test both summaries are written, and the contract accepts them"""
+    documents = _scrape(database, ScraperStatus.VERBOSITY_SUMMARIZE)
+
+    summaries = {
+        event["summarized_status"]: event["count"]
+        for event in documents["events"]
+        if event["status"] == ScraperStatus.SUMMARY
+    }
+    assert summaries == {ScraperStatus.SAW: 5, ScraperStatus.COLLECTED: 2}
+    # the failure event doesn't carry the download_url the contract requires
+    output = ScraperStatusOutput(
+        events=[
+            event
+            for event in documents["events"]
+            if event["status"] != ScraperStatus.FAILED
+        ]
+    )
+    assert output.validate_file_status()
+    # pylint: disable-next=protected-access
+    per_file, _ = output._build_per_file_status_data()
+    assert per_file[FILE_NAMES[0]]["saw"] and per_file[FILE_NAMES[0]]["collected"]
+
+
+def test_full_verbosity_has_no_summary(database):
+    """test the default writes an event per file"""
+    documents = _scrape(database, ScraperStatus.VERBOSITY_FULL)
+
+    statuses = [event["status"] for event in documents["events"]]
+    assert statuses.count(ScraperStatus.SAW) == len(FILE_NAMES)
+    assert ScraperStatus.SUMMARY not in statuses
+
+
+def test_unknown_verbosity(database):
+    """test a typo in the verbosity is reported"""
+    with pytest.raises(ValueError):
+        ScraperStatus("wolt", status_database=database, status_verbosity="quiet")
@@ -0,0 +1,215 @@
+"""Tests for the pooled HTTP transports, against a local HTTP server."""
+
+import asyncio
+import re
+import socket
+
+import pytest
+import requests
+
+from il_supermarket_scarper.engines.tests.local_server import (
+    QuietHandler,
+    local_http_server,
+)
+from il_supermarket_scarper.utils import (
+    ChainCookieJar,
+    HttpStatusError,
+    ResumeNotSupportedError,
+    create_transport,
+    resumable_stream,
+    session_with_cookies_on_transport,
+)
+
+FILE_CONTENT = b"<root>" + b"<Item/>" * 50_000 + b"</root>"
+# pages without a declared charset, by path: their content type and body
+UNDECLARED_PAGES = {
+    "/latin.html": ("text/html", "מחירון".encode("utf-8")),
+    "/data.json": ("application/json", "מחירון".encode("utf-8")),
+    "/page": (None, "<p>מחירון של הרשת לכל הסניפים</p>".encode("windows-1255")),
+}
+
+
+class _Handler(QuietHandler):
+    """serve a file, a cookie setting page and an error"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer by path"""
+        if self.path == "/file.xml":
+            self._reply(200, FILE_CONTENT)
+        elif self.path == "/login":
+            self._reply(200, "שלום".encode("utf-8"), cookie="session=abc")
+        elif self.path == "/whoami":
+            self._reply(200, self.headers.get("Cookie", "").encode())
+        elif self.path in UNDECLARED_PAGES:
+            content_type, body = UNDECLARED_PAGES[self.path]
+            self.reply(
+                200, body, {"Content-Type": content_type} if content_type else {}
+            )
+        elif self.path in ("/flaky.xml", "/flaky-no-range.xml"):
+            self._reply_flaky(honor_range=self.path == "/flaky.xml")
+        else:
+            self._reply(404, b"not found")
+
+    def _reply(self, status, body, cookie=None):
+        headers = {"Content-Type": "text/plain; charset=utf-8"}
+        if cookie:
+            headers["Set-Cookie"] = cookie
+        self.reply(status, body, headers)
+
+    def _reply_flaky(self, honor_range):
+        """drop the connection in the middle of every full transfer"""
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match and honor_range and self.headers.get("If-Range") == '"v1"':
+            start = int(match.group(1))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(FILE_CONTENT) - 1}/{len(FILE_CONTENT)}",
+            )
+            self.send_header("Content-Length", str(len(FILE_CONTENT) - start))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(FILE_CONTENT[start:])
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(FILE_CONTENT)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(FILE_CONTENT[: len(FILE_CONTENT) // 3])
+        try:
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # the client already gave up on the transfer
+        self.close_connection = True  # pylint: disable=attribute-defined-outside-init
+
+
+@pytest.fixture(name="server_url", scope="module")
+def fixture_server_url():
+    """run a local HTTP server for the module"""
+    with local_http_server(_Handler) as url:
+        yield url
+
+
+@pytest.mark.parametrize("transport_type", ["aiohttp", "requests"])
+def test_transport_decodes_like_requests(server_url, transport_type):
+    """test a body without a declared charset is decoded as requests does"""
+
+    async def run_test():
+        transport = create_transport(transport_type)
+        try:
+            return {
+                path: (await transport.request("GET", f"{server_url}{path}")).text
+                for path in UNDECLARED_PAGES
+            }
+        finally:
+            await transport.close()
+
+    texts = asyncio.run(run_test())
+    for path, text in texts.items():
+        assert text == requests.get(f"{server_url}{path}", timeout=5).text
+
+
+@pytest.mark.parametrize("transport_type", ["aiohttp", "requests"])
+def test_transport_request_and_stream(server_url, transport_type):
+    """test reading responses and streaming a file over one pool"""
+
+    async def run_test():
+        transport = create_transport(transport_type, limit_per_host=2)
+        try:
+            response = await transport.request("GET", f"{server_url}/login")
+            assert response.status_code == 200
+            assert response.text == "שלום"
+            assert response.cookies == {"session": "abc"}
+
+            chunks = [
+                chunk
+                async for chunk in transport.stream(
+                    f"{server_url}/file.xml", chunk_size=1024
+                )
+            ]
+            assert b"".join(chunks) == FILE_CONTENT
+
+            response = await transport.request("GET", f"{server_url}/missing")
+            with pytest.raises(HttpStatusError):
+                response.raise_for_status()
+        finally:
+            await transport.close()
+
+    asyncio.run(run_test())
+
+
+@pytest.mark.parametrize("transport_type", ["aiohttp", "requests"])
+def test_stream_resumed_with_range(server_url, transport_type):
+    """test a dropped transfer continues from the received offset"""
+
+    async def run_test():
+        transport = create_transport(transport_type)
+        try:
+            chunks = [
+                chunk
+                async for chunk in resumable_stream(
+                    lambda progress: transport.stream(
+                        f"{server_url}/flaky.xml", chunk_size=1024, progress=progress
+                    ),
+                    delay=0,
+                )
+            ]
+            assert b"".join(chunks) == FILE_CONTENT
+
+            with pytest.raises(ResumeNotSupportedError):
+                async for _ in resumable_stream(
+                    lambda progress: transport.stream(
+                        f"{server_url}/flaky-no-range.xml", progress=progress
+                    ),
+                    delay=0,
+                ):
+                    pass
+        finally:
+            await transport.close()
+
+    asyncio.run(run_test())
+
+
+def test_session_with_cookies_on_transport(server_url):
+    """test cookies are kept on first success and sent on the next requests"""
+
+    async def run_test():
+        transport = create_transport("aiohttp")
+        cookie_jar = ChainCookieJar()
+        try:
+            await session_with_cookies_on_transport(
+                transport, f"{server_url}/login", cookie_jar=cookie_jar
+            )
+            assert cookie_jar.get_cookies() == {"session": "abc"}
+
+            responses = await asyncio.gather(
+                *[
+                    session_with_cookies_on_transport(
+                        transport, f"{server_url}/whoami", cookie_jar=cookie_jar
+                    )
+                    for _ in range(5)
+                ]
+            )
+            assert all(response.text == "session=abc" for response in responses)
+        finally:
+            await transport.close()
+
+    asyncio.run(run_test())
+
+
+def test_cookie_jar_persist_and_restore(tmp_path):
+    """test the cookie jar survives a restart through persist/restore"""
+    cookie_jar = ChainCookieJar()
+    cookie_jar.record_first({"session": "abc"})
+    cookie_jar.record_first({"session": "other"})
+    cookie_jar.persist(tmp_path / "cookies.txt")
+
+    restored = ChainCookieJar()
+    restored.restore(tmp_path / "cookies.txt")
+    assert restored.get_cookies() == {"session": "abc"}
+
+    restored.clear()
+    restored.restore(tmp_path / "missing.txt")
+    assert not restored.get_cookies()
@@ -0,0 +1,349 @@
+"""HTTP transports used by the engines to talk to the chains' sites."""
+
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional
+
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .logger import Logger
+from .exceptions import HttpStatusError
+from .rate_limit import get_rate_limiter
+from .connection import (
+    DOWNLOAD_CHUNK_SIZE,
+    DownloadProgress,
+    check_range_response,
+    check_transfer_complete,
+    iterate_in_thread,
+    range_request_headers,
+    _iter_url_content,
+)
+
+aiohttp_installed = True  # pylint: disable=invalid-name
+try:
+    import aiohttp
+except ImportError:
+    aiohttp_installed = False  # pylint: disable=invalid-name
+
+
+TRANSPORT_ENV_VAR = "HTTP_TRANSPORT"
+
+TRANSPORT_ERRORS = (requests.exceptions.RequestException, OSError)
+if aiohttp_installed:
+    TRANSPORT_ERRORS += (aiohttp.ClientError,)
+
+
+class TransportResponse:
+    """A fully read HTTP response, independent of the transport that fetched it."""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        cookies: Dict[str, str] = None,
+        encoding: Optional[str] = None,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.cookies = cookies or {}
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        """
+        The body decoded like requests does.
+
+        With the charset the server declared (ISO-8859-1 for text without
+        one), otherwise the detected one, otherwise ISO-8859-1.
+        """
+        encoding = self.encoding or chardet.detect(self.content)["encoding"]
+        return self.content.decode(encoding or "ISO-8859-1")
+
+    def json(self) -> Any:
+        """The body parsed as JSON"""
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """Raise HttpStatusError for 4xx/5xx responses"""
+        if 400 <= self.status_code < 600:
+            raise HttpStatusError(self.status_code, self.url)
+
+
+class HttpTransport(ABC):
+    """
+    Abstract HTTP transport owned by an engine.
+
+    A transport keeps its connections open between calls, so the listing
+    requests and downloads of a chain reuse keep-alive (and TLS) sessions.
+    Cookies are passed explicitly on every call and never kept by the
+    transport itself. Every request waits for the per-host rate limiter.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10):
+        """
+        Args:
+            limit: Maximum number of open connections
+            limit_per_host: Maximum number of open connections to a single host
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+
+    @abstractmethod
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        data: Any = None,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        cookies: Dict[str, str] = None,
+        timeout: float = 15,
+    ) -> TransportResponse:
+        """
+        Send a request and read the whole response.
+
+        Returns:
+            TransportResponse, its cookies holding the sent cookies updated
+            with the ones the server set.
+        """
+
+    @abstractmethod
+    async def stream(
+        self,
+        url: str,
+        timeout: float = 30,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        progress: Optional[DownloadProgress] = None,
+        cookies: Dict[str, str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Async generator yielding the body of a GET request chunk by chunk.
+
+        With a DownloadProgress that already received bytes, only the rest of
+        the file is requested (Range/If-Range), see resumable_stream.
+        """
+
+    @abstractmethod
+    async def close(self):
+        """Close all pooled connections."""
+
+
+class RequestsTransport(HttpTransport):
+    """Transport running a pooled requests.Session in worker threads."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10):
+        super().__init__(limit=limit, limit_per_host=limit_per_host)
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            session = requests.Session()
+            # cookies are handled by the caller, the session must not keep any
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(
+                pool_connections=self.limit, pool_maxsize=self.limit_per_host
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        data: Any = None,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        cookies: Dict[str, str] = None,
+        timeout: float = 15,
+    ) -> TransportResponse:
+        rate_limiter = get_rate_limiter()
+        await rate_limiter.acquire_async(url)
+        response = await asyncio.to_thread(
+            self._get_session().request,
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            timeout=timeout,
+        )
+        rate_limiter.on_response(url, response.status_code, response.headers)
+        all_cookies = dict(cookies or {})
+        for past_response in response.history + [response]:
+            all_cookies.update(past_response.cookies.get_dict())
+        return TransportResponse(
+            url=response.url,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=response.content,
+            cookies=all_cookies,
+            encoding=response.encoding,
+        )
+
+    async def stream(
+        self,
+        url: str,
+        timeout: float = 30,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        progress: Optional[DownloadProgress] = None,
+        cookies: Dict[str, str] = None,
+    ) -> AsyncIterator[bytes]:
+        async for chunk in iterate_in_thread(
+            _iter_url_content(
+                url,
+                timeout=timeout,
+                chunk_size=chunk_size,
+                session=self._get_session(),
+                progress=progress,
+                cookies=cookies,
+            )
+        ):
+            yield chunk
+
+    async def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class AiohttpTransport(HttpTransport):
+    """Transport running natively on the event loop with an aiohttp connection pool."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10):
+        if not aiohttp_installed:
+            raise ImportError("aiohttp is required for the aiohttp transport.")
+        super().__init__(limit=limit, limit_per_host=limit_per_host)
+        self._session = None
+
+    def _get_session(self):
+        # created lazily, the session is bound to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                ),
+                cookie_jar=aiohttp.DummyCookieJar(),
+            )
+        return self._session
+
+    @staticmethod
+    def _timeout(timeout):
+        return aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=timeout
+        )
+
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        data: Any = None,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        cookies: Dict[str, str] = None,
+        timeout: float = 15,
+    ) -> TransportResponse:
+        rate_limiter = get_rate_limiter()
+        await rate_limiter.acquire_async(url)
+        async with self._get_session().request(  # pylint: disable=not-async-context-manager
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            timeout=self._timeout(timeout),
+        ) as response:
+            rate_limiter.on_response(url, response.status, response.headers)
+            content = await response.read()
+            all_cookies = dict(cookies or {})
+            for past_response in response.history + (response,):
+                all_cookies.update(
+                    {key: morsel.value for key, morsel in past_response.cookies.items()}
+                )
+            return TransportResponse(
+                url=str(response.url),
+                status_code=response.status,
+                headers=dict(response.headers),
+                content=content,
+                cookies=all_cookies,
+                encoding=get_encoding_from_headers(response.headers),
+            )
+
+    async def stream(
+        self,
+        url: str,
+        timeout: float = 30,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        progress: Optional[DownloadProgress] = None,
+        cookies: Dict[str, str] = None,
+    ) -> AsyncIterator[bytes]:
+        # byte offsets must refer to the file itself, not to a compressed body
+        headers = {"Accept-Encoding": "identity", **range_request_headers(progress)}
+        rate_limiter = get_rate_limiter()
+        await rate_limiter.acquire_async(url)
+        async with self._get_session().get(  # pylint: disable=not-async-context-manager
+            url, timeout=self._timeout(timeout), headers=headers, cookies=cookies
+        ) as response:
+            rate_limiter.on_response(url, response.status, response.headers)
+            check_range_response(url, progress, response.status, response.headers)
+            if response.status >= 400:
+                raise HttpStatusError(response.status, url)
+            read = 0
+            async for chunk in response.content.iter_chunked(chunk_size):
+                read += len(chunk)
+                yield chunk
+            check_transfer_complete(url, read, response.content_length)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "aiohttp": AiohttpTransport,
+}
+
+
+def create_transport(
+    transport_type: Optional[str] = None, limit: int = 100, limit_per_host: int = 10
+) -> HttpTransport:
+    """
+    Create an HTTP transport.
+
+    Args:
+        transport_type: "aiohttp" or "requests". Defaults to the HTTP_TRANSPORT
+            environment variable, then to aiohttp when it is installed.
+        limit: Maximum number of open connections
+        limit_per_host: Maximum number of open connections to a single host
+    """
+    transport_type = transport_type or os.getenv(TRANSPORT_ENV_VAR)
+    if transport_type is None:
+        transport_type = "aiohttp" if aiohttp_installed else "requests"
+
+    if transport_type not in TRANSPORTS:
+        raise ValueError(
+            f"Unknown transport type: {transport_type}, "
+            f"expected one of {list(TRANSPORTS)}"
+        )
+    if transport_type == "aiohttp" and not aiohttp_installed:
+        Logger.warning("aiohttp is not installed, falling back to requests transport")
+        transport_type = "requests"
+    return TRANSPORTS[transport_type](limit=limit, limit_per_host=limit_per_host)
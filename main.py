@@ -3,7 +3,7 @@ import os
 from il_supermarket_scarper import ScarpingTask, ScraperFactory, FileTypesFilters
 
 
-def load_configuration():  # pylint: disable=too-many-branches
+def load_configuration():  # pylint: disable=too-many-branches,too-many-statements
     """load params from env variables with validation"""
     kwargs = {}
     # validate scrapers
@@ -47,6 +47,23 @@ def load_configuration():  # pylint: disable=too-many-branches
         except ValueError:
             raise ValueError("NUMBER_OF_PROCESSES must be an integer")
 
+    # validate runner mode (process pool or a single event loop)
+    runner_mode = os.getenv("RUNNER_MODE", None)
+    if runner_mode:
+        runner_mode = runner_mode.lower()
+        if runner_mode not in ["process", "asyncio"]:
+            raise ValueError(
+                f"RUNNER_MODE must be 'process' or 'asyncio', but got {runner_mode}"
+            )
+        kwargs["runner_mode"] = runner_mode
+
+    max_concurrent_downloads = os.getenv("MAX_CONCURRENT_DOWNLOADS", None)
+    if max_concurrent_downloads:
+        try:
+            kwargs["max_concurrent_downloads"] = int(max_concurrent_downloads)
+        except ValueError:
+            raise ValueError("MAX_CONCURRENT_DOWNLOADS must be an integer")
+
     # validate output mode (disk or queue)
     output_mode = os.getenv("OUTPUT_MODE", "disk").lower()
     if output_mode not in ["disk", "queue"]:
@@ -75,24 +92,38 @@ def load_configuration():  # pylint: disable=too-many-branches
 
     kwargs["output_configuration"] = output_configuration
 
-    # Configure status database (json or mongo)
+    # Configure status database (json, jsonl, sqlite or mongo)
     status_database_type = os.getenv("STATUS_DATABASE_TYPE", "json").lower()
-    if status_database_type not in ["json", "mongo"]:
+    if status_database_type not in ["json", "jsonl", "sqlite", "mongo"]:
         raise ValueError(
-            f"STATUS_DATABASE_TYPE must be 'json' or 'mongo', but got {status_database_type}"
+            "STATUS_DATABASE_TYPE must be 'json', 'jsonl', 'sqlite' or 'mongo', "
+            f"but got {status_database_type}"
         )
 
     status_configuration = {
         "database_type": status_database_type,
     }
 
-    if status_database_type == "json":
+    if status_database_type in ("json", "jsonl", "sqlite"):
         # JSON database configuration (default)
         status_configuration["base_path"] = os.getenv(
             "STATUS_DATABASE_PATH", "dumps/status"
         )
     # For mongo, connection details are read from environment variables in MongoDataBase itself
     # (MONGO_URL, MONGO_PORT)
+    if status_database_type == "mongo":
+        status_configuration["async_driver"] = (
+            os.getenv("MONGO_ASYNC_DRIVER", "false").lower() == "true"
+        )
+
+    # roll the per-file saw (and collected) events up into a summary event
+    status_verbosity = os.getenv("STATUS_VERBOSITY", "full").lower()
+    if status_verbosity not in ["full", "summarize_saw", "summarize"]:
+        raise ValueError(
+            "STATUS_VERBOSITY must be 'full', 'summarize_saw' or 'summarize', "
+            f"but got {status_verbosity}"
+        )
+    status_configuration["verbosity"] = status_verbosity
 
     kwargs["status_configuration"] = status_configuration
 